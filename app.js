@@ -9,6 +9,7 @@ const state = {
   selectedTemplateId: null,
   transcript: '',
   minutes: null,
+  minutesState: null, // Server state for incremental minutes updates
   minutesHistory: []
 };
 
@@ -150,46 +151,94 @@ function renderMinutesHistory(){
 }
 
 // Fake API calls (replace with serverless endpoints)
-async function apiTranscribe(file){
-  // Call backend /api/transcribe endpoint (multipart/form-data)
+async function waitForJob(job, onProgress){
+  // Poll a background job until it finishes, then fetch its result
+  while(true){
+    const resp = await fetch(job.status_url);
+    const status = await resp.json().catch(()=>({error:'unknown'}));
+    // e.g. 404 once the job is gone (server restart or retention pruning)
+    if(!resp.ok) throw new Error(status.error || 'Job status unavailable');
+    if(onProgress) onProgress(status);
+    if(status.status === 'succeeded' || status.status === 'failed') break;
+    await new Promise(r=>setTimeout(r, 1000));
+  }
+  const resp = await fetch(job.result_url);
+  const payload = await resp.json().catch(()=>({error:'unknown'}));
+  if(!resp.ok) throw new Error(payload.error || 'Job failed');
+  return payload;
+}
+
+function followJob(job, onProgress, onSegments){
+  // Follow a job's server-sent events; falls back to polling without EventSource
+  if(!window.EventSource || !job.events_url) return waitForJob(job, onProgress);
+  return new Promise((resolve, reject)=>{
+    const source = new EventSource(job.events_url);
+    source.addEventListener('progress', (e)=>{ if(onProgress) onProgress(JSON.parse(e.data)); });
+    source.addEventListener('segments', (e)=>{ if(onSegments) onSegments(JSON.parse(e.data).segments); });
+    source.addEventListener('timing', (e)=>{
+      const t = JSON.parse(e.data);
+      console.debug(`${t.stage}: ${(t.seconds * 1000).toFixed(0)} ms`);
+    });
+    source.addEventListener('done', ()=>{
+      source.close();
+      waitForJob(job).then(resolve, reject);
+    });
+    source.onerror = ()=>{
+      // EventSource reconnects by itself (resuming via Last-Event-ID) unless the
+      // server refused the stream, e.g. 404 for a job that no longer exists
+      if(source.readyState !== EventSource.CLOSED) return;
+      source.close();
+      waitForJob(job, onProgress).then(resolve, reject);
+    };
+  });
+}
+
+async function apiTranscribe(file, onProgress, onSegments){
+  // Queue a transcription job (multipart/form-data) and wait for it
   const fd = new FormData();
   fd.append('file', file, file.name);
 
-  const resp = await fetch('/api/transcribe', { method: 'POST', body: fd });
+  const resp = await fetch('/api/jobs/transcribe', { method: 'POST', body: fd });
   if(!resp.ok){
     const err = await resp.json().catch(()=>({error:'unknown'}));
     throw new Error(err.error || 'Transcription failed');
   }
-  const payload = await resp.json();
+  const payload = await followJob(await resp.json(), onProgress, onSegments);
   return payload.text || '';
 }
-async function apiGenerateMinutes(transcript, template){
-  const resp = await fetch('/api/minutes', {
+async function apiUpdateMinutes(transcript, template, refresh=false){
+  // Only the text added since the last update is sent to the model, unless
+  // refresh asks for the minutes to be regenerated from scratch
+  const resp = await fetch('/api/minutes/incremental', {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ transcript, template })
+    body: JSON.stringify({ transcript, template, state: refresh ? null : state.minutesState, refresh })
   });
   if(!resp.ok){
     const err = await resp.json().catch(()=>({error:'unknown'}));
     throw new Error(err.error || 'Minutes generation failed');
   }
-  return await resp.json();
+  const payload = await resp.json();
+  state.minutesState = payload.state;
+  return payload.minutes;
 }
 
 // Events
 document.getElementById('choose-template').addEventListener('click',()=> showView('templates'));
 document.getElementById('change-template').addEventListener('click',()=> showView('templates'));
-document.getElementById('clear-transcript').addEventListener('click',()=>{ state.transcript=''; transcriptEl.value=''; });
-document.getElementById('generate').addEventListener('click', async ()=>{
+document.getElementById('clear-transcript').addEventListener('click',()=>{ state.transcript=''; state.minutesState=null; transcriptEl.value=''; });
+async function generateMinutes(refresh){
   const tpl = state.templates.find(t=>t.id===state.selectedTemplateId) || state.templates[0];
   state.selectedTemplateId = tpl.id;
-  const minutes = await apiGenerateMinutes(state.transcript || transcriptEl.value, tpl);
+  const minutes = await apiUpdateMinutes(state.transcript || transcriptEl.value, tpl, refresh);
   state.minutes = minutes; renderMinutes();
   const title = minutes.title || 'Project Minutes';
   state.minutesHistory.unshift({ ts: Date.now(), template: tpl.name, title, minutes });
   persistUserData();
   renderMinutesHistory();
-});
+}
+document.getElementById('generate').addEventListener('click', ()=> generateMinutes(false));
+document.getElementById('regenerate').addEventListener('click', ()=> generateMinutes(true));
 
 document.getElementById('template-file').addEventListener('change', async (e)=>{
   const file = e.target.files?.[0]; if(!file) return;
@@ -205,10 +254,71 @@ document.getElementById('template-file').addEventListener('change', async (e)=>{
 
 document.getElementById('audio-input').addEventListener('change', async (e)=>{
   const file = e.target.files?.[0]; if(!file) return;
-  const t = await apiTranscribe(file);
+  let partial = '';
+  let stage = '';
+  const t = await apiTranscribe(file, (job)=>{
+    stage = `${job.stage} (${Math.round(job.progress * 100)}%)`;
+    transcriptEl.value = partial ? `${stage}\n\n${partial}` : stage;
+  }, (segments)=>{
+    // Chunks can finish out of order; show what has arrived so far
+    partial = (partial + segments.map(s=>s.text).join('')).trim();
+    transcriptEl.value = `${stage}\n\n${partial}`;
+  });
   state.transcript = t; transcriptEl.value = t; showView('dashboard');
 });
 
+// Live transcription: stream microphone PCM over a WebSocket
+let live = null;
+function stopLive(){
+  if(!live || live.stopped) return;
+  live.stopped = true;
+  live.processor.disconnect(); live.source.disconnect();
+  live.stream.getTracks().forEach(t=>t.stop());
+  live.context.close();
+  if(live.ws.readyState === WebSocket.OPEN) live.ws.send(JSON.stringify({ type: 'stop' }));
+  document.getElementById('record-live').textContent = 'Finishing...';
+}
+async function startLive(){
+  const button = document.getElementById('record-live');
+  const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+  const context = new AudioContext();
+  const source = context.createMediaStreamSource(stream);
+  const processor = context.createScriptProcessor(4096, 1, 1);
+  const ws = new WebSocket(`${location.protocol === 'https:' ? 'wss' : 'ws'}://${location.host}/api/live`);
+  ws.binaryType = 'arraybuffer';
+  live = { stream, context, source, processor, ws };
+  let committed = '';
+  ws.onopen = ()=>{
+    ws.send(JSON.stringify({ type: 'start', format: 'pcm_s16le', sample_rate: context.sampleRate }));
+    processor.onaudioprocess = (e)=>{
+      if(ws.readyState !== WebSocket.OPEN) return;
+      const input = e.inputBuffer.getChannelData(0);
+      const pcm = new Int16Array(input.length);
+      for(let i=0; i<input.length; i++){ pcm[i] = Math.max(-1, Math.min(1, input[i])) * 0x7fff; }
+      ws.send(pcm.buffer);
+    };
+    source.connect(processor); processor.connect(context.destination);
+    button.textContent = 'Stop Recording';
+  };
+  ws.onmessage = (e)=>{
+    const msg = JSON.parse(e.data);
+    if(msg.type === 'update'){
+      if(msg.committed) committed = `${committed} ${msg.committed.text}`.trim();
+      // Tentative words may still change; show them after the stable text
+      transcriptEl.value = msg.tentative ? `${committed} ${msg.tentative.text}`.trim() : committed;
+    }else if(msg.type === 'final'){
+      state.transcript = msg.text; transcriptEl.value = msg.text;
+    }else if(msg.type === 'error'){
+      alert(msg.error);
+    }
+  };
+  ws.onclose = ()=>{ if(live && live.ws === ws){ stopLive(); live = null; } button.textContent = 'Record Live'; };
+}
+document.getElementById('record-live').addEventListener('click', ()=>{
+  if(live){ stopLive(); return; }
+  startLive().catch(err=>{ live = null; alert(`Could not start recording: ${err.message}`); });
+});
+
 templatesList.addEventListener('click', (e)=>{
   const btn = e.target.closest('button[data-select-template]');
   const edit = e.target.closest('button[data-edit-template]');
@@ -293,7 +403,7 @@ saveAccount.addEventListener('click', ()=>{
 
 // Nav
 navButtons.forEach(b=> b.addEventListener('click', ()=> showView(b.dataset.view)));
-document.getElementById('new-meeting').addEventListener('click', ()=>{ showView('dashboard'); transcriptEl.value=''; state.transcript=''; state.minutes=null; renderMinutes(); });
+document.getElementById('new-meeting').addEventListener('click', ()=>{ showView('dashboard'); transcriptEl.value=''; state.transcript=''; state.minutes=null; state.minutesState=null; renderMinutes(); });
 
 // Initial load
 function init(){
@@ -0,0 +1,19 @@
+"""Transcribe a directory or glob of recordings; see src/core/batch.py.
+
+Usage:
+  python batch_transcribe.py recordings/ --manifest runs/manifest.jsonl --workers 4
+"""
+
+import sys
+
+from src.core.batch import main
+
+try:
+    from dotenv import load_dotenv  # optional convenience
+    load_dotenv()
+except Exception:
+    pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""
+Microbenchmarks for the transcription and minutes hot paths.
+
+Run ``python -m benchmarks`` from the repository root; see TESTING.md.
+"""
@@ -0,0 +1,22 @@
+"""Benchmarks for audio validation and duration probing."""
+
+from contextlib import contextmanager
+
+from src.utils.audio_utils import get_audio_duration, validate_audio_file
+
+from .fixtures import write_meeting_wav
+from .harness import benchmark
+
+
+@benchmark("audio.validate_audio_file", number=200)
+@contextmanager
+def validate_wav(workdir):
+    path = str(write_meeting_wav(workdir / "validate.wav", 60))
+    yield lambda: validate_audio_file(path)
+
+
+@benchmark("audio.get_audio_duration", number=200)
+@contextmanager
+def duration_wav(workdir):
+    path = str(write_meeting_wav(workdir / "duration.wav", 60))
+    yield lambda: get_audio_duration(path)
@@ -0,0 +1,21 @@
+"""Benchmarks for exporting minutes."""
+
+from contextlib import contextmanager
+
+from export_docx import save_as_docx
+
+from .fixtures import meeting_transcript
+from .harness import benchmark
+
+
+@benchmark("export.save_as_docx", number=10)
+@contextmanager
+def docx_export(workdir):
+    minutes = {
+        "abstract_summary": meeting_transcript(300),
+        "key_points": "\n".join(f"{i}. {meeting_transcript(25)}" for i in range(1, 8)),
+        "action_items": "\n".join(f"- Owner {i}: {meeting_transcript(15)}" for i in range(10)),
+        "sentiment": meeting_transcript(120),
+    }
+    path = str(workdir / "minutes.docx")
+    yield lambda: save_as_docx(minutes, path)
@@ -0,0 +1,58 @@
+"""Benchmarks for minutes generation against a local fake LLM endpoint."""
+
+from contextlib import contextmanager
+
+import qwen_minutes
+from src.utils.llm_cache import bypass_llm_cache
+
+from .fixtures import FakeChatServer, meeting_transcript
+from .harness import benchmark
+
+# Injected per-request latency of the fake endpoint
+LLM_LATENCY_SECONDS = 0.05
+
+
+@contextmanager
+def _fake_openrouter():
+    with FakeChatServer(latency=LLM_LATENCY_SECONDS) as server:
+        original = qwen_minutes.OPENROUTER_URL
+        qwen_minutes.OPENROUTER_URL = server.url
+        try:
+            yield server
+        finally:
+            qwen_minutes.OPENROUTER_URL = original
+
+
+def _uncached_minutes(transcript, single_call=False):
+    # Every round must reach the endpoint, not the LLM cache
+    with bypass_llm_cache():
+        return qwen_minutes.meeting_minutes(transcript, single_call=single_call)
+
+
+@benchmark("minutes.meeting_minutes")
+@contextmanager
+def meeting_minutes(workdir):
+    transcript = meeting_transcript(3000)
+    with _fake_openrouter():
+        yield lambda: _uncached_minutes(transcript)
+
+
+@benchmark("minutes.meeting_minutes_structured")
+@contextmanager
+def meeting_minutes_structured(workdir):
+    transcript = meeting_transcript(3000)
+    with _fake_openrouter() as server:
+        server.reply = (
+            '{"abstract_summary": "Summary", "key_points": ["Point one"], '
+            '"action_items": ["Bob: book venue"], "sentiment": "Neutral"}'
+        )
+        yield lambda: _uncached_minutes(transcript, single_call=True)
+
+
+@benchmark("minutes.meeting_minutes_map_reduce", repeat=3)
+@contextmanager
+def meeting_minutes_map_reduce(workdir):
+    # Long enough to take the map-reduce path
+    transcript = meeting_transcript(40000)
+    with _fake_openrouter():
+        yield lambda: _uncached_minutes(transcript)
@@ -0,0 +1,43 @@
+"""Benchmarks for the transcription pipeline around a stub Whisper model."""
+
+from contextlib import contextmanager
+
+from src.audio.whisper_service import WhisperService
+from src.core.transcription_manager import TranscriptionManager
+
+from .fixtures import StubWhisperModel, write_meeting_wav
+from .harness import benchmark
+
+
+def _stub_manager(chunking):
+    manager = TranscriptionManager({"whisper": {"model_name": "base"}, "chunking": chunking})
+    manager.whisper_service.model = StubWhisperModel()
+    manager.whisper_service.cache = None
+    return manager
+
+
+@benchmark("transcription.transcribe_file", number=5)
+@contextmanager
+def transcribe_file(workdir):
+    path = str(write_meeting_wav(workdir / "meeting.wav", 300))
+    manager = _stub_manager({"enabled": False})
+    yield lambda: manager.transcribe_file(path)
+
+
+@benchmark("transcription.transcribe_file_chunked", repeat=3)
+@contextmanager
+def transcribe_file_chunked(workdir):
+    # One hour in 10-minute windows: exercises silence splitting, mapped
+    # windows and stitching; the stub keeps model time out of the figure
+    path = str(write_meeting_wav(workdir / "long_meeting.wav", 3600))
+    manager = _stub_manager({"enabled": True, "executor": "thread", "max_workers": 4})
+    yield lambda: manager.transcribe_file(path)
+
+
+@benchmark("whisper_service.dispatch", number=50)
+@contextmanager
+def whisper_dispatch(workdir):
+    path = str(write_meeting_wav(workdir / "dispatch.wav", 30))
+    service = WhisperService(model_name="base")
+    service.model = StubWhisperModel()
+    yield lambda: service.transcribe_audio(path)
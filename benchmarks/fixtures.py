@@ -0,0 +1,119 @@
+"""
+Inputs and stand-ins shared by the benchmarks: synthetic recordings, a
+stub Whisper model and a local fake of the OpenRouter chat endpoint.
+"""
+
+import json
+import time
+import wave
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def write_meeting_wav(path: Path, seconds: float, sample_rate: int = SAMPLE_RATE, seed: int = 0) -> Path:
+    """
+    Write a 16-bit mono WAV alternating 8 s of speech-like noise with 2 s pauses.
+
+    The pauses give chunking and VAD real silences to find.
+    """
+    rng = np.random.default_rng(seed)
+    frames = int(seconds * sample_rate)
+    t = np.arange(frames) / sample_rate
+    voiced = (t % 10.0) < 8.0
+    # Noise amplitude-modulated at a syllable rate; near silence in pauses
+    envelope = np.where(voiced, 0.3 * (0.6 + 0.4 * np.sin(2 * np.pi * 4.0 * t)), 0.002)
+    samples = (rng.standard_normal(frames) * envelope * 32767 / 4).clip(-32768, 32767).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+    return path
+
+
+class StubWhisperModel:
+    """Stand-in for a loaded Whisper model: one segment per 5 s of input, no inference."""
+
+    def transcribe(self, audio: Any, **options: Any) -> Dict[str, Any]:
+        if isinstance(audio, str):
+            with wave.open(audio, "rb") as f:
+                seconds = f.getnframes() / f.getframerate()
+        else:
+            seconds = len(audio) / SAMPLE_RATE
+        segments = [
+            {"id": i, "start": start, "end": min(seconds, start + 5.0), "text": f" Segment {i}."}
+            for i, start in enumerate(np.arange(0.0, seconds, 5.0).tolist())
+        ]
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "language": options.get("language") or "en",
+            "segments": segments,
+        }
+
+
+class FakeChatServer:
+    """
+    Local OpenAI-compatible chat completions endpoint with injected latency.
+
+    Use as a context manager; ``url`` is the completions URL to post to.
+    """
+
+    def __init__(self, latency: float = 0.05, reply: str = "- Point one\n- Point two"):
+        self.latency = latency
+        self.reply = reply
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real endpoint
+            # Headers and body go out in separate writes; without TCP_NODELAY
+            # delayed ACKs would add ~40 ms to every response
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                server.requests += 1
+                time.sleep(server.latency)
+                body = json.dumps({"choices": [{"message": {"content": server.reply}}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-chat", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api/v1/chat/completions"
+
+    def __enter__(self) -> "FakeChatServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+
+def meeting_transcript(words: int) -> str:
+    """Plausible transcript text of roughly ``words`` words."""
+    sentence = (
+        "Alice said the release is on track but the migration needs another review before Friday. "
+        "Bob will update the dashboard and follow up with the vendor about the invoice. "
+    )
+    per_sentence = len(sentence.split())
+    return (sentence * (words // per_sentence + 1)).strip()
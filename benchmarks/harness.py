@@ -0,0 +1,179 @@
+"""
+Timing harness, result files and baseline comparison for the benchmark suite.
+
+A benchmark is a context manager that prepares its inputs in a scratch
+directory and yields the zero-argument callable to time. Each benchmark is
+run ``repeat`` times in rounds of ``number`` calls; the per-call time of
+every round is recorded and summarised.
+"""
+
+import json
+import time
+import platform
+import statistics
+from contextlib import AbstractContextManager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+# Registered benchmarks, in registration order
+BENCHMARKS: Dict[str, "Benchmark"] = {}
+
+# A benchmark slower than its baseline median by more than this fraction is a regression
+DEFAULT_TOLERANCE = 0.5
+
+
+class Benchmark(NamedTuple):
+    """A registered benchmark."""
+
+    name: str
+    setup: Callable[[Path], AbstractContextManager]  # Yields the callable to time
+    number: int  # Calls per round
+    repeat: int  # Timed rounds
+
+
+class BenchmarkResult(NamedTuple):
+    """Per-call timings of one benchmark, in seconds."""
+
+    name: str
+    number: int
+    rounds: List[float]
+
+    @property
+    def min(self) -> float:
+        return min(self.rounds)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.rounds)
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.rounds)
+
+    @property
+    def stdev(self) -> float:
+        return statistics.stdev(self.rounds) if len(self.rounds) > 1 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "number": self.number,
+            "rounds": self.rounds,
+            "min": self.min,
+            "median": self.median,
+            "mean": self.mean,
+            "stdev": self.stdev,
+        }
+
+
+class Comparison(NamedTuple):
+    """A benchmark's median against its baseline median."""
+
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def regressed(self, tolerance: float = DEFAULT_TOLERANCE) -> bool:
+        return self.ratio > 1.0 + tolerance
+
+
+def benchmark(name: str, number: int = 1, repeat: int = 5):
+    """
+    Register a benchmark.
+
+    Args:
+        name: Unique dotted name (e.g. 'audio.validate_audio_file')
+        number: Calls per timed round; raise it for sub-millisecond work
+        repeat: Timed rounds
+
+    The decorated function takes a scratch directory and must be a context
+    manager yielding the callable to time.
+    """
+    def register(setup):
+        if name in BENCHMARKS:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        BENCHMARKS[name] = Benchmark(name, setup, number, repeat)
+        return setup
+    return register
+
+
+def run_benchmark(bench: Benchmark, workdir: Path, repeat: Optional[int] = None) -> BenchmarkResult:
+    """
+    Time one benchmark.
+
+    Args:
+        bench: Benchmark to run
+        workdir: Scratch directory for its inputs
+        repeat: Override the benchmark's round count
+
+    Returns:
+        Per-call time of every round
+    """
+    rounds = []
+    with bench.setup(workdir) as func:
+        func()  # Warm-up: imports, lazy loads, first-touch allocations
+        for _ in range(repeat or bench.repeat):
+            started = time.perf_counter()
+            for _ in range(bench.number):
+                func()
+            rounds.append((time.perf_counter() - started) / bench.number)
+    return BenchmarkResult(bench.name, bench.number, rounds)
+
+
+def environment() -> Dict[str, Any]:
+    """Machine description stored next to results; timings only compare on like hardware."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def save_results(results: List[BenchmarkResult], path: str) -> None:
+    """Write results as JSON: {"environment": ..., "benchmarks": {name: stats}}."""
+    payload = {
+        "environment": environment(),
+        "benchmarks": {result.name: result.to_dict() for result in results},
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Read a results or baseline file written by save_results."""
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare(results: List[BenchmarkResult], baseline: Dict[str, Any]) -> List[Comparison]:
+    """
+    Compare medians against a baseline.
+
+    Args:
+        results: Current results
+        baseline: Contents of a baseline file
+
+    Returns:
+        One comparison per benchmark present in both
+    """
+    stored = baseline.get("benchmarks", {})
+    return [
+        Comparison(result.name, stored[result.name]["median"], result.median)
+        for result in results
+        if result.name in stored
+    ]
+
+
+def format_seconds(seconds: float) -> str:
+    """Compact duration with a unit suited to its size."""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}us"
+    if seconds < 1.0:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.3f}s"
@@ -0,0 +1,110 @@
+"""
+Command-line runner: time the registered benchmarks, write machine-readable
+results and fail when any benchmark is slower than its stored baseline.
+"""
+
+import sys
+import fnmatch
+import argparse
+import importlib
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from .harness import (
+    BENCHMARKS,
+    DEFAULT_TOLERANCE,
+    compare,
+    format_seconds,
+    load_results,
+    run_benchmark,
+    save_results,
+)
+
+BENCHMARK_MODULES = [
+    "benchmarks.bench_audio",
+    "benchmarks.bench_transcription",
+    "benchmarks.bench_minutes",
+    "benchmarks.bench_export",
+]
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "baseline.json"
+
+
+def load_benchmarks() -> None:
+    """Import the benchmark modules; a module whose dependencies are missing is skipped."""
+    for module in BENCHMARK_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            print(f"Skipping {module}: {e}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Run Minute Maker benchmarks")
+    parser.add_argument("-k", "--filter", action="append", help="Only run benchmarks matching this glob")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    parser.add_argument("--repeat", type=int, default=None, help="Override timed rounds per benchmark")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=DEFAULT_TOLERANCE,
+        help="Allowed slowdown of the median as a fraction of the baseline (default: 0.5)",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    args = parser.parse_args(argv)
+
+    # Repository root on the path for src/ and the top-level modules
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    load_benchmarks()
+    selected = [
+        bench for name, bench in BENCHMARKS.items()
+        if not args.filter or any(fnmatch.fnmatch(name, pattern) for pattern in args.filter)
+    ]
+    if args.list:
+        for bench in selected:
+            print(bench.name)
+        return 0
+    if not selected:
+        print("No benchmarks selected")
+        return 1
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="minute-maker-bench-") as tmp_dir:
+        for bench in selected:
+            workdir = Path(tmp_dir) / bench.name
+            workdir.mkdir()
+            result = run_benchmark(bench, workdir, repeat=args.repeat)
+            results.append(result)
+            print(
+                f"{bench.name:<45} median {format_seconds(result.median):>10}  "
+                f"min {format_seconds(result.min):>10}  stdev {format_seconds(result.stdev):>10}"
+            )
+
+    if args.output:
+        save_results(results, args.output)
+        print(f"Results written to {args.output}")
+    if args.update_baseline:
+        save_results(results, args.baseline)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not Path(args.baseline).exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    regressions = 0
+    print(f"\nAgainst baseline {args.baseline} (tolerance {args.tolerance:.0%}):")
+    for comparison in compare(results, load_results(args.baseline)):
+        regressed = comparison.regressed(args.tolerance)
+        regressions += regressed
+        print(
+            f"{comparison.name:<45} {format_seconds(comparison.baseline):>10} -> "
+            f"{format_seconds(comparison.current):>10}  x{comparison.ratio:.2f}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    if regressions:
+        print(f"\n{regressions} benchmark(s) regressed")
+        return 1
+    return 0
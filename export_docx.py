@@ -1,7 +1,13 @@
+import time
+from typing import Dict, Optional
+
 from docx import Document
 
+from src.utils.metrics import observe_stage
+
 
-def save_as_docx(minutes: dict, filename: str):
+def save_as_docx(minutes: dict, filename: str, timings: Optional[Dict[str, float]] = None):
+    start = time.perf_counter()
     doc = Document()
     doc.add_heading('Meeting Minutes', 0)
 
@@ -12,4 +18,7 @@ def save_as_docx(minutes: dict, filename: str):
         doc.add_paragraph()  # blank line
 
     doc.save(filename)
-
+    latency = time.perf_counter() - start
+    if timings is not None:
+        timings["export"] = latency
+    observe_stage("export", "docx", latency)
@@ -1,5 +1,23 @@
-import httpx
+import asyncio
+import contextvars
+import hashlib
+import hmac
+import json
 import os
+import re
+import secrets
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from src.utils.http_client import get_http_client, get_async_http_client
+from src.utils.llm_cache import cached_completion, get_llm_cache, llm_cache_bypassed, llm_cache_key
+from src.utils.metrics import LLM_UPSTREAM_SECONDS, observe_stage
+from src.utils.rate_limit import get_rate_limit_scheduler
+from src.utils.resilience import call_with_resilience, call_with_resilience_async
+from src.utils.tracing import async_http_trace, span, trace_extensions
 
 # Load environment variables from .env if available
 try:
@@ -13,73 +31,744 @@ OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "your-openrouter-api-key")
 YOUR_SITE_URL = os.getenv("APP_SITE_URL", "https://your-app.com")  # optional, for attribution
 YOUR_APP_NAME = os.getenv("APP_NAME", "MeetingMinutesApp")          # optional
 
+# Maximum number of extraction calls in flight at once per meeting_minutes call
+MINUTES_MAX_CONCURRENCY = int(os.getenv("MINUTES_MAX_CONCURRENCY", "4"))
+# Transcripts estimated above this many tokens use map-reduce (0 disables it)
+MINUTES_MAP_REDUCE_TOKENS = int(os.getenv("MINUTES_MAP_REDUCE_TOKENS", "12000"))
+# Token budget for each transcript chunk in map-reduce mode
+MINUTES_CHUNK_TOKENS = int(os.getenv("MINUTES_CHUNK_TOKENS", "6000"))
+# Ask for all sections in one JSON response instead of one call per section
+MINUTES_SINGLE_CALL = os.getenv("MINUTES_SINGLE_CALL", "false").lower() == "true"
+# Signs incremental minutes state handed to clients; set it to keep state valid
+# across restarts and between server processes
+MINUTES_STATE_SECRET = os.getenv("MINUTES_STATE_SECRET") or secrets.token_hex(32)
+
+logger = logging.getLogger(__name__)
+
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+QWEN_MODEL = "qwen/qwen-1.5-72b-chat"  # or "qwen/qwen-72b-chat"
 
-def call_qwen(prompt: str, system_message: str) -> str:
-    response = httpx.post(
-        url="https://openrouter.ai/api/v1/chat/completions",
-        headers={
+
+def _qwen_request(prompt: str, system_message: str, response_format: Optional[dict] = None) -> dict:
+    request = {
+        "url": OPENROUTER_URL,
+        "headers": {
             "Authorization": f"Bearer {OPENROUTER_API_KEY}",
             "HTTP-Referer": YOUR_SITE_URL,
             "X-Title": YOUR_APP_NAME,
             "Content-Type": "application/json",
         },
-        json={
-            "model": "qwen/qwen-1.5-72b-chat",  # or "qwen/qwen-72b-chat"
+        "json": {
+            "model": QWEN_MODEL,
             "temperature": 0.0,
             "messages": [
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": prompt},
             ],
         },
-        timeout=60.0,
-    )
-    response.raise_for_status()
-    return response.json()["choices"][0]["message"]["content"]
+        "timeout": 60.0,
+    }
+    if response_format is not None:
+        request["json"]["response_format"] = response_format
+    return request
+
+
+def _llm_span_attributes(prompt: str) -> dict:
+    return {"llm.model": QWEN_MODEL, "llm.prompt_chars": len(prompt)}
+
+
+def call_qwen(
+    prompt: str,
+    system_message: str,
+    use_cache: bool = True,
+    response_format: Optional[dict] = None,
+) -> str:
+    request = _qwen_request(prompt, system_message, response_format)
+
+    with span("call_qwen", **_llm_span_attributes(prompt)) as trace_span:
+        # Stays True only if the answer came from cache or a concurrent identical call
+        trace_span.set_attribute("llm.cached", True)
+
+        def fetch() -> str:
+            trace_span.set_attribute("llm.cached", False)
+            tokens = estimate_tokens(prompt + system_message)
+            queued = 0.0
+
+            def send():
+                nonlocal queued
+                # Every attempt (retry or hedge) spends rate limit budget; queueing
+                # is timed apart from the upstream call
+                queued += get_rate_limit_scheduler().acquire(tokens)
+                trace_span.set_attribute("llm.queue_ms", round(queued * 1000, 3))
+                start = time.perf_counter()
+                try:
+                    # Shared pooled client keeps the OpenRouter connection alive between calls
+                    return get_http_client().post(**request, extensions=trace_extensions(trace_span))
+                finally:
+                    LLM_UPSTREAM_SECONDS.labels(QWEN_MODEL).observe(time.perf_counter() - start)
+
+            response = call_with_resilience("openrouter", send)
+            trace_span.set_attribute("http.status_code", response.status_code)
+            response.raise_for_status()
+            return response.json()["choices"][0]["message"]["content"]
+
+        # Identical deterministic requests are answered from cache or share one call
+        return cached_completion(request["json"], fetch, use_cache=use_cache)
+
+
+async def call_qwen_async(prompt: str, system_message: str, use_cache: bool = True) -> str:
+    request = _qwen_request(prompt, system_message)
+    with span("call_qwen", **_llm_span_attributes(prompt)) as trace_span:
+        cache = get_llm_cache()
+        key = llm_cache_key(request["json"])
+        if cache is not None and use_cache and not llm_cache_bypassed():
+            cached = cache.get(key)
+            if cached is not None:
+                trace_span.set_attribute("llm.cached", True)
+                return cached
+
+        tokens = estimate_tokens(prompt + system_message)
+        queued = 0.0
+
+        async def send():
+            nonlocal queued
+            # Every attempt (retry or hedge) spends rate limit budget
+            queued += await get_rate_limit_scheduler().acquire_async(tokens)
+            trace_span.set_attribute("llm.queue_ms", round(queued * 1000, 3))
+            trace = async_http_trace(trace_span)
+            start = time.perf_counter()
+            try:
+                return await get_async_http_client().post(**request, extensions={"trace": trace} if trace else {})
+            finally:
+                LLM_UPSTREAM_SECONDS.labels(QWEN_MODEL).observe(time.perf_counter() - start)
+
+        response = await call_with_resilience_async("openrouter", send)
+        trace_span.set_attribute("http.status_code", response.status_code)
+        response.raise_for_status()
+        content = response.json()["choices"][0]["message"]["content"]
+        if cache is not None:
+            cache.set(key, content)
+        return content
 
 
 # --- Extraction Functions ---
+ABSTRACT_SUMMARY_PROMPT = (
+    "You are a highly skilled AI trained in language comprehension and summarization. "
+    "Read the following meeting transcript and summarize it into a concise abstract paragraph. "
+    "Retain the most important points, avoid unnecessary details, and ensure clarity."
+)
+KEY_POINTS_PROMPT = (
+    "You are an expert at distilling conversations into key points. "
+    "From the transcript below, extract 3–7 main discussion points that capture the essence of the meeting. "
+    "Present them as a numbered or bulleted list."
+)
+ACTION_ITEMS_PROMPT = (
+    "You are an AI that identifies tasks and responsibilities from meetings. "
+    "Review the transcript and list all action items: who is responsible for what, and by when (if mentioned). "
+    "Format as a clear list with assignees and deadlines where possible."
+)
+SENTIMENT_PROMPT = (
+    "Analyze the overall sentiment of this meeting transcript. "
+    "Is the tone positive, neutral, or negative? Consider collaboration, urgency, satisfaction, or frustration. "
+    "Provide a short paragraph with your reasoning."
+)
+
+
+SECTION_PROMPTS = {
+    "abstract_summary": ABSTRACT_SUMMARY_PROMPT,
+    "key_points": KEY_POINTS_PROMPT,
+    "action_items": ACTION_ITEMS_PROMPT,
+    "sentiment": SENTIMENT_PROMPT,
+}
+
+# Prompts that merge the partial results of consecutive transcript chunks
+REDUCE_PROMPTS = {
+    "abstract_summary": (
+        "You are given summaries of consecutive parts of a single meeting, in order. "
+        "Combine them into one concise abstract paragraph for the whole meeting. "
+        "Retain the most important points, avoid repetition, and ensure clarity."
+    ),
+    "key_points": (
+        "You are given key points extracted from consecutive parts of a single meeting, in order. "
+        "Merge them into 3–7 main discussion points for the whole meeting, removing duplicates. "
+        "Present them as a numbered or bulleted list."
+    ),
+    "action_items": (
+        "You are given action items extracted from consecutive parts of a single meeting, in order. "
+        "Merge them into one list of all action items, removing duplicates and keeping assignees and deadlines. "
+        "Format as a clear list with assignees and deadlines where possible."
+    ),
+    "sentiment": (
+        "You are given sentiment analyses of consecutive parts of a single meeting, in order. "
+        "Combine them into one short paragraph: is the overall tone positive, neutral, or negative, "
+        "and how did it change during the meeting? Provide your reasoning."
+    ),
+}
+
+
 def abstract_summary_extraction(transcription: str) -> str:
-    system_msg = (
-        "You are a highly skilled AI trained in language comprehension and summarization. "
-        "Read the following meeting transcript and summarize it into a concise abstract paragraph. "
-        "Retain the most important points, avoid unnecessary details, and ensure clarity."
-    )
-    return call_qwen(transcription, system_msg)
+    return call_qwen(transcription, ABSTRACT_SUMMARY_PROMPT)
 
 
 def key_points_extraction(transcription: str) -> str:
-    system_msg = (
-        "You are an expert at distilling conversations into key points. "
-        "From the transcript below, extract 3–7 main discussion points that capture the essence of the meeting. "
-        "Present them as a numbered or bulleted list."
-    )
-    return call_qwen(transcription, system_msg)
+    return call_qwen(transcription, KEY_POINTS_PROMPT)
 
 
 def action_item_extraction(transcription: str) -> str:
-    system_msg = (
-        "You are an AI that identifies tasks and responsibilities from meetings. "
-        "Review the transcript and list all action items: who is responsible for what, and by when (if mentioned). "
-        "Format as a clear list with assignees and deadlines where possible."
-    )
-    return call_qwen(transcription, system_msg)
+    return call_qwen(transcription, ACTION_ITEMS_PROMPT)
 
 
 def sentiment_analysis(transcription: str) -> str:
-    system_msg = (
-        "Analyze the overall sentiment of this meeting transcript. "
-        "Is the tone positive, neutral, or negative? Consider collaboration, urgency, satisfaction, or frustration. "
-        "Provide a short paragraph with your reasoning."
-    )
-    return call_qwen(transcription, system_msg)
+    return call_qwen(transcription, SENTIMENT_PROMPT)
+
+
+# --- Long transcripts ---
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def _split_oversized(piece: str, max_tokens: int) -> List[str]:
+    """Break a single piece that exceeds the budget at sentence, then word, boundaries."""
+    parts = re.split(r"(?<=[.!?])\s+", piece)
+    if len(parts) == 1:
+        parts = piece.split()
+    chunks, current = [], ""
+    for part in parts:
+        candidate = f"{current} {part}".strip()
+        if current and estimate_tokens(candidate) > max_tokens:
+            chunks.append(current)
+            candidate = part
+        current = candidate
+    if current:
+        chunks.append(current)
+    # A single enormous word still needs splitting
+    limit = max_tokens * 4
+    return [chunk[i:i + limit] for chunk in chunks for i in range(0, len(chunk), limit)]
+
+
+def split_transcript(transcription: str, max_tokens: int = MINUTES_CHUNK_TOKENS) -> List[str]:
+    """Split a transcript into chunks of at most ``max_tokens`` along segment boundaries.
+
+    Transcript lines (speaker turns or Whisper segments) are kept whole and
+    packed greedily; only lines longer than the budget are split further.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for line in transcription.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        pieces = [line] if estimate_tokens(line) <= max_tokens else _split_oversized(line, max_tokens)
+        for piece in pieces:
+            tokens = estimate_tokens(piece) + 1
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _reduce_section(
+    section: str,
+    partials: List[str],
+    max_tokens: int,
+    pool: ThreadPoolExecutor,
+    limit: threading.Semaphore,
+) -> str:
+    """Merge partial results for one section, in several rounds if they exceed the budget."""
+    while len(partials) > 1:
+        groups: List[List[str]] = [[]]
+        group_tokens = 0
+        for partial in partials:
+            tokens = estimate_tokens(partial)
+            if groups[-1] and group_tokens + tokens > max_tokens:
+                groups.append([])
+                group_tokens = 0
+            groups[-1].append(partial)
+            group_tokens += tokens
+        if len(groups) == len(partials):
+            # Every partial fills the budget on its own; merge pairwise to make progress
+            groups = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+
+        def merge(group: List[str]) -> str:
+            if len(group) == 1:
+                return group[0]
+            body = "\n\n".join(f"Part {i}:\n{text}" for i, text in enumerate(group, start=1))
+            with limit:
+                return call_qwen(body, REDUCE_PROMPTS[section])
+
+        futures = [pool.submit(contextvars.copy_context().run, merge, group) for group in groups]
+        partials = [future.result() for future in futures]
+    return partials[0]
+
+
+def meeting_minutes_map_reduce(
+    transcription: str,
+    max_chunk_tokens: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> dict:
+    """Generate minutes for a long transcript with a map pass and a reduce pass.
+
+    The transcript is split into token-budgeted chunks, every extractor runs
+    over every chunk in parallel (map), and the partial results of each
+    section are merged by a reduce prompt. Generation time scales with the
+    available concurrency instead of the transcript length. ``timings``
+    receives the map phase duration under "map" and each section's reduce
+    duration under its section key.
+    """
+    max_tokens = max_chunk_tokens or MINUTES_CHUNK_TOKENS
+    chunks = split_transcript(transcription, max_tokens)
+    workers = max(1, max_concurrency or MINUTES_MAX_CONCURRENCY)
+    logger.info(f"Map-reduce minutes over {len(chunks)} chunks")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="minutes") as pool:
+        start = time.perf_counter()
+        futures = {
+            (section, index): pool.submit(contextvars.copy_context().run, call_qwen, chunk, prompt)
+            for section, prompt in SECTION_PROMPTS.items()
+            for index, chunk in enumerate(chunks)
+        }
+        partials = {
+            section: [futures[(section, index)].result() for index in range(len(chunks))]
+            for section in SECTION_PROMPTS
+        }
+        map_latency = time.perf_counter() - start
+        if timings is not None:
+            timings["map"] = map_latency
+        observe_stage("minutes_map_reduce", "map", map_latency)
+        logger.info(f"Map phase took {map_latency:.2f}s")
+
+    # Reduce sections side by side; each reduce uses its own pool so nested
+    # merge rounds never wait on a worker held by another section, while one
+    # semaphore shared by all sections caps the LLM calls in flight at ``workers``
+    minutes = {}
+    limit = threading.Semaphore(workers)
+    with ThreadPoolExecutor(max_workers=len(SECTION_PROMPTS), thread_name_prefix="reduce") as section_pool:
+        def reduce(section: str):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="merge") as pool:
+                result = _reduce_section(section, partials[section], max_tokens, pool, limit)
+            return result, time.perf_counter() - start
+
+        futures = {
+            section: section_pool.submit(contextvars.copy_context().run, reduce, section)
+            for section in SECTION_PROMPTS
+        }
+        for section, future in futures.items():
+            minutes[section], latency = future.result()
+            if timings is not None:
+                timings[section] = latency
+            observe_stage("minutes_map_reduce", section, latency)
+            logger.info(f"{section} reduce took {latency:.2f}s")
+    return minutes
+
+
+# --- Single-call structured extraction ---
+STRUCTURED_MINUTES_PROMPT = (
+    "You are an expert meeting assistant. Read the meeting transcript and return one JSON object "
+    "with exactly these fields:\n"
+    '- "abstract_summary": a concise abstract paragraph retaining the most important points.\n'
+    '- "key_points": a list of 3–7 main discussion points.\n'
+    '- "action_items": a list of action items, each saying who is responsible for what, '
+    "and by when if mentioned.\n"
+    '- "sentiment": a short paragraph on whether the tone is positive, neutral, or negative, with your reasoning.\n'
+    "Return only the JSON object."
+)
+
+MINUTES_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "abstract_summary": {"type": "string"},
+        "key_points": {"type": "array", "items": {"type": "string"}},
+        "action_items": {"type": "array", "items": {"type": "string"}},
+        "sentiment": {"type": "string"},
+    },
+    "required": list(SECTION_PROMPTS),
+    "additionalProperties": False,
+}
+
+MINUTES_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "meeting_minutes", "strict": True, "schema": MINUTES_JSON_SCHEMA},
+}
+
+
+def _repair_json(text: str) -> Optional[dict]:
+    """Parse a model's JSON answer, repairing common defects (fences, prose, trailing commas, truncation)."""
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    start = text.find("{")
+    if start < 0:
+        return None
+    end = text.rfind("}")
+    candidates = [text[start:end + 1]] if end > start else []
+    candidates.append(text[start:])
+    for candidate in candidates:
+        candidate = re.sub(r",\s*([}\]])", r"\1", candidate)
+        for attempt in (candidate, _close_json(candidate)):
+            try:
+                parsed = json.loads(attempt)
+            except ValueError:
+                continue
+            if isinstance(parsed, dict):
+                return parsed
+    return None
+
+
+def _close_json(text: str) -> str:
+    """Close the strings, arrays and objects left open by a truncated JSON answer."""
+    stack: List[str] = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+    closed = text + ('"' if in_string else "")
+    closed = re.sub(r",\s*$", "", closed)
+    return closed + "".join(reversed(stack))
+
+
+def _format_section(value) -> Optional[str]:
+    """Turn a JSON field into the text shape the per-section extractors return."""
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, list):
+        items = []
+        for item in value:
+            if isinstance(item, dict):
+                # e.g. {"owner": ..., "task": ..., "due": ...}
+                item = " — ".join(str(part) for part in item.values() if part)
+            item = str(item).strip()
+            if item:
+                items.append(f"- {item}")
+        return "\n".join(items) or None
+    return None
+
+
+def parse_structured_minutes(text: str) -> Dict[str, str]:
+    """Sections found in a structured (JSON) answer; missing or empty ones are left out."""
+    parsed = _repair_json(text) or {}
+    sections = {}
+    for section in SECTION_PROMPTS:
+        formatted = _format_section(parsed.get(section))
+        if formatted:
+            sections[section] = formatted
+    return sections
+
+
+def meeting_minutes_structured(
+    transcription: str,
+    max_concurrency: Optional[int] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> dict:
+    """Generate minutes with one schema-constrained JSON call.
+
+    The transcript is sent once instead of once per section. Sections the
+    answer lacks (or that cannot be parsed) are filled in by their regular
+    extractors, as are all sections if the JSON call itself fails. ``timings`` receives the JSON call's latency under
+    "structured" and each fallback extractor's latency under its section.
+    """
+    start = time.perf_counter()
+    try:
+        with span("structured_extraction"):
+            answer = call_qwen(transcription, STRUCTURED_MINUTES_PROMPT, response_format=MINUTES_RESPONSE_FORMAT)
+    except Exception as e:
+        # E.g. a model that rejects response_format, or a timeout: every section falls back
+        logger.error(f"Structured minutes call failed: {e}")
+        answer = None
+    latency = time.perf_counter() - start
+    if timings is not None:
+        timings["structured"] = latency
+    observe_stage("minutes", "structured", latency)
+
+    minutes = parse_structured_minutes(answer) if answer is not None else {}
+    missing = [section for section in SECTION_PROMPTS if section not in minutes]
+    if missing:
+        logger.warning(f"Structured minutes lacked {', '.join(missing)}; running their extractors")
+        extractors = _extractors()
+        workers = max(1, min(len(missing), max_concurrency or MINUTES_MAX_CONCURRENCY))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="minutes") as pool:
+            futures = {
+                key: pool.submit(contextvars.copy_context().run, _timed_call, extractors[key], transcription)
+                for key in missing
+            }
+            for key, future in futures.items():
+                minutes[key], latency = future.result()
+                if timings is not None:
+                    timings[key] = latency
+                observe_stage("minutes", key, latency)
+    return {section: minutes[section] for section in SECTION_PROMPTS}
 
 
 # --- Main function ---
-def meeting_minutes(transcription: str) -> dict:
+def _extractors() -> dict:
     return {
-        "abstract_summary": abstract_summary_extraction(transcription),
-        "key_points": key_points_extraction(transcription),
-        "action_items": action_item_extraction(transcription),
-        "sentiment": sentiment_analysis(transcription),
+        "abstract_summary": abstract_summary_extraction,
+        "key_points": key_points_extraction,
+        "action_items": action_item_extraction,
+        "sentiment": sentiment_analysis,
     }
 
+
+def _timed_call(func, transcription: str):
+    start = time.perf_counter()
+    with span(func.__name__):
+        result = func(transcription)
+    return result, time.perf_counter() - start
+
+
+def meeting_minutes(
+    transcription: str,
+    max_concurrency: Optional[int] = None,
+    timings: Optional[Dict[str, float]] = None,
+    single_call: Optional[bool] = None,
+) -> dict:
+    """Run the four extractors concurrently and merge their results.
+
+    End-to-end latency is roughly that of the slowest extractor rather than
+    the sum of all four. Per-extractor latency in seconds is logged and, when
+    a ``timings`` dict is passed, written into it under each section key.
+    Transcripts longer than MINUTES_MAP_REDUCE_TOKENS go through
+    meeting_minutes_map_reduce instead. With ``single_call`` (default
+    MINUTES_SINGLE_CALL) the sections come from meeting_minutes_structured.
+    """
+    if MINUTES_MAP_REDUCE_TOKENS and estimate_tokens(transcription) > MINUTES_MAP_REDUCE_TOKENS:
+        return meeting_minutes_map_reduce(transcription, max_concurrency=max_concurrency, timings=timings)
+
+    if MINUTES_SINGLE_CALL if single_call is None else single_call:
+        return meeting_minutes_structured(transcription, max_concurrency=max_concurrency, timings=timings)
+
+    extractors = _extractors()
+    workers = max(1, min(len(extractors), max_concurrency or MINUTES_MAX_CONCURRENCY))
+
+    minutes = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="minutes") as pool:
+        # Copy the caller's context so settings like cache bypass reach the workers
+        futures = {
+            key: pool.submit(contextvars.copy_context().run, _timed_call, func, transcription)
+            for key, func in extractors.items()
+        }
+        for key, future in futures.items():
+            minutes[key], latency = future.result()
+            if timings is not None:
+                timings[key] = latency
+            observe_stage("minutes", key, latency)
+            logger.info(f"{key} extraction took {latency:.2f}s")
+    return minutes
+
+
+# --- Incremental minutes ---
+# Prompts that fold the next part of a transcript into a section's running result
+UPDATE_PROMPTS = {
+    "abstract_summary": (
+        "You maintain the summary of a meeting that is still in progress. You are given the current "
+        "summary and the next part of the transcript. Rewrite the summary as one concise abstract "
+        "paragraph for the whole meeting so far. Retain the most important points, avoid unnecessary "
+        "details, and ensure clarity."
+    ),
+    "key_points": (
+        "You maintain the key points of a meeting that is still in progress. You are given the current "
+        "key points and the next part of the transcript. Update them so they cover the whole meeting so "
+        "far: 3–7 main discussion points, merging new topics in and removing duplicates. "
+        "Present them as a numbered or bulleted list."
+    ),
+    "action_items": (
+        "You maintain the action items of a meeting that is still in progress. You are given the current "
+        "list and the next part of the transcript. Keep every existing item, update items the new part "
+        "changes, and add new ones: who is responsible for what, and by when (if mentioned). "
+        "Format as a clear list with assignees and deadlines where possible."
+    ),
+    "sentiment": (
+        "You maintain a sentiment analysis of a meeting that is still in progress. You are given the "
+        "current analysis and the next part of the transcript. Update it for the whole meeting so far: "
+        "is the tone positive, neutral, or negative, and how has it changed? "
+        "Provide a short paragraph with your reasoning."
+    ),
+}
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _sign_state(minutes: Dict[str, str], consumed: int, digest: str) -> str:
+    payload = json.dumps([minutes, consumed, digest], sort_keys=True).encode("utf-8")
+    return hmac.new(MINUTES_STATE_SECRET.encode("utf-8"), payload, hashlib.sha256).hexdigest()
+
+
+def _fold_section(section: str, current: str, delta: str) -> str:
+    prompt = f"Current {section.replace('_', ' ')}:\n{current}\n\nNext part of the transcript:\n{delta}"
+    with span("fold_section", **{"minutes.section": section}):
+        return call_qwen(prompt, UPDATE_PROMPTS[section])
+
+
+class IncrementalMinutes:
+    """Minutes of a growing transcript that are updated from the new text only.
+
+    The first update runs the regular extractors. Later updates send each
+    section's current result together with the transcript text added since
+    the previous update, so their cost follows the size of the new text
+    rather than the length of the meeting. If the transcript no longer
+    starts with the text already folded in (it was edited), the minutes
+    are rebuilt from scratch.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.max_concurrency = max_concurrency
+        self.minutes: Dict[str, str] = {}
+        self.consumed = 0  # Characters of the transcript folded in so far
+        self.digest = _digest("")
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        self.minutes = {}
+        self.consumed = 0
+        self.digest = _digest("")
+
+    def _delta(self, transcription: str) -> Optional[str]:
+        """Text added since the last update, or None if the folded text changed."""
+        if len(transcription) < self.consumed or _digest(transcription[:self.consumed]) != self.digest:
+            return None
+        return transcription[self.consumed:]
+
+    def update(self, transcription: str, timings: Optional[Dict[str, float]] = None) -> dict:
+        """Bring the minutes up to date with ``transcription`` (the full transcript so far).
+
+        ``timings`` receives each section's latency for this update.
+        """
+        with self._lock:
+            delta = self._delta(transcription)
+            if delta is None:
+                logger.info("Transcript changed since the last update; rebuilding minutes")
+                self.reset()
+                delta = transcription
+            if delta.strip():
+                if self.minutes:
+                    self._fold(delta, timings)
+                else:
+                    self.minutes = meeting_minutes(delta, max_concurrency=self.max_concurrency, timings=timings)
+            self.consumed = len(transcription)
+            self.digest = _digest(transcription)
+            return dict(self.minutes)
+
+    def _fold(self, delta: str, timings: Optional[Dict[str, float]]) -> None:
+        """Fold new transcript text into every section, a token-budgeted chunk at a time."""
+        chunks = split_transcript(delta, MINUTES_CHUNK_TOKENS)
+        workers = max(1, min(len(UPDATE_PROMPTS), self.max_concurrency or MINUTES_MAX_CONCURRENCY))
+        latencies = dict.fromkeys(UPDATE_PROMPTS, 0.0)
+        # Folded into a copy: if any call fails, the minutes stay as they were
+        # and a retry does not fold the same text in twice
+        minutes = dict(self.minutes)
+
+        def fold(section: str, chunk: str):
+            start = time.perf_counter()
+            result = _fold_section(section, minutes[section], chunk)
+            return result, time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="minutes") as pool:
+            # Chunks are folded in order; the sections of one chunk run side by side
+            for chunk in chunks:
+                futures = {
+                    section: pool.submit(contextvars.copy_context().run, fold, section, chunk)
+                    for section in UPDATE_PROMPTS
+                }
+                for section, future in futures.items():
+                    minutes[section], latency = future.result()
+                    latencies[section] += latency
+        self.minutes = minutes
+
+        for section, latency in latencies.items():
+            if timings is not None:
+                timings[section] = latency
+            observe_stage("minutes_incremental", section, latency)
+            logger.info(f"{section} update took {latency:.2f}s")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """State that lets a later request continue from this one (signed, since clients hold it)."""
+        return {
+            "minutes": dict(self.minutes),
+            "consumed": self.consumed,
+            "digest": self.digest,
+            "signature": _sign_state(self.minutes, self.consumed, self.digest),
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any], max_concurrency: Optional[int] = None) -> "IncrementalMinutes":
+        """Restore state returned by to_dict().
+
+        State whose signature does not match (altered by the client, or
+        issued under another secret) is ignored, and the next update
+        rebuilds the minutes from the full transcript.
+
+        Raises:
+            ValueError: If ``state`` is malformed
+        """
+        engine = cls(max_concurrency=max_concurrency)
+        if not state:
+            return engine
+        if not isinstance(state, dict):
+            raise ValueError("state must be an object")
+        minutes = state.get("minutes")
+        consumed = state.get("consumed")
+        digest = state.get("digest")
+        signature = state.get("signature")
+        if (
+            not isinstance(minutes, dict)
+            or set(minutes) != set(UPDATE_PROMPTS)
+            or not all(isinstance(value, str) for value in minutes.values())
+        ):
+            raise ValueError(f"state.minutes must have string fields {sorted(UPDATE_PROMPTS)}")
+        if isinstance(consumed, bool) or not isinstance(consumed, int) or consumed < 0:
+            raise ValueError("state.consumed must be a non-negative integer")
+        if not isinstance(digest, str) or not isinstance(signature, str):
+            raise ValueError("state.digest and state.signature must be strings")
+
+        if not hmac.compare_digest(signature, _sign_state(minutes, consumed, digest)):
+            logger.warning("Ignoring incremental minutes state with an invalid signature")
+            return engine
+        engine.minutes = dict(minutes)
+        engine.consumed = consumed
+        engine.digest = digest
+        return engine
+
+
+async def meeting_minutes_async(
+    transcription: str,
+    max_concurrency: Optional[int] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> dict:
+    """Async variant of meeting_minutes using the pooled async HTTP client."""
+    prompts = SECTION_PROMPTS
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or MINUTES_MAX_CONCURRENCY))
+
+    async def run(system_msg: str):
+        async with semaphore:
+            start = time.perf_counter()
+            result = await call_qwen_async(transcription, system_msg)
+            return result, time.perf_counter() - start
+
+    results = await asyncio.gather(*(run(msg) for msg in prompts.values()))
+    minutes = {}
+    for key, (result, latency) in zip(prompts, results):
+        minutes[key] = result
+        if timings is not None:
+            timings[key] = latency
+        observe_stage("minutes", key, latency)
+        logger.info(f"{key} extraction took {latency:.2f}s")
+    return minutes
@@ -15,11 +15,17 @@ def run_tests(test_type="all", coverage=False, verbose=False, marker=None):
     Run tests with specified options.
     
     Args:
-        test_type: Type of tests to run (all, unit, integration, slow)
+        test_type: Type of tests to run (all, unit, integration, slow, benchmark)
         coverage: Whether to generate coverage report
         verbose: Verbose output
         marker: Pytest marker to filter tests
     """
+    if test_type == "benchmark":
+        # Timed against stored baselines rather than pass/fail assertions
+        cmd = ["python", "-m", "benchmarks"]
+        print(f"Running: {' '.join(cmd)}")
+        return subprocess.call(cmd)
+    
     cmd = ["python", "-m", "pytest"]
     
     # Add test path based on type
@@ -74,7 +80,7 @@ def main():
     parser = argparse.ArgumentParser(description="Run Minute Maker tests")
     parser.add_argument(
         "--type", 
-        choices=["all", "unit", "integration", "slow"],
+        choices=["all", "unit", "integration", "slow", "benchmark"],
         default="all",
         help="Type of tests to run"
     )
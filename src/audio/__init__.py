@@ -1,5 +1,6 @@
 """Audio processing module for Minute Maker."""
 
 from .whisper_service import WhisperService, create_whisper_service
+from .model_registry import ModelRegistry, get_model_registry
 
-__all__ = ["WhisperService", "create_whisper_service"]
\ No newline at end of file
+__all__ = ["WhisperService", "create_whisper_service", "ModelRegistry", "get_model_registry"]
\ No newline at end of file
@@ -0,0 +1,476 @@
+"""
+Live transcription of audio that is still being recorded.
+
+Audio arrives in small frames. Every ``step_seconds`` the model re-transcribes
+the uncommitted tail of the recording, and a local-agreement policy commits
+the words that consecutive hypotheses agree on. Committed words never
+change; the rest is sent as a tentative guess. Committed audio is trimmed
+from the buffer, so each pass stays short no matter how long the meeting
+runs, and when the meeting stops only that short tail is left to finish.
+"""
+
+import re
+import json
+import shutil
+import logging
+import threading
+import subprocess
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+# Provide safe defaults for optional dependencies so tests can patch them
+np = None  # type: ignore
+
+try:
+    import numpy as np  # type: ignore  # noqa: F401  (reassigns above placeholder)
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from ..utils.audio_utils import SAMPLE_RATE, resample
+
+
+logger = logging.getLogger(__name__)
+
+# (start seconds, end seconds, text) on the recording's timeline
+Word = Tuple[float, float, str]
+
+# Longest run of words checked when a new hypothesis repeats the committed tail
+_MAX_OVERLAP_WORDS = 5
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def hypothesis_words(result: Dict[str, Any], offset: float = 0.0) -> List[Word]:
+    """
+    Words of a transcription result on the recording's timeline.
+
+    Uses per-word timings when the model returned them; otherwise each
+    segment's time is shared out evenly between its words.
+
+    Args:
+        result: Whisper result with "segments"
+        offset: Recording time of the transcribed audio's first sample
+    """
+    words: List[Word] = []
+    for segment in result.get("segments", []):
+        if segment.get("words"):
+            for word in segment["words"]:
+                text = word.get("word", "").strip()
+                if text:
+                    words.append((offset + word["start"], offset + word["end"], text))
+            continue
+        texts = segment.get("text", "").split()
+        if not texts:
+            continue
+        start, end = float(segment.get("start", 0.0)), float(segment.get("end", 0.0))
+        step = (end - start) / len(texts)
+        for i, text in enumerate(texts):
+            words.append((offset + start + i * step, offset + start + (i + 1) * step, text))
+    return words
+
+
+def words_to_segment(words: List[Word]) -> Optional[Dict[str, Any]]:
+    """Join consecutive words into one {start, end, text} segment."""
+    if not words:
+        return None
+    return {"start": words[0][0], "end": words[-1][1], "text": " ".join(word[2] for word in words)}
+
+
+class LocalAgreement:
+    """
+    Commit policy for re-transcribed audio (LocalAgreement-n).
+
+    A word is committed once ``n`` consecutive hypotheses agree on it and
+    on every word before it. Earlier, disagreeing words stay tentative.
+    """
+
+    def __init__(self, n: int = 2):
+        """
+        Initialize policy.
+
+        Args:
+            n: Consecutive hypotheses that must agree (2 is the usual choice)
+        """
+        self.n = max(1, n)
+        self.committed: List[Word] = []
+        self._previous: Deque[List[Word]] = deque(maxlen=self.n - 1)
+
+    @property
+    def committed_until(self) -> float:
+        """Recording time up to which the transcript is final."""
+        return self.committed[-1][1] if self.committed else 0.0
+
+    def _new_words(self, hypothesis: List[Word]) -> List[Word]:
+        """Drop words of a hypothesis that repeat what is already committed."""
+        # Words that end before the commit point were already decided
+        words = [word for word in hypothesis if word[1] > self.committed_until + 0.05]
+        if not words or not self.committed:
+            return words
+        # The audio just before the commit point is often transcribed again;
+        # strip the longest prefix that repeats the committed tail
+        for size in range(min(_MAX_OVERLAP_WORDS, len(words), len(self.committed)), 0, -1):
+            tail = [_normalize(word[2]) for word in self.committed[-size:]]
+            head = [_normalize(word[2]) for word in words[:size]]
+            if tail == head:
+                return words[size:]
+        return words
+
+    def update(self, hypothesis: List[Word]) -> Tuple[List[Word], List[Word]]:
+        """
+        Take the latest hypothesis for the uncommitted audio.
+
+        Args:
+            hypothesis: Words of the latest transcription pass
+
+        Returns:
+            (newly committed words, tentative words)
+        """
+        words = self._new_words(hypothesis)
+        if len(self._previous) < self.n - 1:
+            self._previous.append(words)
+            return [], words
+
+        agreed = 0
+        for i, word in enumerate(words):
+            key = _normalize(word[2])
+            if all(i < len(previous) and _normalize(previous[i][2]) == key for previous in self._previous):
+                agreed = i + 1
+            else:
+                break
+        new = words[:agreed]
+        self.committed.extend(new)
+        tentative = words[agreed:]
+        if self._previous.maxlen:
+            # Later hypotheses are compared with what is still uncommitted
+            self._previous = deque(
+                (previous[agreed:] for previous in self._previous), maxlen=self.n - 1
+            )
+            self._previous.append(tentative)
+        return new, tentative
+
+    def flush(self, hypothesis: List[Word]) -> List[Word]:
+        """Commit everything in a final hypothesis (the recording has ended)."""
+        words = self._new_words(hypothesis)
+        self.committed.extend(words)
+        self._previous.clear()
+        return words
+
+
+class LiveTranscriber:
+    """Incremental transcription of a growing recording with a local-agreement policy."""
+
+    def __init__(
+        self,
+        service,
+        step_seconds: float = 1.0,
+        max_buffer_seconds: float = 15.0,
+        agreement: int = 2,
+        language: Optional[str] = None,
+    ):
+        """
+        Initialize transcriber.
+
+        Args:
+            service: WhisperService with a local model (transcribe_samples)
+            step_seconds: New audio needed before the model runs again
+            max_buffer_seconds: Uncommitted audio kept before forcing a trim
+            agreement: Consecutive hypotheses that must agree to commit a word
+            language: Language code; detected by the model if None
+        """
+        self.service = service
+        self.step_seconds = step_seconds
+        self.max_buffer_seconds = max_buffer_seconds
+        self.language = language
+        self.policy = LocalAgreement(agreement)
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._offset = 0.0  # Recording time of the buffer's first sample
+        self._pending = 0  # Samples received since the last pass
+        self._received = 0
+
+    @property
+    def duration(self) -> float:
+        """Seconds of audio received so far."""
+        return self._received / SAMPLE_RATE
+
+    def insert_audio(self, samples) -> None:
+        """Append 16 kHz mono float32 samples."""
+        if not len(samples):
+            return
+        self._audio = np.concatenate([self._audio, np.asarray(samples, dtype=np.float32)])
+        self._pending += len(samples)
+        self._received += len(samples)
+
+    def ready(self) -> bool:
+        """Whether enough new audio has arrived for another pass."""
+        return self._pending >= self.step_seconds * SAMPLE_RATE
+
+    def _transcribe_buffer(self) -> List[Word]:
+        # Committed text primes the model so the next words follow on naturally
+        prompt = " ".join(word[2] for word in self.policy.committed[-30:]) or None
+        result = self.service.transcribe_samples(
+            self._audio, language=self.language, prompt=prompt, word_timestamps=True
+        )
+        if self.language is None and result.get("language"):
+            # Keep the language the model settled on instead of re-detecting each pass
+            self.language = result["language"]
+        return hypothesis_words(result, self._offset)
+
+    def _trim(self, until: float) -> None:
+        """Drop buffered audio before recording time ``until``."""
+        cut = int((until - self._offset) * SAMPLE_RATE)
+        if cut > 0:
+            self._audio = self._audio[cut:]
+            self._offset += cut / SAMPLE_RATE
+
+    def process(self) -> Dict[str, Any]:
+        """
+        Re-transcribe the uncommitted audio and apply the commit policy.
+
+        Returns:
+            {"committed": segment or None, "tentative": segment or None,
+             "committed_until": seconds}
+        """
+        self._pending = 0
+        new, tentative = self.policy.update(self._transcribe_buffer())
+
+        if self._offset + len(self._audio) / SAMPLE_RATE - self.policy.committed_until <= self.max_buffer_seconds:
+            # Committed audio is no longer needed
+            self._trim(self.policy.committed_until)
+        else:
+            # Nothing stable for too long (e.g. one endless sentence): keep the latest window
+            self._trim(self._offset + len(self._audio) / SAMPLE_RATE - self.max_buffer_seconds)
+
+        return {
+            "committed": words_to_segment(new),
+            "tentative": words_to_segment(tentative),
+            "committed_until": self.policy.committed_until,
+        }
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Transcribe the remaining audio and commit everything.
+
+        Returns:
+            {"committed": last segment, "text": full transcript,
+             "segments": committed segments, "duration": seconds}
+        """
+        new: List[Word] = []
+        if len(self._audio) >= SAMPLE_RATE // 10:
+            new = self.policy.flush(self._transcribe_buffer())
+        self._audio = self._audio[:0]
+        self._pending = 0
+        words = self.policy.committed
+        return {
+            "committed": words_to_segment(new),
+            "text": " ".join(word[2] for word in words),
+            "segments": _sentences(words),
+            "duration": self.duration,
+        }
+
+
+def _sentences(words: List[Word]) -> List[Dict[str, Any]]:
+    """Group committed words into sentence-like segments."""
+    segments: List[Dict[str, Any]] = []
+    current: List[Word] = []
+    for word in words:
+        current.append(word)
+        if word[2].endswith((".", "?", "!")):
+            segments.append(words_to_segment(current))
+            current = []
+    if current:
+        segments.append(words_to_segment(current))
+    return segments
+
+
+class PcmDecoder:
+    """Raw little-endian PCM frames (s16le or f32le, mono) to 16 kHz float32."""
+
+    def __init__(self, encoding: str = "pcm_s16le", sample_rate: int = SAMPLE_RATE):
+        if encoding not in ("pcm_s16le", "pcm_f32le"):
+            raise ValueError(f"Unsupported PCM encoding: {encoding}")
+        self.dtype = np.dtype("<i2") if encoding == "pcm_s16le" else np.dtype("<f4")
+        self.sample_rate = sample_rate
+        self._remainder = b""
+
+    def feed(self, data: bytes):
+        data = self._remainder + data
+        usable = len(data) - len(data) % self.dtype.itemsize
+        self._remainder = data[usable:]
+        samples = np.frombuffer(data[:usable], self.dtype).astype(np.float32)
+        if self.dtype.kind == "i":
+            samples /= 32768.0
+        return resample(samples, self.sample_rate, SAMPLE_RATE)
+
+    def close(self):
+        return np.zeros(0, dtype=np.float32)
+
+
+class FfmpegStreamDecoder:
+    """
+    Compressed stream (e.g. WebM/Opus from MediaRecorder) to 16 kHz float32 via ffmpeg.
+
+    Decoded samples are collected by a reader thread and handed out by the
+    next feed() call, so feeding never blocks on ffmpeg's output.
+    """
+
+    def __init__(self, ffmpeg: str = "ffmpeg"):
+        executable = shutil.which(ffmpeg)
+        if executable is None:
+            raise ValueError("Compressed live audio needs ffmpeg; send pcm_s16le instead")
+        self._process = subprocess.Popen(
+            [
+                executable, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+                "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "pipe:1",
+            ],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        self._chunks: List[bytes] = []
+        self._lock = threading.Lock()
+        self._pcm = PcmDecoder("pcm_s16le")
+        self._reader = threading.Thread(target=self._drain, name="live-decoder", daemon=True)
+        self._reader.start()
+
+    def _drain(self) -> None:
+        # read1 returns whatever is available instead of waiting for a full block
+        for block in iter(lambda: self._process.stdout.read1(4096), b""):
+            with self._lock:
+                self._chunks.append(block)
+
+    def _collect(self):
+        with self._lock:
+            data, self._chunks = b"".join(self._chunks), []
+        return self._pcm.feed(data)
+
+    def feed(self, data: bytes):
+        try:
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise ValueError(f"Could not decode live audio: {e}")
+        return self._collect()
+
+    def close(self):
+        """Finish decoding and return the last samples."""
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        self._reader.join(timeout=5)
+        self._process.wait(timeout=5)
+        return self._collect()
+
+
+def create_stream_decoder(options: Dict[str, Any], ffmpeg: str = "ffmpeg"):
+    """Decoder for the audio format announced in a session's start message."""
+    audio_format = options.get("format", "pcm_s16le")
+    if audio_format in ("pcm_s16le", "pcm_f32le"):
+        return PcmDecoder(audio_format, int(options.get("sample_rate", SAMPLE_RATE)))
+    return FfmpegStreamDecoder(ffmpeg)
+
+
+def serve_live_socket(
+    ws,
+    service,
+    config: Dict[str, Any],
+    receive_timeout: float = 0.05,
+    on_finish: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Run one live transcription session over a WebSocket.
+
+    Protocol (JSON text messages, binary audio frames):
+        client -> {"type": "start", "format": "pcm_s16le" | "pcm_f32le" | "webm",
+                   "sample_rate": 48000, "language": "en"}
+        client -> binary audio frames
+        client -> {"type": "stop"}
+        server -> {"type": "ready"}
+        server -> {"type": "update", "committed": seg|null, "tentative": seg|null, "committed_until": s}
+        server -> {"type": "final", "text": ..., "segments": [...], "duration": s}
+        server -> {"type": "error", "error": ...}
+
+    Inference runs between receives; frames that arrive meanwhile are read
+    in one go before the next pass, so a slow model processes larger steps
+    instead of falling behind.
+
+    Args:
+        ws: Socket with receive(timeout) -> str | bytes | None, send(str) and close()
+        service: WhisperService used for the passes
+        config: Live settings (see get_default_live_config)
+        receive_timeout: Seconds to wait for a frame before checking for work
+        on_finish: Called with the final result
+
+    Returns:
+        The final result, or None if the client disconnected first
+    """
+    def send(payload: Dict[str, Any]) -> None:
+        ws.send(json.dumps(payload))
+
+    transcriber: Optional[LiveTranscriber] = None
+    decoder = None
+    try:
+        if getattr(service, "provider", "local") not in ("local", "routing"):
+            # API providers take whole files; re-sending the window every step would be slow and costly
+            raise ValueError("Live transcription requires the local Whisper provider")
+        while True:
+            try:
+                message = ws.receive(timeout=receive_timeout)
+            except Exception:
+                # Client went away without stopping; nothing left to deliver
+                logger.info("Live session closed by client")
+                return None
+
+            if isinstance(message, str):
+                payload = json.loads(message)
+                kind = payload.get("type")
+                if kind == "start" and transcriber is None:
+                    decoder = create_stream_decoder(payload, config.get("ffmpeg", "ffmpeg"))
+                    transcriber = LiveTranscriber(
+                        service,
+                        step_seconds=config["step_seconds"],
+                        max_buffer_seconds=config["max_buffer_seconds"],
+                        agreement=config["agreement"],
+                        language=payload.get("language"),
+                    )
+                    send({"type": "ready"})
+                elif kind == "stop":
+                    break
+                continue
+
+            if message is not None:
+                if transcriber is None:
+                    # Audio without a start message: 16 kHz s16le
+                    decoder = PcmDecoder()
+                    transcriber = LiveTranscriber(
+                        service,
+                        step_seconds=config["step_seconds"],
+                        max_buffer_seconds=config["max_buffer_seconds"],
+                        agreement=config["agreement"],
+                    )
+                transcriber.insert_audio(decoder.feed(message))
+                continue
+
+            # No frame waiting: catch up on inference
+            if transcriber is not None and transcriber.ready():
+                update = transcriber.process()
+                send({"type": "update", **update})
+
+        if transcriber is None:
+            send({"type": "final", "text": "", "segments": [], "duration": 0.0})
+            return None
+        transcriber.insert_audio(decoder.close())
+        final = transcriber.finish()
+        send({"type": "final", **final})
+        if on_finish:
+            on_finish(final)
+        return final
+    except ValueError as e:
+        send({"type": "error", "error": str(e)})
+        return None
+    finally:
+        try:
+            ws.close()
+        except Exception:
+            pass
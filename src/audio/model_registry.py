@@ -0,0 +1,198 @@
+"""
+Process-wide registry of loaded Whisper models.
+
+Loading a Whisper checkpoint costs seconds and hundreds of MB, so models are
+kept in a shared registry keyed by (provider, model_name, device) and reused
+across WhisperService instances. The registry enforces a memory budget and
+evicts the least recently used models when several sizes are in use.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..utils.metrics import MODEL_LOAD_SECONDS
+
+
+logger = logging.getLogger(__name__)
+
+# (provider, model_name, device)
+ModelKey = Tuple[str, str, str]
+
+# Approximate parameter counts, used when a model cannot report its own size
+_MODEL_PARAM_COUNTS = {
+    "tiny": 39_000_000,
+    "base": 74_000_000,
+    "small": 244_000_000,
+    "medium": 769_000_000,
+    "large": 1_550_000_000,
+    "large-v2": 1_550_000_000,
+    "large-v3": 1_550_000_000,
+}
+
+# Default memory budget (4 GB) when WHISPER_MODEL_CACHE_MB is not set
+DEFAULT_MEMORY_BUDGET = 4096 * 1024 * 1024
+
+
+def estimate_model_size(model_name: str, model: Any = None) -> int:
+    """
+    Estimate the resident size of a loaded model in bytes.
+
+    Args:
+        model_name: Whisper model size name
+        model: Loaded model; its parameters are measured when available
+
+    Returns:
+        Estimated size in bytes
+    """
+    if model is not None:
+        try:
+            size = sum(p.numel() * p.element_size() for p in model.parameters())
+            if isinstance(size, int) and size > 0:
+                return size
+        except Exception:
+            pass
+    # Fall back to fp32 parameter count
+    return _MODEL_PARAM_COUNTS.get(model_name, _MODEL_PARAM_COUNTS["base"]) * 4
+
+
+class ModelRegistry:
+    """Thread-safe LRU cache of loaded models bounded by a memory budget."""
+
+    def __init__(self, memory_budget: Optional[int] = None):
+        """
+        Initialize model registry.
+
+        Args:
+            memory_budget: Maximum total size of cached models in bytes
+        """
+        self.memory_budget = memory_budget if memory_budget is not None else DEFAULT_MEMORY_BUDGET
+        self._models: "OrderedDict[ModelKey, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+        self._inference_locks: Dict[ModelKey, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(
+        self,
+        key: ModelKey,
+        loader: Callable[[], Any],
+        size: Optional[int] = None,
+    ) -> Any:
+        """
+        Return the cached model for ``key``, loading it on a miss.
+
+        Concurrent callers asking for the same key share a single load.
+
+        Args:
+            key: (provider, model_name, device) tuple
+            loader: Zero-argument callable that loads the model
+            size: Size in bytes; estimated from the model when omitted
+
+        Returns:
+            Loaded model
+        """
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have finished loading while we waited
+            with self._lock:
+                entry = self._models.get(key)
+                if entry is not None:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self.misses += 1
+
+            started = time.perf_counter()
+            model = loader()
+            MODEL_LOAD_SECONDS.labels(key[1]).observe(time.perf_counter() - started)
+            model_size = size if size is not None else estimate_model_size(key[1], model)
+
+            with self._lock:
+                self._models[key] = (model, model_size)
+                self._models.move_to_end(key)
+                self._evict_over_budget(keep=key)
+                self._load_locks.pop(key, None)
+            return model
+
+    def _evict_over_budget(self, keep: ModelKey) -> None:
+        """Evict least recently used models until the budget is met (lock held)."""
+        while self._models and self.memory_usage > self.memory_budget:
+            oldest = next(iter(self._models))
+            if oldest == keep:
+                # A single model larger than the budget is still kept
+                break
+            self._models.pop(oldest)
+            self.evictions += 1
+            logger.info(f"Evicted Whisper model from registry: {oldest}")
+
+    def inference_lock(self, key: ModelKey) -> threading.Lock:
+        """
+        Get the lock serializing inference on a shared model.
+
+        Whisper installs per-call forward hooks for its KV cache, so two
+        threads must not decode with the same model object at once.
+        """
+        with self._lock:
+            return self._inference_locks.setdefault(key, threading.Lock())
+
+    @property
+    def memory_usage(self) -> int:
+        """Total estimated size of cached models in bytes."""
+        return sum(size for _, size in self._models.values())
+
+    def evict(self, key: ModelKey) -> bool:
+        """Remove a model from the registry. Returns True if it was cached."""
+        with self._lock:
+            if self._models.pop(key, None) is None:
+                return False
+            self.evictions += 1
+            return True
+
+    def clear(self) -> None:
+        """Drop all cached models and reset counters."""
+        with self._lock:
+            self._models.clear()
+            self._load_locks.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get registry counters and current contents."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_usage": self.memory_usage,
+                "memory_budget": self.memory_budget,
+                "models": [list(key) for key in self._models],
+            }
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get the process-wide model registry, creating it on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            budget_mb = os.getenv("WHISPER_MODEL_CACHE_MB")
+            budget = int(float(budget_mb) * 1024 * 1024) if budget_mb else None
+            _registry = ModelRegistry(memory_budget=budget)
+        return _registry
@@ -0,0 +1,241 @@
+"""
+Latency-aware routing of transcriptions across several Whisper backends.
+
+The "routing" provider holds one WhisperService per backend (local model,
+OpenAI, third-party API). For each transcription it estimates every
+backend's completion time from live figures — seconds of processing per
+second of audio, recent error rate and how much work is already queued on
+it — and sends the audio to the fastest backend within the cost limits. If
+that backend fails, the next best one is tried.
+
+Only file and ingested-audio transcriptions are routed. Decoded samples
+(chunk windows, live audio) always go to the local backend, outside the
+router, so they neither pick a backend nor update its figures.
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from ..utils.metrics import ROUTED_TRANSCRIPTIONS, ROUTING_IN_FLIGHT
+from ..utils.resilience import get_circuit_breaker
+
+
+logger = logging.getLogger(__name__)
+
+# Processing seconds per audio second assumed before a backend has been measured
+DEFAULT_PRIOR_RTF = {"local": 0.5, "openai": 0.1, "whisper_api": 0.1}
+# Backends whose recent error rate exceeds this are used only as a last resort
+UNHEALTHY_ERROR_RATE = 0.5
+# Seconds over which an idle backend's error rate halves, so a demoted backend recovers
+ERROR_RATE_HALF_LIFE = 60.0
+# Resilience endpoint of each backend whose calls go through a circuit breaker
+BREAKER_ENDPOINTS = {"whisper_api": "whisper_api"}
+
+
+class BackendStats:
+    """Live latency, error rate and load of one backend."""
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int = 1,
+        prior_rtf: float = 0.5,
+        cost_per_minute: float = 0.0,
+        smoothing: float = 0.2,
+        error_half_life: float = ERROR_RATE_HALF_LIFE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize stats.
+
+        Args:
+            name: Backend (provider) name
+            capacity: Transcriptions the backend runs in parallel
+            prior_rtf: Processing seconds per audio second until measured
+            cost_per_minute: Price per minute of audio
+            smoothing: Weight of the newest sample in the moving averages
+            error_half_life: Seconds over which the error rate halves
+                without new results
+        """
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.rtf = prior_rtf
+        self.cost_per_minute = cost_per_minute
+        self.smoothing = smoothing
+        self.error_half_life = error_half_life
+        self.clock = clock
+        self._error_rate = 0.0
+        self._error_updated = clock()
+        self.job_seconds: Optional[float] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    @property
+    def error_rate(self) -> float:
+        """Recent share of failed transcriptions, decaying while no results arrive."""
+        idle = max(0.0, self.clock() - self._error_updated)
+        return self._error_rate * 0.5 ** (idle / self.error_half_life)
+
+    @error_rate.setter
+    def error_rate(self, value: float) -> None:
+        self._error_rate = value
+        self._error_updated = self.clock()
+
+    @property
+    def queue_depth(self) -> int:
+        """Transcriptions waiting for one of the backend's slots."""
+        return max(0, self.in_flight - self.capacity)
+
+    def expected_seconds(self, duration: float) -> float:
+        """Expected time to finish ``duration`` seconds of audio if sent now."""
+        with self._lock:
+            service = self.rtf * duration
+            # Work ahead of this request drains through the backend's parallel slots
+            ahead = max(0, self.in_flight + 1 - self.capacity)
+            wait = ahead * (self.job_seconds if self.job_seconds is not None else service) / self.capacity
+            # A failure costs a failover, so unreliable backends look slower
+            return (wait + service) / max(0.1, 1.0 - self.error_rate)
+
+    def started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+        ROUTING_IN_FLIGHT.labels(self.name).inc()
+
+    def finished(self, seconds: float, duration: float, ok: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            error_rate = self.error_rate
+            self.error_rate = error_rate + self.smoothing * ((0.0 if ok else 1.0) - error_rate)
+            if ok:
+                self.completed += 1
+                if duration > 0:
+                    self.rtf += self.smoothing * (seconds / duration - self.rtf)
+                self.job_seconds = seconds if self.job_seconds is None else (
+                    self.job_seconds + self.smoothing * (seconds - self.job_seconds)
+                )
+            else:
+                self.failed += 1
+        ROUTING_IN_FLIGHT.labels(self.name).dec()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rtf": round(self.rtf, 4),
+                "error_rate": round(self.error_rate, 4),
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - self.capacity),
+                "capacity": self.capacity,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cost_per_minute": self.cost_per_minute,
+            }
+
+
+class ProviderRouter:
+    """Sends each transcription to the backend expected to finish it first."""
+
+    def __init__(
+        self,
+        backends: Dict[str, Any],
+        stats: Optional[Dict[str, BackendStats]] = None,
+        max_cost_per_minute: Optional[float] = None,
+        cost_slack: float = 0.0,
+    ):
+        """
+        Initialize router.
+
+        Args:
+            backends: Provider name -> WhisperService
+            stats: Provider name -> BackendStats; defaults to one slot and
+                the built-in prior for each backend
+            max_cost_per_minute: Backends priced above this are never used
+            cost_slack: Prefer a cheaper backend whose expected time is
+                within this fraction of the fastest one (0.2 = 20% slower)
+        """
+        if not backends:
+            raise ValueError("Routing needs at least one Whisper backend")
+        self.backends = backends
+        self.stats = stats or {}
+        for name in backends:
+            self.stats.setdefault(name, BackendStats(name, prior_rtf=DEFAULT_PRIOR_RTF.get(name, 0.5)))
+        self.max_cost_per_minute = max_cost_per_minute
+        self.cost_slack = cost_slack
+
+    def _healthy(self, name: str) -> bool:
+        if self.stats[name].error_rate > UNHEALTHY_ERROR_RATE:
+            return False
+        # Remote backends behind an open circuit breaker would fail fast anyway
+        # (one whose reset timeout has passed is eligible again for the probe call)
+        endpoint = BREAKER_ENDPOINTS.get(name)
+        return endpoint is None or not get_circuit_breaker(endpoint).rejecting
+
+    def rank(self, duration: float) -> List[str]:
+        """
+        Backends in the order they should be tried for ``duration`` seconds of audio.
+
+        Raises:
+            ValueError: If every backend is above the cost limit
+        """
+        affordable = [
+            name for name in self.backends
+            if self.max_cost_per_minute is None or self.stats[name].cost_per_minute <= self.max_cost_per_minute
+        ]
+        if not affordable:
+            raise ValueError(f"No Whisper backend costs at most {self.max_cost_per_minute} per minute")
+
+        expected = {name: self.stats[name].expected_seconds(duration) for name in affordable}
+        healthy = sorted((name for name in affordable if self._healthy(name)), key=expected.get)
+        unhealthy = sorted((name for name in affordable if name not in healthy), key=expected.get)
+        if healthy and self.cost_slack > 0:
+            # Among backends nearly as fast as the best, the cheapest goes first
+            limit = expected[healthy[0]] * (1 + self.cost_slack)
+            close = [name for name in healthy if expected[name] <= limit]
+            cheapest = min(close, key=lambda name: (self.stats[name].cost_per_minute, expected[name]))
+            healthy.remove(cheapest)
+            healthy.insert(0, cheapest)
+        return healthy + unhealthy
+
+    def transcribe(self, duration: Optional[float], run: Callable[[Any], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run ``run(backend)`` on the best backend, failing over to the next on errors.
+
+        Args:
+            duration: Audio length in seconds (None if unknown)
+            run: Transcribes with the given WhisperService
+
+        Returns:
+            The backend's result, with "routed_to" naming the backend
+        """
+        duration = duration or 0.0
+        order = self.rank(duration)
+        error: Optional[Exception] = None
+        for attempt, name in enumerate(order):
+            stats = self.stats[name]
+            if attempt == 0:
+                logger.info(
+                    f"Routing {duration:.0f}s of audio to {name} "
+                    f"(expected {stats.expected_seconds(duration):.1f}s)"
+                )
+            stats.started()
+            start = time.perf_counter()
+            try:
+                result = run(self.backends[name])
+            except Exception as e:
+                stats.finished(time.perf_counter() - start, duration, ok=False)
+                ROUTED_TRANSCRIPTIONS.labels(name, "error").inc()
+                logger.warning(f"Whisper backend {name} failed ({e}); trying the next one")
+                error = e
+                continue
+            stats.finished(time.perf_counter() - start, duration, ok=True)
+            ROUTED_TRANSCRIPTIONS.labels(name, "ok" if attempt == 0 else "failover").inc()
+            result["routed_to"] = name
+            return result
+        raise error
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current figures of every backend."""
+        return {name: self.stats[name].to_dict() for name in self.backends}
@@ -0,0 +1,353 @@
+"""
+Streaming ingest for uploaded audio.
+
+Upload bytes are hashed, sniffed and piped into an ffmpeg decoder (16 kHz
+mono PCM, the format Whisper consumes) as they arrive, so a request never
+has to be written to disk and decoded again afterwards. The encoded bytes
+are kept in memory for API providers and header probing; only uploads over
+the spill threshold are written to a temporary file.
+"""
+
+import io
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+# Provide safe defaults for optional dependencies so tests can patch them
+np = None  # type: ignore
+
+try:
+    import numpy as np  # type: ignore  # noqa: F401  (reassigns above placeholder)
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from ..utils.audio_probe import AudioInfo, detect_container, probe_audio, probe_audio_stream
+from ..utils.audio_utils import SAMPLE_RATE, AudioBuffer
+
+
+logger = logging.getLogger(__name__)
+
+_READ_BLOCK_SIZE = 64 * 1024
+
+
+class IngestedAudio:
+    """An upload that has been fully received, hashed, probed and (ideally) decoded."""
+
+    def __init__(
+        self,
+        filename: str,
+        audio_hash: str,
+        audio_info: AudioInfo,
+        samples=None,
+        data: Optional[bytes] = None,
+        spill_path: Optional[str] = None,
+    ):
+        """
+        Initialize ingested audio.
+
+        Args:
+            filename: Original file name of the upload
+            audio_hash: SHA-256 of the encoded bytes
+            audio_info: Header probe of the encoded bytes
+            samples: Decoded float32 mono samples at SAMPLE_RATE, or None
+                if decoding was unavailable or failed
+            data: Encoded bytes when the upload stayed in memory
+            spill_path: Temporary file holding the encoded bytes otherwise
+        """
+        self.filename = filename
+        self.audio_hash = audio_hash
+        self.audio_info = audio_info
+        self.samples = samples
+        self.data = data
+        self.spill_path = spill_path
+        self._temp_paths: List[str] = [spill_path] if spill_path else []
+
+    @property
+    def size(self) -> int:
+        return self.audio_info.file_size
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.samples is not None:
+            return len(self.samples) / SAMPLE_RATE
+        return self.audio_info.duration
+
+    @property
+    def buffer(self) -> AudioBuffer:
+        """Decoded audio; decodes from the file if streaming decode was unavailable."""
+        if self.samples is not None:
+            return AudioBuffer(self.samples, SAMPLE_RATE)
+        return AudioBuffer.from_file(self.to_file(), SAMPLE_RATE)
+
+    def open(self) -> BinaryIO:
+        """Open the encoded bytes for reading (e.g. to upload to an API)."""
+        if self.data is not None:
+            return io.BytesIO(self.data)
+        return open(self.spill_path, "rb")
+
+    def to_file(self) -> str:
+        """
+        Path to the encoded bytes on disk, writing them out if still in memory.
+
+        The file is removed by cleanup().
+        """
+        if self.spill_path is None:
+            fd, path = tempfile.mkstemp(suffix=Path(self.filename).suffix or ".wav")
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.data)
+            self.spill_path = path
+            self._temp_paths.append(path)
+        return self.spill_path
+
+    def cleanup(self) -> None:
+        """Remove any temporary files."""
+        for path in self._temp_paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        self._temp_paths = []
+
+
+class AudioIngest:
+    """
+    Writable sink that hashes, buffers and decodes an upload as it arrives.
+
+    It can be handed to werkzeug as the stream for a multipart file field,
+    or fed directly from a request body with ingest_stream().
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        spill_threshold: int = 32 * 1024 * 1024,
+        ffmpeg: str = "ffmpeg",
+        decode: bool = True,
+    ):
+        """
+        Initialize ingest.
+
+        Args:
+            filename: Original file name of the upload
+            spill_threshold: Bytes kept in memory before spilling to disk
+            ffmpeg: ffmpeg executable used for decoding
+            decode: Decode to PCM while receiving
+        """
+        self.filename = filename
+        self.spill_threshold = spill_threshold
+        self._digest = hashlib.sha256()
+        self._buffer = bytearray()
+        self._spill = None
+        self._spill_path: Optional[str] = None
+        self._size = 0
+        self._head = b""
+        self._rejected = False
+        self._finished = False
+
+        self._ffmpeg = shutil.which(ffmpeg) if decode and NUMPY_AVAILABLE else None
+        self._decoder: Optional[subprocess.Popen] = None
+        self._decoder_failed = False
+        self._pcm: List[bytes] = []
+        self._reader: Optional[threading.Thread] = None
+        self._stderr = None
+
+    def _start_decoder(self) -> None:
+        self._stderr = tempfile.TemporaryFile()
+        cmd = [
+            self._ffmpeg, "-hide_banner", "-loglevel", "error", "-threads", "0",
+            "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+            "pipe:1",
+        ]
+        try:
+            self._decoder = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self._stderr
+            )
+        except OSError as e:
+            logger.warning(f"Could not start ffmpeg for streaming decode: {e}")
+            self._decoder_failed = True
+            return
+
+        def drain(stdout, chunks):
+            for block in iter(lambda: stdout.read(_READ_BLOCK_SIZE), b""):
+                chunks.append(block)
+
+        # Drain stdout concurrently so ffmpeg never blocks on a full pipe
+        self._reader = threading.Thread(
+            target=drain, args=(self._decoder.stdout, self._pcm), name="ingest-decoder", daemon=True
+        )
+        self._reader.start()
+
+    def _feed_decoder(self, data: bytes) -> None:
+        if self._ffmpeg is None or self._decoder_failed:
+            return
+        if self._decoder is None:
+            self._start_decoder()
+            if self._decoder is None:
+                return
+        try:
+            self._decoder.stdin.write(data)
+        except (BrokenPipeError, OSError):
+            # ffmpeg gave up (e.g. a container it cannot read from a pipe);
+            # fall back to decoding the file afterwards
+            self._decoder_failed = True
+
+    def _store(self, data: bytes) -> None:
+        if self._spill is None and self._size > self.spill_threshold:
+            fd, self._spill_path = tempfile.mkstemp(suffix=Path(self.filename).suffix or ".wav")
+            self._spill = os.fdopen(fd, "wb")
+            self._spill.write(self._buffer)
+            self._buffer = bytearray()
+        if self._spill is not None:
+            self._spill.write(data)
+        else:
+            self._buffer += data
+
+    def write(self, data: bytes) -> int:
+        """Consume the next piece of the upload."""
+        if self._rejected or not data:
+            return len(data)
+
+        if len(self._head) < 16:
+            self._head += data[:16 - len(self._head)]
+            # Reject non-audio content as soon as the magic bytes are in
+            if len(self._head) >= 16 and detect_container(self._head) is None:
+                self._reject()
+                return len(data)
+
+        self._digest.update(data)
+        self._size += len(data)
+        self._store(data)
+        self._feed_decoder(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        # werkzeug rewinds file streams after writing them; nothing to do
+        return 0
+
+    def _reject(self) -> None:
+        self._rejected = True
+        self._stop_decoder()
+        self._buffer = bytearray()
+        self._remove_spill()
+
+    def _stop_decoder(self) -> None:
+        if self._decoder is not None:
+            self._decoder.kill()
+            self._decoder.wait()
+            self._decoder = None
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+
+    def _remove_spill(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        if self._spill_path:
+            try:
+                os.unlink(self._spill_path)
+            except OSError:
+                pass
+            self._spill_path = None
+
+    def _finish_decoder(self):
+        """Close ffmpeg's input and collect the decoded samples (None on failure)."""
+        if self._decoder is None:
+            return None
+        try:
+            self._decoder.stdin.close()
+        except (BrokenPipeError, OSError):
+            self._decoder_failed = True
+        self._reader.join()
+        returncode = self._decoder.wait()
+        if returncode != 0 or self._decoder_failed:
+            self._stderr.seek(0)
+            message = self._stderr.read().decode("utf-8", "replace").strip()
+            logger.info(f"Streaming decode of {self.filename} failed ({returncode}): {message}")
+            self._stop_decoder()
+            return None
+        self._decoder = None
+        self._stderr.close()
+        self._stderr = None
+
+        pcm = b"".join(self._pcm)
+        self._pcm = []
+        if not pcm:
+            return None
+        return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+    def finish(self) -> IngestedAudio:
+        """
+        Complete the upload.
+
+        Returns:
+            The ingested audio; call cleanup() on it when done
+
+        Raises:
+            ValueError: If the content is not a supported audio container
+        """
+        self._finished = True
+        if self._rejected or self._size < 16:
+            self._reject()
+            raise ValueError(f"Invalid audio file: {self.filename}")
+
+        samples = self._finish_decoder()
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+            audio_info = probe_audio(self._spill_path)
+            data = None
+        else:
+            data = bytes(self._buffer)
+            self._buffer = bytearray()
+            audio_info = probe_audio_stream(io.BytesIO(data), len(data))
+
+        if audio_info is None:
+            self._remove_spill()
+            raise ValueError(f"Invalid audio file: {self.filename}")
+        if samples is not None and audio_info.duration is None:
+            audio_info = audio_info._replace(duration=len(samples) / SAMPLE_RATE)
+
+        return IngestedAudio(
+            filename=self.filename,
+            audio_hash=self._digest.hexdigest(),
+            audio_info=audio_info,
+            samples=samples,
+            data=data,
+            spill_path=self._spill_path,
+        )
+
+    def close(self) -> None:
+        """Abandon an unfinished upload (e.g. the client disconnected)."""
+        if not self._finished:
+            self._reject()
+
+
+def ingest_stream(stream: BinaryIO, filename: str, **kwargs) -> IngestedAudio:
+    """
+    Ingest an upload from a readable stream (e.g. a raw request body).
+
+    Args:
+        stream: Readable binary stream
+        filename: Original file name of the upload
+        **kwargs: Passed to AudioIngest
+
+    Returns:
+        The ingested audio; call cleanup() on it when done
+    """
+    sink = AudioIngest(filename, **kwargs)
+    try:
+        for block in iter(lambda: stream.read(_READ_BLOCK_SIZE), b""):
+            sink.write(block)
+    except BaseException:
+        sink.close()
+        raise
+    return sink.finish()
@@ -0,0 +1,84 @@
+"""
+Content-addressed cache for transcription results.
+
+Results are keyed by a streaming SHA-256 of the audio bytes combined with
+everything that changes the output: provider, model, language, prompt and
+decode options. Re-running the same recording returns the stored result
+instead of repeating the Whisper pass.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from ..utils.disk_cache import TieredCache
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "minute-maker", "transcriptions")
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_audio_file(file_path: str) -> str:
+    """
+    Hash an audio file's bytes without loading it into memory.
+
+    Args:
+        file_path: Path to audio file
+
+    Returns:
+        SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def transcription_cache_key(audio_hash: str, **params: Any) -> str:
+    """
+    Build a cache key from the audio hash and transcription parameters.
+
+    Args:
+        audio_hash: SHA-256 of the audio bytes
+        **params: Provider, model, language, prompt, decode options, ...
+
+    Returns:
+        SHA-256 hex digest identifying the result
+    """
+    material = json.dumps({"audio": audio_hash, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+_caches: Dict[str, TieredCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_transcription_cache(
+    directory: Optional[str] = None,
+    max_bytes: int = 512 * 1024 * 1024,
+    memory_entries: int = 32,
+) -> TieredCache:
+    """
+    Get the process-wide cache for a directory, creating it on first use.
+
+    Args:
+        directory: Cache directory (defaults to ~/.cache/minute-maker/transcriptions)
+        max_bytes: Maximum size of the on-disk tier
+        memory_entries: Number of results kept in memory
+
+    Returns:
+        Shared TieredCache instance
+    """
+    directory = os.path.abspath(directory or DEFAULT_CACHE_DIR)
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = TieredCache(
+                directory, max_bytes=max_bytes, memory_entries=memory_entries, name="transcription"
+            )
+            _caches[directory] = cache
+        return cache
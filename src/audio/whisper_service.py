@@ -3,12 +3,13 @@ Whisper transcription service for audio processing.
 Handles audio file transcription using OpenAI's Whisper model.
 """
 
+import io
 import os
 import tempfile
 import logging
-from typing import Optional, Dict, Any
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
-import httpx
 
 # Provide safe defaults for optional dependencies so tests can patch them
 whisper = None  # type: ignore
@@ -28,7 +29,24 @@ except ImportError:
     # Leave placeholder value in place so tests can patch attribute
     OPENAI_AVAILABLE = False
 
-from ..utils.audio_utils import validate_audio_file, convert_audio_format
+from ..utils.audio_utils import (
+    SAMPLE_RATE,
+    AudioBuffer,
+    get_audio_duration,
+    validate_audio_file,
+    convert_audio_format,
+    remap_segments,
+)
+from ..config.whisper_config import get_default_routing_config
+from ..utils.audio_probe import AudioInfo
+from ..utils.http_client import get_http_client
+from ..utils.resilience import call_with_resilience
+from .model_registry import ModelRegistry, get_model_registry
+from .provider_router import DEFAULT_PRIOR_RTF, BackendStats, ProviderRouter
+from .transcription_cache import get_transcription_cache, hash_audio_file, transcription_cache_key
+from .stream_ingest import IngestedAudio
+from ..utils.disk_cache import TieredCache
+from ..utils.tracing import span, trace_extensions
 
 
 logger = logging.getLogger(__name__)
@@ -45,6 +63,12 @@ class WhisperService:
         api_base_url: Optional[str] = None,
         api_key: Optional[str] = None,
         api_endpoint: Optional[str] = None,
+        device: Optional[str] = None,
+        model_registry: Optional[ModelRegistry] = None,
+        cache: Optional[TieredCache] = None,
+        vad: bool = False,
+        vad_detector: Optional[Callable[[Any, int], List[Tuple[float, float]]]] = None,
+        router: Optional[ProviderRouter] = None,
     ):
         """
         Initialize Whisper service.
@@ -52,6 +76,14 @@ class WhisperService:
         Args:
             model_name: Local model size (tiny, base, small, medium, large)
             use_openai_api: Whether to use OpenAI's API instead of local model
+            device: Torch device for the local model (e.g. 'cpu', 'cuda')
+            model_registry: Registry to share loaded models through; defaults
+                to the process-wide registry
+            cache: Result cache consulted before transcribing; None disables caching
+            vad: Transcribe only detected speech with the local model
+            vad_detector: Model-based ``(samples, sample_rate) -> regions``
+                detector replacing the built-in energy/spectral-flux one
+            router: Backends and routing policy for the "routing" provider
         """
         self.model_name = model_name
         self.use_openai_api = use_openai_api
@@ -59,6 +91,12 @@ class WhisperService:
         self.api_base_url = api_base_url
         self.api_key = api_key
         self.api_endpoint = api_endpoint or "/v1/transcriptions"
+        self.device = device
+        self.model_registry = model_registry or get_model_registry()
+        self.cache = cache
+        self.vad = vad
+        self.vad_detector = vad_detector
+        self.router = router
         self.model = None
         self.openai_client = None
         
@@ -69,6 +107,9 @@ class WhisperService:
             self.model = None
         elif self.provider == "whisper_api":
             self._setup_third_party_client()
+        elif self.provider == "routing":
+            if self.router is None:
+                raise ValueError("The routing provider needs backends (use create_whisper_service)")
         else:
             raise ValueError(f"Unknown Whisper provider: {self.provider}")
     
@@ -93,7 +134,7 @@ class WhisperService:
 
         # Some OpenAI SDKs expose a client; adapt depending on version
         try:
-            self.openai_client = openai.OpenAI(api_key=api_key)
+            self.openai_client = openai.OpenAI(api_key=api_key, http_client=get_http_client())
         except Exception:
             # Fallback: store the module and rely on tests/mocks to provide needed interface
             self.openai_client = openai
@@ -129,13 +170,28 @@ class WhisperService:
             )
 
         try:
-            logger.info(f"Loading Whisper model: {self.model_name}")
-            self.model = whisper.load_model(self.model_name)
-            logger.info(f"Whisper model '{self.model_name}' loaded successfully")
+            self.model = self.model_registry.get_or_load(
+                self._model_key(),
+                self._load_local_model,
+            )
         except Exception as e:
             logger.error(f"Failed to load Whisper model: {e}")
             raise
 
+    def _model_key(self):
+        """Registry key for the local model."""
+        return ("local", self.model_name, self.device or "auto")
+
+    def _load_local_model(self):
+        """Load the local Whisper model from disk (registry miss)."""
+        logger.info(f"Loading Whisper model: {self.model_name}")
+        if self.device:
+            model = whisper.load_model(self.model_name, device=self.device)
+        else:
+            model = whisper.load_model(self.model_name)
+        logger.info(f"Whisper model '{self.model_name}' loaded successfully")
+        return model
+
     def _ensure_local_model_loaded(self):
         """Ensure local model is loaded (lazy initialization)."""
         if self.model is None:
@@ -145,7 +201,9 @@ class WhisperService:
         self, 
         audio_path: str, 
         language: Optional[str] = None,
-        prompt: Optional[str] = None
+        prompt: Optional[str] = None,
+        audio_info: Optional[AudioInfo] = None,
+        buffer: Optional[AudioBuffer] = None,
     ) -> Dict[str, Any]:
         """
         Transcribe audio file to text.
@@ -154,6 +212,10 @@ class WhisperService:
             audio_path: Path to audio file
             language: Language code (e.g., 'en', 'es', 'fr')
             prompt: Optional prompt to guide transcription
+            audio_info: Probe result from a caller that already validated
+                the file; validation is skipped when provided
+            buffer: Decoded audio of the same file; the local model uses it
+                instead of decoding the file again
             
         Returns:
             Dictionary containing transcription results
@@ -163,31 +225,176 @@ class WhisperService:
         if not audio_path.exists():
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
         
-        # Validate audio file
-        if not validate_audio_file(str(audio_path)):
+        # Validate audio file unless the caller already did
+        if audio_info is None and not validate_audio_file(str(audio_path)):
             raise ValueError(f"Invalid audio file: {audio_path}")
         
-        logger.info(f"Starting transcription of: {audio_path.name}")
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(hash_audio_file(str(audio_path)), language, prompt)
         
-        try:
-            if self.provider == "openai":
-                return self._transcribe_with_api(audio_path, language, prompt)
-            elif self.provider == "local":
-                return self._transcribe_with_local_model(audio_path, language, prompt)
-            elif self.provider == "whisper_api":
-                return self._transcribe_with_third_party_api(audio_path, language, prompt)
-        except Exception as e:
-            logger.error(f"Transcription failed: {e}")
-            raise
+        return self._transcribe_cached(
+            audio_path.name,
+            cache_key,
+            lambda: self._dispatch(audio_path, audio_path.name, None, language, prompt, buffer),
+        )
+
+    def transcribe_samples(
+        self,
+        samples: Any,
+        language: Optional[str] = None,
+        prompt: Optional[str] = None,
+        word_timestamps: bool = False,
+        vad: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """
+        Transcribe already-decoded 16 kHz mono float32 samples with the local model.
+        
+        Used for chunk windows of a decoded recording and live audio; results
+        are not cached. ``word_timestamps`` adds per-word timings to segments;
+        ``vad`` overrides the service's VAD setting for this call.
+        
+        With the routing provider the samples always go to the local backend,
+        outside the router: they are not ranked and do not update its stats.
+        """
+        if self.provider == "routing" and "local" in self.router.backends:
+            # Samples only make sense for the local model
+            return self.router.backends["local"].transcribe_samples(samples, language, prompt, word_timestamps, vad)
+        if self.provider != "local":
+            raise ValueError("transcribe_samples requires the local provider")
+        with span("whisper.transcribe_samples", **{"whisper.model": self.model_name}) as trace_span:
+            trace_span.set_attribute("audio.duration", len(samples) / SAMPLE_RATE)
+            return self._transcribe_with_local_model(samples, language, prompt, word_timestamps, vad)
+
+    def transcribe_ingested(
+        self,
+        audio: IngestedAudio,
+        language: Optional[str] = None,
+        prompt: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Transcribe a streamed upload without re-reading it from disk.
+
+        Local models take the PCM decoded during upload; API providers are
+        sent the encoded bytes from memory. Uploads that could not be
+        decoded on the fly are written out and decoded from the file.
+        
+        Args:
+            audio: Ingested upload (already hashed, probed and validated)
+            language: Language code (e.g., 'en', 'es', 'fr')
+            prompt: Optional prompt to guide transcription
+            
+        Returns:
+            Dictionary containing transcription results
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(audio.audio_hash, language, prompt)
+        
+        return self._transcribe_cached(
+            audio.filename, cache_key, lambda: self._transcribe_ingested_uncached(audio, language, prompt)
+        )
+
+    def _transcribe_ingested_uncached(
+        self,
+        audio: IngestedAudio,
+        language: Optional[str],
+        prompt: Optional[str],
+    ) -> Dict[str, Any]:
+        if self.provider == "routing":
+            return self.router.transcribe(
+                audio.audio_info.duration,
+                lambda backend: backend._transcribe_ingested_uncached(audio, language, prompt),
+            )
+        if self.provider == "local" and audio.samples is not None:
+            return self._transcribe_with_local_model(audio.samples, language, prompt)
+        if self.provider == "local" or audio.data is None:
+            return self._dispatch(Path(audio.to_file()), audio.filename, None, language, prompt)
+        return self._dispatch(None, audio.filename, audio.data, language, prompt)
+
+    def _dispatch(
+        self,
+        audio_path: Optional[Path],
+        name: str,
+        data: Optional[bytes],
+        language: Optional[str],
+        prompt: Optional[str],
+        buffer: Optional[AudioBuffer] = None
+    ) -> Dict[str, Any]:
+        """Run the configured provider on a file path or, for APIs, in-memory bytes."""
+        upload = (name, data) if data is not None else None
+        if self.provider == "openai":
+            return self._transcribe_with_api(audio_path, language, prompt, upload=upload)
+        elif self.provider == "local":
+            # Reuse audio someone already decoded (or that VAD needs anyway);
+            # otherwise Whisper's own single decode of the file is just as cheap
+            use_buffer = buffer is not None and (buffer.decoded or self.vad)
+            audio = buffer if use_buffer else str(audio_path)
+            return self._transcribe_with_local_model(audio, language, prompt)
+        elif self.provider == "whisper_api":
+            return self._transcribe_with_third_party_api(audio_path, language, prompt, upload=upload)
+        elif self.provider == "routing":
+            if buffer is not None:
+                duration = buffer.duration
+            else:
+                duration = get_audio_duration(str(audio_path)) if audio_path is not None else None
+            return self.router.transcribe(
+                duration,
+                lambda backend: backend._dispatch(audio_path, name, data, language, prompt, buffer),
+            )
+
+    def _transcribe_cached(self, name: str, cache_key: Optional[str], run) -> Dict[str, Any]:
+        """Return the cached result for ``cache_key`` or compute it with ``run``."""
+        with span(
+            "whisper.transcribe",
+            **{"whisper.provider": self.provider, "whisper.model": self.model_name, "audio.file": name},
+        ) as trace_span:
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                trace_span.set_attribute("cache.hit", cached is not None)
+                if cached is not None:
+                    logger.info(f"Transcription cache hit for: {name}")
+                    cached["cached"] = True
+                    return cached
+            
+            logger.info(f"Starting transcription of: {name}")
+            
+            try:
+                result = run()
+            except Exception as e:
+                logger.error(f"Transcription failed: {e}")
+                raise
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, result)
+        return result
+
+    def _cache_key(
+        self,
+        audio_hash: str,
+        language: Optional[str],
+        prompt: Optional[str]
+    ) -> str:
+        """Cache key covering the audio content and everything that shapes the output."""
+        return transcription_cache_key(
+            audio_hash,
+            provider=self.provider,
+            model=self.model_name if self.provider == "local" else self.get_available_models()[0],
+            endpoint=f"{self.api_base_url}{self.api_endpoint}" if self.provider == "whisper_api" else None,
+            language=language,
+            prompt=prompt,
+            options={"task": "transcribe", "vad": self.vad and self.provider == "local"},
+        )
     
     def _transcribe_with_api(
         self, 
-        audio_path: Path, 
+        audio_path: Optional[Path], 
         language: Optional[str] = None,
-        prompt: Optional[str] = None
+        prompt: Optional[str] = None,
+        upload: Optional[Tuple[str, bytes]] = None
     ) -> Dict[str, Any]:
-        """Transcribe using OpenAI API."""
-        with open(audio_path, "rb") as audio_file:
+        """Transcribe using OpenAI API (from a file, or an in-memory (name, bytes) upload)."""
+        with open(audio_path, "rb") if upload is None else nullcontext(upload) as audio_file:
             transcript = self.openai_client.audio.transcriptions.create(
                 model="whisper-1",
                 file=audio_file,
@@ -207,11 +414,13 @@ class WhisperService:
     
     def _transcribe_with_local_model(
         self, 
-        audio_path: Path, 
+        audio: Any, 
         language: Optional[str] = None,
-        prompt: Optional[str] = None
+        prompt: Optional[str] = None,
+        word_timestamps: bool = False,
+        vad: Optional[bool] = None
     ) -> Dict[str, Any]:
-        """Transcribe using local Whisper model."""
+        """Transcribe using local Whisper model (a file path, 16 kHz float32 samples or an AudioBuffer)."""
         # Lazy-load model on first use
         self._ensure_local_model_loaded()
         options = {
@@ -223,8 +432,17 @@ class WhisperService:
             options["language"] = language
         if prompt:
             options["initial_prompt"] = prompt
+        if word_timestamps:
+            options["word_timestamps"] = True
+        
+        if self.vad if vad is None else vad:
+            return self._transcribe_speech_only(audio, options)
+        if isinstance(audio, AudioBuffer):
+            # Whisper takes a path, an ndarray or a tensor, not the buffer itself
+            audio = audio.samples
         
-        result = self.model.transcribe(str(audio_path), **options)
+        with self.model_registry.inference_lock(self._model_key()):
+            result = self.model.transcribe(audio, **options)
         
         return {
             "text": result["text"],
@@ -234,11 +452,53 @@ class WhisperService:
             "model": self.model_name
         }
 
+    def _transcribe_speech_only(self, audio: Any, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the local model on detected speech only, on the original timeline."""
+        if isinstance(audio, str):
+            buffer = AudioBuffer.from_file(audio)
+        elif isinstance(audio, AudioBuffer):
+            buffer = audio
+        else:
+            buffer = AudioBuffer(audio)
+        regions = buffer.speech_regions(detector=self.vad_detector)
+        total = buffer.duration
+        speech = sum(end - start for start, end in regions)
+        vad = {
+            "regions": len(regions),
+            "speech_seconds": speech,
+            "skipped_seconds": total - speech,
+            "total_seconds": total,
+        }
+        logger.info(f"VAD kept {speech:.1f}s of {total:.1f}s in {len(regions)} regions")
+        
+        if not regions:
+            return {
+                "text": "",
+                "language": options.get("language"),
+                "segments": [],
+                "method": "local_model",
+                "model": self.model_name,
+                "vad": vad,
+            }
+        
+        with self.model_registry.inference_lock(self._model_key()):
+            result = self.model.transcribe(buffer.speech_samples(regions), **options)
+        
+        return {
+            "text": result["text"],
+            "language": result["language"],
+            "segments": remap_segments(result.get("segments", []), regions),
+            "method": "local_model",
+            "model": self.model_name,
+            "vad": vad,
+        }
+
     def _transcribe_with_third_party_api(
         self,
-        audio_path: Path,
+        audio_path: Optional[Path],
         language: Optional[str] = None,
-        prompt: Optional[str] = None
+        prompt: Optional[str] = None,
+        upload: Optional[Tuple[str, bytes]] = None
     ) -> Dict[str, Any]:
         """Transcribe using a third-party Whisper-compatible API."""
         url = f"{self.api_base_url.rstrip('/')}/{self.api_endpoint.lstrip('/')}"
@@ -250,14 +510,21 @@ class WhisperService:
             data["language"] = language
         if prompt:
             data["prompt"] = prompt
-        files = {"file": (audio_path.name, open(audio_path, "rb"))}
-        try:
-            with httpx.Client(timeout=60.0) as client:
-                resp = client.post(url, headers=headers, data=data, files=files)
-                resp.raise_for_status()
-                payload = resp.json()
-        finally:
-            files["file"][1].close()
+        # Held in memory so retries and hedged requests can re-send the upload
+        name, content = upload if upload is not None else (audio_path.name, audio_path.read_bytes())
+
+        with span("whisper_api.request", **{"http.method": "POST", "http.url": url}) as trace_span:
+            def send():
+                # Shared pooled client reuses the connection across transcriptions
+                return get_http_client().post(
+                    url, headers=headers, data=data, files={"file": (name, io.BytesIO(content))},
+                    timeout=60.0, extensions=trace_extensions(trace_span),
+                )
+
+            resp = call_with_resilience("whisper_api", send)
+            trace_span.set_attribute("http.status_code", resp.status_code)
+        resp.raise_for_status()
+        payload = resp.json()
 
         # Normalization: Expect a common shape; adjust as needed for the provider
         text = payload.get("text") or payload.get("transcript") or payload.get("result")
@@ -279,6 +546,12 @@ class WhisperService:
             return ["tiny", "base", "small", "medium", "large", "large-v2", "large-v3"]
         if self.provider == "whisper_api":
             return ["remote-default"]
+        if self.provider == "routing":
+            # One "backend:model" entry per backend the router may pick
+            return [
+                f"{name}:{backend.model_name if name == 'local' else backend.get_available_models()[0]}"
+                for name, backend in self.router.backends.items()
+            ]
         return []
 
 
@@ -290,6 +563,9 @@ def create_whisper_service(config: Optional[Dict[str, Any]] = None) -> WhisperSe
         config: Configuration dictionary with keys:
             - model_name: str
             - use_openai_api: bool
+            - device: str (local provider only)
+            - vad: bool (local provider only)
+            - cache_enabled / cache_dir / cache_max_mb / cache_memory_entries
             
     Returns:
         Configured WhisperService instance
@@ -297,12 +573,25 @@ def create_whisper_service(config: Optional[Dict[str, Any]] = None) -> WhisperSe
     if config is None:
         config = {}
     
+    if (config.get("provider") or "").lower() == "routing":
+        return _create_routing_service(config)
+    
     model_name = config.get("model_name", "base")
     use_openai_api = config.get("use_openai_api", False)
     provider = config.get("provider")
     api_base_url = config.get("api_base_url")
     api_key = config.get("api_key")
     api_endpoint = config.get("api_endpoint")
+    device = config.get("device")
+    vad = config.get("vad", False)
+
+    cache = None
+    if config.get("cache_enabled"):
+        cache = get_transcription_cache(
+            config.get("cache_dir"),
+            max_bytes=int(config.get("cache_max_mb", 512) * 1024 * 1024),
+            memory_entries=config.get("cache_memory_entries", 32),
+        )
 
     return WhisperService(
         model_name=model_name,
@@ -311,4 +600,53 @@ def create_whisper_service(config: Optional[Dict[str, Any]] = None) -> WhisperSe
         api_base_url=api_base_url,
         api_key=api_key,
         api_endpoint=api_endpoint,
+        device=device,
+        model_registry=get_model_registry(),
+        cache=cache,
+        vad=vad,
+    )
+
+
+def _create_routing_service(config: Dict[str, Any]) -> WhisperService:
+    """Build a "routing" service over one backend service per configured provider."""
+    routing = get_default_routing_config()
+    routing.update(config.get("routing") or {})
+
+    backends: Dict[str, WhisperService] = {}
+    stats: Dict[str, BackendStats] = {}
+    for name in routing["backends"]:
+        try:
+            # Results are cached once, by the routing service, whichever backend produced them
+            backends[name] = create_whisper_service(dict(config, provider=name, cache_enabled=False))
+        except (ImportError, ValueError) as e:
+            logger.warning(f"Skipping Whisper backend {name}: {e}")
+            continue
+        stats[name] = BackendStats(
+            name,
+            capacity=routing["local_concurrency"] if name == "local" else routing["remote_concurrency"],
+            prior_rtf=DEFAULT_PRIOR_RTF.get(name, 0.5),
+            cost_per_minute=routing["cost_per_minute"].get(name, 0.0),
+        )
+    if not backends:
+        raise ValueError(f"No usable Whisper backend among {routing['backends']}")
+
+    router = ProviderRouter(
+        backends,
+        stats=stats,
+        max_cost_per_minute=routing["max_cost_per_minute"],
+        cost_slack=routing["cost_slack"],
+    )
+    cache = None
+    if config.get("cache_enabled"):
+        cache = get_transcription_cache(
+            config.get("cache_dir"),
+            max_bytes=int(config.get("cache_max_mb", 512) * 1024 * 1024),
+            memory_entries=config.get("cache_memory_entries", 32),
+        )
+    return WhisperService(
+        model_name=config.get("model_name", "base"),
+        provider="routing",
+        model_registry=get_model_registry(),
+        cache=cache,
+        router=router,
     )
@@ -0,0 +1,38 @@
+"""
+Configuration settings for outbound HTTP connections.
+"""
+
+import os
+from typing import Dict, Any
+
+
+def get_default_http_config() -> Dict[str, Any]:
+    """Get default connection pool configuration for outbound HTTP calls."""
+    return {
+        "max_connections": int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        "max_keepalive_connections": int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+        "keepalive_expiry": float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+        "timeout": float(os.getenv("HTTP_TIMEOUT", "60")),
+        "connect_timeout": float(os.getenv("HTTP_CONNECT_TIMEOUT", "10")),
+        # HTTP/2 needs the optional 'h2' package (pip install httpx[http2])
+        "http2": os.getenv("HTTP2_ENABLED", "false").lower() == "true",
+    }
+
+
+def get_default_resilience_config() -> Dict[str, Any]:
+    """Get default retry, hedging and circuit breaker settings for outbound calls."""
+    return {
+        # Extra attempts after a retryable failure (429, 5xx, connection errors)
+        "max_retries": int(os.getenv("HTTP_MAX_RETRIES", "3")),
+        "backoff_base": float(os.getenv("HTTP_BACKOFF_BASE", "0.5")),
+        "backoff_max": float(os.getenv("HTTP_BACKOFF_MAX", "20")),
+        # Longest Retry-After we are willing to wait; longer ones fail the call
+        "retry_after_max": float(os.getenv("HTTP_RETRY_AFTER_MAX", "60")),
+        # Send a duplicate request once the first is slower than this latency percentile
+        "hedge_enabled": os.getenv("HTTP_HEDGE_ENABLED", "false").lower() == "true",
+        "hedge_percentile": float(os.getenv("HTTP_HEDGE_PERCENTILE", "95")),
+        "hedge_min_delay": float(os.getenv("HTTP_HEDGE_MIN_DELAY", "0.05")),
+        # Consecutive failures that open an upstream's breaker, and how long it stays open
+        "breaker_failure_threshold": int(os.getenv("HTTP_BREAKER_FAILURES", "5")),
+        "breaker_reset_seconds": float(os.getenv("HTTP_BREAKER_RESET_SECONDS", "30")),
+    }
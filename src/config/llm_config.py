@@ -0,0 +1,31 @@
+"""
+Configuration settings for LLM calls used to generate minutes.
+"""
+
+import os
+from typing import Dict, Any
+
+
+def get_default_llm_config() -> Dict[str, Any]:
+    """Get default LLM call configuration."""
+    return {
+        # Deterministic (temperature 0) response cache
+        "cache_enabled": os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true",
+        "cache_dir": os.getenv("LLM_CACHE_DIR"),  # ~/.cache/minute-maker/llm if None
+        "cache_ttl": float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))),
+        "cache_max_mb": float(os.getenv("LLM_CACHE_MAX_MB", "128")),
+        "cache_memory_entries": int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256")),
+    }
+
+
+def get_default_rate_limit_config() -> Dict[str, Any]:
+    """Get default OpenRouter rate limit budgets (0 disables a limit)."""
+    return {
+        "requests_per_minute": float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0")),
+        "tokens_per_minute": float(os.getenv("LLM_TOKENS_PER_MINUTE", "0")),
+        # Largest burst allowed at once; defaults to the per-minute budget
+        "request_burst": float(os.getenv("LLM_REQUEST_BURST", "0")) or None,
+        "token_burst": float(os.getenv("LLM_TOKEN_BURST", "0")) or None,
+        # Completion tokens reserved per call on top of the prompt estimate
+        "completion_tokens": int(os.getenv("LLM_COMPLETION_TOKENS", "512")),
+    }
@@ -0,0 +1,22 @@
+"""
+Configuration settings for server startup.
+"""
+
+import os
+from typing import Dict, Any
+
+
+def get_default_warmup_config() -> Dict[str, Any]:
+    """Get default startup warmup configuration."""
+    return {
+        "enabled": os.getenv("WARMUP_ENABLED", "true").lower() == "true",
+        # Run a dummy transcription so the first request skips first-inference setup
+        "inference": os.getenv("WARMUP_INFERENCE", "true").lower() == "true",
+        "audio_seconds": float(os.getenv("WARMUP_AUDIO_SECONDS", "1")),
+        # Open pooled connections to the LLM and Whisper APIs ahead of the first call
+        "connections": os.getenv("WARMUP_CONNECTIONS", "true").lower() == "true",
+        "connect_timeout": float(os.getenv("WARMUP_CONNECT_TIMEOUT", "5")),
+        # A failed warmup is retried after this delay, doubling up to the maximum
+        "retry_seconds": float(os.getenv("WARMUP_RETRY_SECONDS", "10")),
+        "retry_max_seconds": float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "300")),
+    }
@@ -0,0 +1,19 @@
+"""
+Configuration settings for request tracing.
+"""
+
+import os
+from typing import Dict, Any
+
+
+DEFAULT_TRACE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "minute-maker", "traces.jsonl")
+
+
+def get_default_tracing_config() -> Dict[str, Any]:
+    """Get default tracing configuration."""
+    return {
+        "enabled": os.getenv("TRACING_ENABLED", "false").lower() == "true",
+        # Finished traces are appended here as OTLP/JSON lines
+        "file": os.getenv("TRACE_FILE") or DEFAULT_TRACE_FILE,
+        "service_name": os.getenv("TRACE_SERVICE_NAME", "minute-maker"),
+    }
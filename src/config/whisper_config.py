@@ -9,9 +9,12 @@ from typing import Dict, Any, Optional
 def get_default_whisper_config() -> Dict[str, Any]:
     """Get default Whisper configuration."""
     return {
-        # Provider selection: local | openai | whisper_api
+        # Provider selection: local | openai | whisper_api | routing
         "provider": os.getenv("WHISPER_PROVIDER", None),  # if None, derived from use_openai_api
         "model_name": os.getenv("WHISPER_MODEL", "base"),
+        "device": os.getenv("WHISPER_DEVICE"),  # Let Whisper pick if None
+        # Skip silence/music before local inference (voice activity detection)
+        "vad": os.getenv("WHISPER_VAD", "false").lower() == "true",
         "use_openai_api": os.getenv("USE_OPENAI_WHISPER_API", "false").lower() == "true",
         "language": os.getenv("WHISPER_LANGUAGE"),  # Auto-detect if None
         "prompt": os.getenv("WHISPER_PROMPT"),  # No prompt if None
@@ -22,6 +25,76 @@ def get_default_whisper_config() -> Dict[str, Any]:
         "api_base_url": os.getenv("WHISPER_API_BASE_URL"),
         "api_key": os.getenv("WHISPER_API_KEY"),
         "api_endpoint": os.getenv("WHISPER_API_ENDPOINT", "/v1/transcriptions"),
+        # Content-addressed result cache
+        "cache_enabled": os.getenv("TRANSCRIPTION_CACHE_ENABLED", "false").lower() == "true",
+        "cache_dir": os.getenv("TRANSCRIPTION_CACHE_DIR"),  # ~/.cache/minute-maker/transcriptions if None
+        "cache_max_mb": float(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "512")),
+        "cache_memory_entries": int(os.getenv("TRANSCRIPTION_CACHE_MEMORY_ENTRIES", "32")),
+    }
+
+
+def get_default_chunking_config() -> Dict[str, Any]:
+    """Get default configuration for chunked transcription of long recordings."""
+    enabled = os.getenv("TRANSCRIBE_CHUNKING", "auto").lower()
+    return {
+        # true | false | auto (chunk only files that are too long or too large)
+        "enabled": enabled if enabled == "auto" else enabled == "true",
+        "window_seconds": float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "600")),
+        "overlap_seconds": float(os.getenv("TRANSCRIBE_CHUNK_OVERLAP", "5")),
+        # Recordings longer than this are chunked in auto mode
+        "auto_threshold_seconds": float(os.getenv("TRANSCRIBE_CHUNK_THRESHOLD", "1800")),
+        "max_workers": int(os.getenv("TRANSCRIBE_CHUNK_WORKERS", "0")) or None,  # None = CPU count
+        # thread | process; local models default to one process per worker
+        "executor": os.getenv("TRANSCRIBE_CHUNK_EXECUTOR"),
+    }
+
+
+def get_default_ingest_config() -> Dict[str, Any]:
+    """Get default configuration for streaming upload ingest."""
+    return {
+        # Decode uploads while they arrive instead of saving them first
+        "streaming": os.getenv("INGEST_STREAMING", "true").lower() == "true",
+        # Uploads larger than this are spilled to a temporary file
+        "spill_threshold_mb": float(os.getenv("INGEST_SPILL_MB", "32")),
+        "ffmpeg": os.getenv("FFMPEG_BINARY", "ffmpeg"),
+    }
+
+
+def get_default_live_config() -> Dict[str, Any]:
+    """Get default configuration for live (WebSocket) transcription."""
+    return {
+        # Re-run the model once this much new audio has arrived
+        "step_seconds": float(os.getenv("LIVE_STEP_SECONDS", "1.0")),
+        # Uncommitted audio kept for context before it is trimmed
+        "max_buffer_seconds": float(os.getenv("LIVE_MAX_BUFFER_SECONDS", "15")),
+        # Words are committed once this many consecutive hypotheses agree
+        "agreement": int(os.getenv("LIVE_AGREEMENT", "2")),
+        "ffmpeg": os.getenv("FFMPEG_BINARY", "ffmpeg"),
+    }
+
+
+def get_default_routing_config() -> Dict[str, Any]:
+    """Get default configuration for the "routing" provider."""
+    max_cost = os.getenv("WHISPER_ROUTING_MAX_COST_PER_MINUTE")
+    return {
+        # Backends the router may use, in any order
+        "backends": [
+            name.strip().lower()
+            for name in os.getenv("WHISPER_ROUTING_BACKENDS", "local,openai").split(",")
+            if name.strip()
+        ],
+        # Transcriptions each backend runs in parallel (beyond this they queue)
+        "local_concurrency": int(os.getenv("WHISPER_ROUTING_LOCAL_CONCURRENCY", "1")),
+        "remote_concurrency": int(os.getenv("WHISPER_ROUTING_REMOTE_CONCURRENCY", "8")),
+        # Price per minute of audio; backends above max_cost_per_minute are never used
+        "cost_per_minute": {
+            "local": 0.0,
+            "openai": float(os.getenv("WHISPER_OPENAI_COST_PER_MINUTE", "0.006")),
+            "whisper_api": float(os.getenv("WHISPER_API_COST_PER_MINUTE", "0.006")),
+        },
+        "max_cost_per_minute": float(max_cost) if max_cost else None,
+        # Prefer a cheaper backend expected to be at most this much slower (0.2 = 20%)
+        "cost_slack": float(os.getenv("WHISPER_ROUTING_COST_SLACK", "0.2")),
     }
 
 
@@ -47,7 +120,7 @@ def validate_whisper_config(config: Dict[str, Any]) -> Dict[str, Any]:
 
     # Validate model name
     valid_models = ["tiny", "base", "small", "medium", "large", "large-v2", "large-v3"]
-    if provider == "local" and validated["model_name"] not in valid_models:
+    if provider in ("local", "routing") and validated["model_name"] not in valid_models:
         validated["model_name"] = "base"
     
     # Validate temperature
@@ -0,0 +1,366 @@
+"""
+Batch transcription of a backlog of recordings.
+
+Files are fanned out across a process pool in which every worker keeps one
+warm model. Each finished file is appended to a JSONL manifest as soon as it
+completes, so an interrupted run picks up where it stopped when started again
+with the same manifest.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import queue
+import logging
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from ..config.whisper_config import get_default_whisper_config
+from ..utils.audio_utils import SUPPORTED_AUDIO_FORMATS
+from ..utils.disk_cache import to_jsonable
+from .transcription_manager import TranscriptionManager
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MANIFEST = "batch_manifest.jsonl"
+
+# Approximate memory (GB) one worker needs for each local Whisper model size
+MODEL_MEMORY_GB = {"tiny": 1.0, "base": 1.0, "small": 2.0, "medium": 5.0, "turbo": 6.0, "large": 10.0}
+# Share of physical memory the batch workers' models may take together
+MEMORY_BUDGET_FRACTION = 0.75
+
+# Per-process manager used by batch workers so each keeps one warm model
+_worker_manager: Optional[TranscriptionManager] = None
+
+
+class BatchSummary(NamedTuple):
+    """Outcome and throughput of a batch run."""
+
+    total: int  # Files found
+    skipped: int  # Already completed in the manifest
+    succeeded: int
+    failed: int
+    audio_seconds: float  # Audio transcribed in this run
+    processing_seconds: float  # Sum of per-file transcription time
+    wall_seconds: float
+
+    @property
+    def files_per_hour(self) -> float:
+        done = self.succeeded + self.failed
+        return done * 3600.0 / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def real_time_factor(self) -> float:
+        """Processing time per second of audio (lower is faster)."""
+        return self.processing_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+    @property
+    def speedup(self) -> float:
+        """Seconds of audio transcribed per wall-clock second across all workers."""
+        return self.audio_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+
+def discover_audio_files(inputs: Iterable[str]) -> List[Path]:
+    """
+    Expand directories (recursively) and glob patterns into audio files.
+
+    Args:
+        inputs: Files, directories or glob patterns
+
+    Returns:
+        Unique supported audio files, sorted
+    """
+    found = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            candidates = [p for p in path.rglob("*") if p.is_file()]
+        elif path.exists():
+            candidates = [path]
+        else:
+            candidates = [Path(p) for p in glob.glob(item, recursive=True)]
+        found.update(
+            p.resolve() for p in candidates
+            if p.is_file() and p.suffix.lower() in SUPPORTED_AUDIO_FORMATS
+        )
+    return sorted(found)
+
+
+def _file_key(path: Path) -> str:
+    """Identity of a file version: path, size and modification time."""
+    stat = path.stat()
+    return f"{path}:{stat.st_size}:{int(stat.st_mtime)}"
+
+
+class BatchManifest:
+    """Append-only JSONL record of finished files."""
+
+    def __init__(self, path: str):
+        """
+        Initialize manifest.
+
+        Args:
+            path: JSONL file; created on first write
+        """
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A run killed mid-write leaves a truncated last line
+                        continue
+                    self.entries[entry["key"]] = entry
+
+    def is_done(self, path: Path, retry_failed: bool = False) -> bool:
+        entry = self.entries.get(_file_key(path))
+        if entry is None:
+            return False
+        return entry["status"] == "ok" or not retry_failed
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Append one entry and flush it to disk immediately."""
+        self.entries[entry["key"]] = entry
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _model_memory_gb(model_name: str) -> float:
+    # "medium.en", "large-v3" etc. share the footprint of their base size
+    base = model_name.split(".")[0].split("-")[0]
+    return MODEL_MEMORY_GB.get(base, MODEL_MEMORY_GB["large"])
+
+
+def _physical_memory_gb() -> Optional[float]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024 ** 3
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _gpu_count(device: Optional[str]) -> int:
+    """GPUs the local model will run on (0 for CPU)."""
+    if device is not None and not device.startswith("cuda"):
+        return 0
+    try:
+        import torch  # type: ignore
+        if not torch.cuda.is_available():
+            return 0
+        # An explicit "cuda:N" pins every worker to one device
+        return 1 if device and ":" in device else torch.cuda.device_count()
+    except Exception:
+        return 0
+
+
+def default_batch_workers(whisper_config: Dict[str, Any]) -> int:
+    """
+    Default worker count for a batch run with ``whisper_config``.
+
+    Every worker loads its own copy of a local model, so local runs use one
+    worker per GPU, or on CPU as many as fit in memory (at most one per
+    core). API providers hold no model and use one worker per core.
+    """
+    cpu_count = os.cpu_count() or 1
+    provider = (whisper_config.get("provider") or (
+        "openai" if whisper_config.get("use_openai_api") else "local"
+    )).lower()
+    if provider not in ("local", "routing"):
+        return cpu_count
+
+    gpus = _gpu_count(whisper_config.get("device"))
+    if gpus:
+        return gpus
+    memory = _physical_memory_gb()
+    if memory is None:
+        return cpu_count
+    per_worker = _model_memory_gb(whisper_config.get("model_name", "base"))
+    return max(1, min(cpu_count, int(memory * MEMORY_BUDGET_FRACTION // per_worker)))
+
+
+def _worker_devices(whisper_config: Dict[str, Any], workers: int):
+    """
+    Queue handing each worker its own GPU, or None to keep the configured device.
+
+    Only used when the device is left to pick ("cuda" or unset) and several
+    GPUs are available; otherwise every worker would load onto cuda:0.
+    """
+    device = whisper_config.get("device")
+    gpus = _gpu_count(device) if device in (None, "cuda") else 0
+    if workers < 2 or gpus < 2:
+        return None
+    devices = multiprocessing.Queue()
+    for index in range(workers):
+        devices.put(f"cuda:{index % gpus}")
+    return devices
+
+
+def _init_batch_worker(config: Dict[str, Any], num_threads: int, devices=None) -> None:
+    """Process-pool initializer: build the worker's manager, pin its GPU and limit torch threads."""
+    global _worker_manager
+    try:
+        import torch  # type: ignore
+        torch.set_num_threads(num_threads)
+    except Exception:
+        pass
+    if devices is not None:
+        try:
+            device = devices.get(timeout=5)
+        except queue.Empty:
+            device = None
+        if device is not None:
+            config = {**config, "whisper": {**config.get("whisper", {}), "device": device}}
+    _worker_manager = TranscriptionManager(config)
+
+
+def _transcribe_in_worker(path: str) -> Tuple[Optional[Dict[str, Any]], Optional[str], float]:
+    """Process-pool entry point: transcribe one file, returning (result, error, seconds)."""
+    started = time.perf_counter()
+    try:
+        result = _worker_manager.transcribe_file(path)
+    except Exception as e:
+        return None, str(e), time.perf_counter() - started
+    result.pop("config", None)
+    return to_jsonable(result), None, time.perf_counter() - started
+
+
+def run_batch(
+    files: List[Path],
+    manifest_path: str = DEFAULT_MANIFEST,
+    max_workers: Optional[int] = None,
+    config: Optional[Dict[str, Any]] = None,
+    retry_failed: bool = False,
+) -> BatchSummary:
+    """
+    Transcribe files in parallel, skipping those already in the manifest.
+
+    Args:
+        files: Audio files to transcribe
+        manifest_path: JSONL manifest to resume from and append to
+        max_workers: Worker processes (defaults to default_batch_workers(),
+            capped by file count)
+        config: TranscriptionManager configuration
+        retry_failed: Transcribe files that failed in a previous run again
+
+    Returns:
+        Summary with throughput figures for this run
+    """
+    manifest = BatchManifest(manifest_path)
+    pending = [path for path in files if not manifest.is_done(path, retry_failed)]
+    skipped = len(files) - len(pending)
+    if skipped:
+        logger.info(f"Skipping {skipped} files already in {manifest_path}")
+
+    config = dict(config or {"whisper": get_default_whisper_config()})
+    # Files are the unit of parallelism; do not nest chunk pools inside workers
+    config["chunking"] = {**config.get("chunking", {}), "executor": "thread", "max_workers": 1}
+
+    succeeded = failed = 0
+    audio_seconds = processing_seconds = 0.0
+    started = time.perf_counter()
+    if pending:
+        cpu_count = os.cpu_count() or 1
+        workers = min(len(pending), max_workers or default_batch_workers(config.get("whisper", {})))
+        devices = _worker_devices(config.get("whisper", {}), workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(config, max(1, cpu_count // workers), devices),
+        ) as executor:
+            futures = {executor.submit(_transcribe_in_worker, str(path)): path for path in pending}
+            for done, future in enumerate(as_completed(futures), start=1):
+                path = futures[future]
+                try:
+                    result, error, seconds = future.result()
+                except BrokenProcessPool as e:
+                    # A worker died (e.g. out of memory); this and every unfinished
+                    # file fail, and the summary still covers the whole run
+                    result, error, seconds = None, f"Worker process died: {e}", 0.0
+                entry = {
+                    "key": _file_key(path),
+                    "file": str(path),
+                    "status": "ok" if error is None else "error",
+                    "seconds": seconds,
+                }
+                if error is None:
+                    succeeded += 1
+                    audio_seconds += result.get("duration") or 0.0
+                    entry["result"] = result
+                else:
+                    failed += 1
+                    entry["error"] = error
+                processing_seconds += seconds
+                manifest.record(entry)
+                logger.info(f"[{done}/{len(pending)}] {path.name}: {entry['status']} ({seconds:.1f}s)")
+
+    return BatchSummary(
+        total=len(files),
+        skipped=skipped,
+        succeeded=succeeded,
+        failed=failed,
+        audio_seconds=audio_seconds,
+        processing_seconds=processing_seconds,
+        wall_seconds=time.perf_counter() - started,
+    )
+
+
+def format_summary(summary: BatchSummary) -> str:
+    """Human-readable report of a batch run."""
+    return "\n".join([
+        f"Files: {summary.total} found, {summary.skipped} skipped, "
+        f"{summary.succeeded} transcribed, {summary.failed} failed",
+        f"Audio: {summary.audio_seconds / 60:.1f} min in {summary.wall_seconds / 60:.1f} min wall clock",
+        f"Throughput: {summary.files_per_hour:.1f} files/hour, "
+        f"real-time factor {summary.real_time_factor:.3f} per worker, "
+        f"{summary.speedup:.1f}x real time overall",
+    ])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Transcribe a backlog of recordings")
+    parser.add_argument("inputs", nargs="+", help="Audio files, directories or glob patterns")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="JSONL manifest to resume from")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Worker processes (default: one per GPU, or as many models as fit in memory)",
+    )
+    parser.add_argument("--model", default=None, help="Local Whisper model (overrides WHISPER_MODEL)")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry files that failed previously")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    files = discover_audio_files(args.inputs)
+    if not files:
+        print("No audio files found")
+        return 1
+
+    whisper_config = get_default_whisper_config()
+    if args.model:
+        whisper_config["model_name"] = args.model
+
+    summary = run_batch(
+        files,
+        manifest_path=args.manifest,
+        max_workers=args.workers,
+        config={"whisper": whisper_config},
+        retry_failed=args.retry_failed,
+    )
+    print(format_summary(summary))
+    return 0 if summary.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Chunk planning and stitching for long recordings.
+
+Long recordings are split at silence boundaries into overlapping windows that
+can be transcribed independently. Each window owns the span between its own
+split point and the next one; segments that fall in the overlap are kept only
+by the window that owns them, so stitched output has no duplicated text.
+"""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+
+class AudioChunk(NamedTuple):
+    """A window of audio to transcribe, in seconds on the original timeline."""
+
+    index: int
+    start: float  # Window start, including leading overlap
+    end: float  # Window end, including trailing overlap
+    own_start: float  # Split point where this chunk's owned span begins
+    own_end: float  # Split point where the next chunk takes over
+
+
+def plan_chunks(
+    duration: float,
+    window_seconds: float = 600.0,
+    overlap_seconds: float = 5.0,
+    split_finder: Optional[Callable[[float], float]] = None,
+) -> List[AudioChunk]:
+    """
+    Plan overlapping windows covering ``duration`` seconds of audio.
+
+    Args:
+        duration: Total audio duration in seconds
+        window_seconds: Target length of each window
+        overlap_seconds: Audio shared with each neighbouring window
+        split_finder: Maps a target split time to a nearby silence; the
+            target is used unchanged when omitted
+
+    Returns:
+        Chunks in timeline order
+    """
+    if window_seconds <= 0:
+        raise ValueError("window_seconds must be positive")
+
+    splits = [0.0]
+    target = window_seconds
+    while target < duration:
+        split = split_finder(target) if split_finder else target
+        # Never move backwards or produce an empty chunk
+        if split <= splits[-1] or split >= duration:
+            split = target
+        splits.append(split)
+        target = split + window_seconds
+    splits.append(duration)
+
+    chunks = []
+    for index in range(len(splits) - 1):
+        own_start, own_end = splits[index], splits[index + 1]
+        chunks.append(AudioChunk(
+            index=index,
+            start=max(0.0, own_start - overlap_seconds),
+            end=min(duration, own_end + overlap_seconds),
+            own_start=own_start,
+            own_end=own_end,
+        ))
+    return chunks
+
+
+def _merge_overlapping_text(previous: str, current: str, max_words: int = 30) -> str:
+    """Append ``current`` to ``previous``, dropping words repeated across the seam."""
+    prev_words = previous.split()
+    curr_words = current.split()
+    limit = min(max_words, len(prev_words), len(curr_words))
+    for size in range(limit, 0, -1):
+        if [w.lower() for w in prev_words[-size:]] == [w.lower() for w in curr_words[:size]]:
+            curr_words = curr_words[size:]
+            break
+    return " ".join(prev_words + curr_words)
+
+
+def owned_segments(chunk: AudioChunk, result: Dict[str, Any], is_last: bool = False) -> List[Dict[str, Any]]:
+    """
+    Segments of one chunk's result that the chunk owns, on the original timeline.
+
+    Args:
+        chunk: The chunk the result belongs to
+        result: Transcription result for the chunk
+        is_last: Whether this is the final chunk (which also owns its end point)
+
+    Returns:
+        Shifted segment dicts whose midpoints fall in the chunk's owned span
+    """
+    segments = []
+    for segment in result.get("segments") or []:
+        segment = dict(segment) if isinstance(segment, dict) else dict(vars(segment))
+        start = segment.get("start", 0.0) + chunk.start
+        end = segment.get("end", 0.0) + chunk.start
+        midpoint = (start + end) / 2.0
+        if midpoint < chunk.own_start or (midpoint >= chunk.own_end and not is_last):
+            continue
+        segment.update({"start": start, "end": end})
+        segments.append(segment)
+    return segments
+
+
+def _has_segments(result: Dict[str, Any]) -> bool:
+    """Whether a chunk result carries timestamps for all of its text."""
+    segments = result.get("segments")
+    if segments is None:
+        return False
+    # An empty list is valid for a chunk without speech (silence, or VAD found none)
+    return bool(segments) or not (result.get("text") or "").strip()
+
+
+def stitch_chunk_results(
+    chunks: List[AudioChunk],
+    results: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Stitch per-chunk transcription results into a single result.
+
+    Segment timestamps are shifted onto the original timeline. When every
+    chunk returned segments for its text (a silent chunk may return none),
+    each segment is kept only by the chunk owning its midpoint; otherwise
+    the texts are joined and repeated words at each seam are removed.
+
+    Args:
+        chunks: Planned chunks
+        results: Transcription result for each chunk, in the same order
+
+    Returns:
+        Combined transcription result
+    """
+    have_segments = all(_has_segments(result) for result in results)
+
+    segments: List[Dict[str, Any]] = []
+    text = ""
+    for chunk, result in zip(chunks, results):
+        if have_segments:
+            for segment in owned_segments(chunk, result, is_last=chunk.index == len(chunks) - 1):
+                segment["id"] = len(segments)
+                segments.append(segment)
+        else:
+            text = _merge_overlapping_text(text, result.get("text") or "")
+
+    if have_segments:
+        text = "".join(segment.get("text", "") for segment in segments).strip()
+
+    first = results[0] if results else {}
+    stitched = {key: value for key, value in first.items() if key not in ("text", "segments", "duration")}
+    stitched.update({
+        "text": text,
+        "segments": segments,
+        "chunks": len(chunks),
+    })
+    if results and all(result.get("vad") for result in results):
+        # Overlaps are counted once per chunk, so these are approximate
+        stitched["vad"] = {
+            key: sum(result["vad"][key] for result in results)
+            for key in first["vad"]
+        }
+    return stitched
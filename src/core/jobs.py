@@ -0,0 +1,285 @@
+"""
+Background job queue for long-running transcription and minutes work.
+
+Submitting a job returns immediately with a job id; a bounded pool of worker
+threads runs the work while clients poll its status, progress and result, or
+follow its event log (progress, per-stage timings, partial segments) as it is
+written. Jobs live in memory for a retention period after they finish.
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..utils.disk_cache import to_jsonable
+from ..utils.metrics import JOB_QUEUE_DEPTH, JOBS_RUNNING
+from ..utils.rate_limit import BATCH, llm_priority
+from ..utils.tracing import span
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the queue already holds the maximum number of pending jobs."""
+
+
+class Job:
+    """State of one background job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = Job.QUEUED
+        self.stage = "Queued"
+        self.progress = 0.0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.timings: Dict[str, float] = {}  # Seconds spent in each finished stage
+        self.events: List[Dict[str, Any]] = []
+        self._stage_started = self.created_at
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (Job.SUCCEEDED, Job.FAILED)
+
+    def _publish(self, event: str, data: Dict[str, Any]) -> None:
+        """Append to the event log and wake waiting readers (lock held)."""
+        self.events.append({"id": len(self.events) + 1, "event": event, "data": data})
+        self._changed.notify_all()
+
+    def _enter_stage(self, stage: str) -> None:
+        """Close the timing of the current stage and start ``stage`` (lock held)."""
+        if stage == self.stage:
+            return
+        now = time.time()
+        seconds = now - self._stage_started
+        self.timings[self.stage] = self.timings.get(self.stage, 0.0) + seconds
+        self._publish("timing", {"stage": self.stage, "seconds": seconds})
+        self.stage = stage
+        self._stage_started = now
+
+    def report_progress(self, stage: str, progress: float) -> None:
+        """Progress callback compatible with TranscriptionManager.transcribe_file."""
+        with self._lock:
+            self._enter_stage(stage)
+            # Negative progress signals failure; keep the last real value
+            if progress >= 0:
+                self.progress = min(1.0, progress)
+            self._publish("progress", {
+                "stage": stage,
+                "progress": self.progress,
+                "elapsed": time.time() - (self.started_at or self.created_at),
+            })
+
+    def report_segments(self, segments: List[Any]) -> None:
+        """Segment callback: publish partial transcription segments."""
+        with self._lock:
+            self._publish("segments", {"segments": to_jsonable(segments)})
+
+    def _start(self) -> None:
+        with self._lock:
+            self._enter_stage("Running")
+            self.status = Job.RUNNING
+            self.started_at = time.time()
+            self._publish("status", {"status": self.status})
+
+    def _finish(self, result: Any = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.finished_at = time.time()
+            if error is None:
+                self._enter_stage("Complete")
+                self.status = Job.SUCCEEDED
+                self.progress = 1.0
+                self.result = result
+            else:
+                self._enter_stage("Failed")
+                self.status = Job.FAILED
+                self.error = error
+            self._publish("done", {"status": self.status, "error": self.error, "timings": dict(self.timings)})
+
+    def wait_for_events(self, after: int = 0, timeout: Optional[float] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Block until events newer than ``after`` exist, the job ends, or ``timeout``.
+
+        Args:
+            after: Id of the last event the caller has seen
+            timeout: Maximum seconds to wait
+
+        Returns:
+            (events with id > after, whether the job has finished)
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: len(self.events) > after or self.done, timeout=timeout)
+            return self.events[after:], self.done
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status snapshot (without the result payload)."""
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": self.progress,
+                "error": self.error,
+                "timings": dict(self.timings),
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class JobQueue:
+    """Runs jobs on a bounded worker pool and keeps their state for polling."""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 100,
+        retention_seconds: float = 3600.0,
+    ):
+        """
+        Initialize job queue.
+
+        Args:
+            max_workers: Number of jobs that run at once
+            max_pending: Maximum number of queued (not yet running) jobs
+            retention_seconds: How long finished jobs stay retrievable
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable[..., Any],
+        *args: Any,
+        stream_segments: bool = False,
+        **kwargs: Any,
+    ) -> Job:
+        """
+        Queue ``func(*args, progress_callback=job.report_progress, **kwargs)``.
+
+        Args:
+            kind: Job type label (e.g. 'transcribe', 'minutes')
+            func: Work to run; must accept a ``progress_callback`` keyword
+            stream_segments: Also pass ``segment_callback=job.report_segments``
+                so the work can publish partial results
+
+        Returns:
+            The queued job
+
+        Raises:
+            QueueFullError: If max_pending jobs are already waiting
+        """
+        job = Job(kind)
+        with self._lock:
+            self._prune()
+            if self.pending_count() >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({self.max_pending} pending jobs)")
+            self._jobs[job.id] = job
+        if stream_segments:
+            kwargs["segment_callback"] = job.report_segments
+        JOB_QUEUE_DEPTH.inc()
+        # Carry the submitter's context so the job's spans join its trace
+        self._executor.submit(contextvars.copy_context().run, self._run, job, func, args, kwargs)
+        logger.info(f"Queued {kind} job {job.id}")
+        return job
+
+    def _run(self, job: Job, func: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> None:
+        JOB_QUEUE_DEPTH.dec()
+        JOBS_RUNNING.inc()
+        job._start()
+        try:
+            # The job outlives the request that queued it, so it exports its own spans;
+            # its LLM calls yield to interactive requests under rate limits
+            with span(f"job.{job.kind}", entry=True, **{"job.id": job.id}), llm_priority(BATCH):
+                result = func(*args, progress_callback=job.report_progress, **kwargs)
+        except Exception as e:
+            logger.error(f"{job.kind} job {job.id} failed: {e}")
+            job._finish(error=str(e))
+        else:
+            job._finish(result=result)
+        finally:
+            JOBS_RUNNING.dec()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def pending_count(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return sum(1 for job in list(self._jobs.values()) if job.status == Job.QUEUED)
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the retention period (lock held)."""
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.done and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """Status snapshots of all retained jobs, newest first."""
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+        return [job.to_dict() for job in jobs]
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and job counts by status."""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "queued": counts.get(Job.QUEUED, 0),
+            "running": counts.get(Job.RUNNING, 0),
+            "succeeded": counts.get(Job.SUCCEEDED, 0),
+            "failed": counts.get(Job.FAILED, 0),
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work and optionally wait for running jobs."""
+        self._executor.shutdown(wait=wait)
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Get the process-wide job queue, creating it on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(
+                max_workers=int(os.getenv("JOB_WORKERS", "2")),
+                max_pending=int(os.getenv("JOB_MAX_PENDING", "100")),
+                retention_seconds=float(os.getenv("JOB_RETENTION_SECONDS", "3600")),
+            )
+        return _queue
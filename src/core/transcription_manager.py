@@ -2,16 +2,123 @@
 Main transcription manager that orchestrates the transcription process.
 """
 
+import os
+import json
 import logging
-from typing import Dict, Any, Optional, Callable
+import tempfile
+import threading
+import contextvars
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, Callable
 from pathlib import Path
 
 from ..audio.whisper_service import create_whisper_service, WhisperService
-from ..utils.audio_utils import validate_audio_file, get_audio_duration
+from ..audio.transcription_cache import hash_audio_file, transcription_cache_key
+from ..config.whisper_config import get_default_chunking_config
+from ..audio.stream_ingest import IngestedAudio
+from ..utils.audio_utils import (
+    MAX_FILE_SIZE,
+    SUPPORTED_AUDIO_FORMATS,
+    AudioBuffer,
+    AudioWindow,
+    validate_audio_file,
+)
+from ..utils.audio_probe import AudioInfo, probe_audio
+from ..utils.metrics import (
+    REAL_TIME_FACTOR,
+    TRANSCRIBED_AUDIO_SECONDS,
+    TRANSCRIPTIONS,
+    StageTimer,
+)
+from ..utils.tracing import current_span, traced
+from .chunking import plan_chunks, stitch_chunk_results, owned_segments
 
 
 logger = logging.getLogger(__name__)
 
+# Per-process service used by chunk workers so each keeps one warm model
+_worker_service: Optional[WhisperService] = None
+
+# Long-lived chunk worker pools, one per Whisper config and size
+_chunk_pools: Dict[str, ProcessPoolExecutor] = {}
+_chunk_pools_lock = threading.Lock()
+
+
+def _init_chunk_worker(whisper_config: Dict[str, Any], num_threads: int) -> None:
+    """Process-pool initializer: build the worker's service and limit torch threads."""
+    global _worker_service
+    try:
+        import torch  # type: ignore
+        torch.set_num_threads(num_threads)
+    except Exception:
+        pass
+    _worker_service = create_whisper_service(whisper_config)
+
+
+def _transcribe_chunk(
+    service: WhisperService,
+    source: Any,
+    language: Optional[str],
+    prompt: Optional[str],
+) -> Dict[str, Any]:
+    """Transcribe one chunk given as a WAV path (API providers), samples or an AudioWindow (local)."""
+    if isinstance(source, str):
+        return service.transcribe_audio(source, language=language, prompt=prompt)
+    if isinstance(source, AudioWindow):
+        source = source.load()
+    return service.transcribe_samples(source, language=language, prompt=prompt)
+
+
+def _transcribe_chunk_in_worker(
+    source: Any,
+    language: Optional[str],
+    prompt: Optional[str],
+) -> Dict[str, Any]:
+    """Process-pool entry point: transcribe one chunk with the worker's service."""
+    return _transcribe_chunk(_worker_service, source, language, prompt)
+
+
+def get_chunk_pool(whisper_config: Dict[str, Any], max_workers: int, num_threads: int) -> ProcessPoolExecutor:
+    """
+    Get the process pool for local chunk transcription, created once per config.
+
+    Workers load their model on first use and keep it across requests. They
+    are spawned rather than forked, since forking a multithreaded server
+    process (Flask, torch) can deadlock the child.
+    """
+    key = json.dumps([whisper_config, max_workers, num_threads], sort_keys=True, default=str)
+    with _chunk_pools_lock:
+        pool = _chunk_pools.get(key)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunk_worker,
+                initargs=(whisper_config, num_threads),
+            )
+            _chunk_pools[key] = pool
+        return pool
+
+
+def _discard_chunk_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next request starts a fresh one."""
+    with _chunk_pools_lock:
+        for key, cached in list(_chunk_pools.items()):
+            if cached is pool:
+                del _chunk_pools[key]
+    pool.shutdown(wait=False)
+
+
+def shutdown_chunk_pools() -> None:
+    """Stop all chunk worker pools."""
+    with _chunk_pools_lock:
+        pools = list(_chunk_pools.values())
+        _chunk_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
+
 
 class TranscriptionManager:
     """Manages the audio transcription process."""
@@ -26,10 +133,12 @@ class TranscriptionManager:
         self.config = config or {}
         self.whisper_service = create_whisper_service(self.config.get("whisper", {}))
         
+    @traced("transcribe_file")
     def transcribe_file(
         self, 
         audio_path: str,
-        progress_callback: Optional[Callable[[str, float], None]] = None
+        progress_callback: Optional[Callable[[str, float], None]] = None,
+        segment_callback: Optional[Callable[[List[Dict[str, Any]]], None]] = None
     ) -> Dict[str, Any]:
         """
         Transcribe audio file with progress reporting.
@@ -37,24 +146,140 @@ class TranscriptionManager:
         Args:
             audio_path: Path to audio file
             progress_callback: Function to call with progress updates
+            segment_callback: Function to call with partial segments (on the
+                original timeline) as soon as each part is transcribed
             
         Returns:
-            Transcription results
+            Transcription results, with seconds per stage under "timings"
         """
         audio_path = Path(audio_path)
+        chunking = self._chunking_config()
+        timer = StageTimer("transcription")
         
         if progress_callback:
             progress_callback("Validating audio file...", 0.1)
         
-        # Validate file
-        if not validate_audio_file(str(audio_path)):
+        # Probe headers once and reuse the result for validation and duration
+        with timer.stage("probe"):
+            audio_info = probe_audio(str(audio_path)) if audio_path.exists() else None
+        
+        # Validate file; chunked mode lifts the single-upload size limit
+        max_size = None if chunking["enabled"] else MAX_FILE_SIZE
+        with timer.stage("validate"):
+            valid = validate_audio_file(str(audio_path), max_size=max_size, audio_info=audio_info)
+        if not valid:
+            TRANSCRIPTIONS.labels(self.whisper_service.provider, "invalid").inc()
             raise ValueError(f"Invalid audio file: {audio_path}")
         
-        # Get file info
-        duration = get_audio_duration(str(audio_path))
-        file_size = audio_path.stat().st_size
+        # Decoded at most once, on first use, and shared by duration,
+        # chunking, VAD and the local model
+        with timer.stage("decode"):
+            buffer = AudioBuffer.from_file(str(audio_path))
+            duration = audio_info.duration
+            if duration is None:
+                try:
+                    duration = buffer.duration
+                except (ValueError, ImportError) as e:
+                    logger.warning(f"Could not determine duration of {audio_path.name}: {e}")
+        
+        return self._transcribe(
+            audio_path.name,
+            audio_info,
+            duration,
+            chunking,
+            transcribe_whole=lambda: self.whisper_service.transcribe_audio(
+                str(audio_path),
+                language=self.config.get("language"),
+                prompt=self.config.get("prompt"),
+                audio_info=audio_info,
+                buffer=buffer,
+            ),
+            buffer=buffer,
+            timer=timer,
+            audio_hash=lambda: hash_audio_file(str(audio_path)),
+            progress_callback=progress_callback,
+            segment_callback=segment_callback,
+        )
+    
+    @traced("transcribe_ingested")
+    def transcribe_ingested(
+        self,
+        audio: IngestedAudio,
+        progress_callback: Optional[Callable[[str, float], None]] = None,
+        segment_callback: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Transcribe a streamed upload that was hashed, probed and decoded on arrival.
+        
+        Args:
+            audio: Ingested upload (see src.audio.stream_ingest)
+            progress_callback: Function to call with progress updates
+            segment_callback: Function to call with partial segments
+            
+        Returns:
+            Transcription results, with seconds per stage under "timings"
+        """
+        chunking = self._chunking_config()
+        # Probing and decoding happened while the upload arrived
+        timer = StageTimer("transcription")
+        
+        if progress_callback:
+            progress_callback("Validating audio file...", 0.1)
+        
+        max_size = None if chunking["enabled"] else MAX_FILE_SIZE
+        with timer.stage("validate"):
+            valid = (
+                Path(audio.filename).suffix.lower() in SUPPORTED_AUDIO_FORMATS
+                and (max_size is None or audio.size <= max_size)
+            )
+        if not valid:
+            TRANSCRIPTIONS.labels(self.whisper_service.provider, "invalid").inc()
+            raise ValueError(f"Invalid audio file: {audio.filename}")
         
-        logger.info(f"Transcribing file: {audio_path.name}")
+        return self._transcribe(
+            audio.filename,
+            audio.audio_info,
+            audio.duration,
+            chunking,
+            transcribe_whole=lambda: self.whisper_service.transcribe_ingested(
+                audio,
+                language=self.config.get("language"),
+                prompt=self.config.get("prompt"),
+            ),
+            buffer=audio.buffer,
+            timer=timer,
+            audio_hash=lambda: audio.audio_hash,
+            progress_callback=progress_callback,
+            segment_callback=segment_callback,
+        )
+    
+    def _transcribe(
+        self,
+        name: str,
+        audio_info: AudioInfo,
+        duration: Optional[float],
+        chunking: Dict[str, Any],
+        transcribe_whole: Callable[[], Dict[str, Any]],
+        buffer: AudioBuffer,
+        timer: StageTimer,
+        progress_callback: Optional[Callable[[str, float], None]] = None,
+        segment_callback: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        audio_hash: Optional[Callable[[], str]] = None
+    ) -> Dict[str, Any]:
+        """Transcribe validated audio whole or in chunks and attach metadata and timings.
+
+        ``audio_hash`` returns the SHA-256 of the audio bytes; chunked results
+        are cached under it when the service has a transcription cache.
+        """
+        file_size = audio_info.file_size
+        provider = self.whisper_service.provider
+        trace_span = current_span()
+        if trace_span is not None:
+            trace_span.set_attribute("audio.file", name)
+            trace_span.set_attribute("audio.duration", duration)
+            trace_span.set_attribute("whisper.provider", provider)
+        
+        logger.info(f"Transcribing file: {name}")
         logger.info(f"File size: {file_size / (1024*1024):.1f} MB")
         if duration:
             logger.info(f"Duration: {duration:.1f} seconds")
@@ -64,37 +289,221 @@ class TranscriptionManager:
         
         # Perform transcription
         try:
-            result = self.whisper_service.transcribe_audio(
-                str(audio_path),
-                language=self.config.get("language"),
-                prompt=self.config.get("prompt")
-            )
+            if self._should_chunk(chunking, file_size, duration):
+                cache = self.whisper_service.cache
+                cache_key = self._chunked_cache_key(audio_hash(), chunking) if cache is not None and audio_hash else None
+                result = cache.get(cache_key) if cache_key is not None else None
+                if result is not None:
+                    logger.info(f"Transcription cache hit for: {name}")
+                    result["cached"] = True
+                    if segment_callback and result.get("segments"):
+                        segment_callback(list(result["segments"]))
+                else:
+                    if not buffer.mapped:
+                        # Chunking needs the samples; decode up front so it is timed as decoding
+                        with timer.stage("decode"):
+                            buffer.samples
+                    result = self._transcribe_chunked(
+                        buffer, name, chunking, timer, progress_callback, segment_callback
+                    )
+                    if cache_key is not None:
+                        cache.set(cache_key, result)
+                duration = result.pop("duration", duration)
+            else:
+                if provider == "local" and self.whisper_service.vad and not buffer.mapped:
+                    with timer.stage("decode"):
+                        buffer.samples
+                with timer.stage("inference"):
+                    result = transcribe_whole()
+                if segment_callback and result.get("segments"):
+                    segment_callback(list(result["segments"]))
             
             if progress_callback:
                 progress_callback("Transcription complete!", 1.0)
             
             # Add metadata
-            result.update({
-                "file_name": audio_path.name,
-                "file_size": file_size,
-                "duration": duration,
-                "config": self.config
-            })
+            with timer.stage("postprocess"):
+                result.update({
+                    "file_name": name,
+                    "file_size": file_size,
+                    "duration": duration,
+                    "sample_rate": audio_info.sample_rate,
+                    "channels": audio_info.channels,
+                    "codec": audio_info.codec,
+                    "config": self.config
+                })
+            result["timings"] = dict(timer.timings)
             
+            TRANSCRIPTIONS.labels(provider, "ok").inc()
+            if duration:
+                TRANSCRIBED_AUDIO_SECONDS.labels(provider).inc(duration)
+                REAL_TIME_FACTOR.labels(provider).observe(timer.timings.get("inference", 0.0) / duration)
             logger.info("Transcription completed successfully")
             return result
             
         except Exception as e:
+            TRANSCRIPTIONS.labels(provider, "error").inc()
             logger.error(f"Transcription failed: {e}")
             if progress_callback:
                 progress_callback(f"Transcription failed: {str(e)}", -1)
             raise
     
+    def _chunking_config(self) -> Dict[str, Any]:
+        """Chunking settings: environment defaults overridden by config['chunking']."""
+        chunking = get_default_chunking_config()
+        chunking.update(self.config.get("chunking", {}))
+        return chunking
+
+    @staticmethod
+    def _should_chunk(
+        chunking: Dict[str, Any],
+        file_size: int,
+        duration: Optional[float],
+    ) -> bool:
+        """Decide whether a file should be transcribed in chunks."""
+        enabled = chunking["enabled"]
+        if enabled != "auto":
+            return bool(enabled)
+        if file_size > MAX_FILE_SIZE:
+            return True
+        return bool(duration and duration > chunking["auto_threshold_seconds"])
+
+    def _chunked_cache_key(self, audio_hash: str, chunking: Dict[str, Any]) -> str:
+        """Cache key of a stitched chunked result: the service's key plus the chunk plan."""
+        return transcription_cache_key(
+            self.whisper_service._cache_key(audio_hash, self.config.get("language"), self.config.get("prompt")),
+            chunking={key: chunking[key] for key in ("window_seconds", "overlap_seconds")},
+        )
+
+    def _transcribe_chunked(
+        self,
+        buffer: AudioBuffer,
+        name: str,
+        chunking: Dict[str, Any],
+        timer: StageTimer,
+        progress_callback: Optional[Callable[[str, float], None]] = None,
+        segment_callback: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Transcribe a long recording as overlapping windows in parallel.
+        
+        Args:
+            buffer: Decoded recording
+            name: File name for logging
+            chunking: Chunking settings
+            timer: Receives "chunking", "inference" and "postprocess" times
+            progress_callback: Function to call with progress updates
+            segment_callback: Function to call with each chunk's owned segments
+            
+        Returns:
+            Stitched transcription results on the original timeline
+        """
+        with timer.stage("chunking"):
+            duration = buffer.duration
+            chunks = plan_chunks(
+                duration,
+                window_seconds=chunking["window_seconds"],
+                overlap_seconds=chunking["overlap_seconds"],
+                split_finder=buffer.find_silence_split,
+            )
+        logger.info(f"Transcribing {name} in {len(chunks)} chunks")
+        
+        def chunk_done(index: int, result: Dict[str, Any]) -> None:
+            if segment_callback:
+                segment_callback(owned_segments(chunks[index], result, is_last=index == len(chunks) - 1))
+        
+        if self.whisper_service.provider == "local":
+            # The local model takes windows directly (sample views, or mapped
+            # WAV windows each worker reads for itself)
+            sources = [buffer.window_source(chunk.start, chunk.end) for chunk in chunks]
+            with timer.stage("inference"):
+                results = self._run_chunks(sources, chunking, progress_callback, chunk_done)
+        else:
+            with tempfile.TemporaryDirectory(prefix="minute-maker-chunks-") as tmp_dir:
+                with timer.stage("chunking"):
+                    chunk_paths = [
+                        buffer.window(chunk.start, chunk.end).write_wav(
+                            os.path.join(tmp_dir, f"chunk_{chunk.index:04d}.wav")
+                        )
+                        for chunk in chunks
+                    ]
+                with timer.stage("inference"):
+                    results = self._run_chunks(chunk_paths, chunking, progress_callback, chunk_done)
+        
+        with timer.stage("postprocess"):
+            result = stitch_chunk_results(chunks, results)
+        result["duration"] = duration
+        return result
+
+    def _run_chunks(
+        self,
+        chunk_sources: List[Any],
+        chunking: Dict[str, Any],
+        progress_callback: Optional[Callable[[str, float], None]] = None,
+        result_callback: Optional[Callable[[int, Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Transcribe chunks (WAV paths or samples) concurrently, returning results in chunk order."""
+        language = self.config.get("language")
+        prompt = self.config.get("prompt")
+        cpu_count = os.cpu_count() or 1
+        max_workers = min(len(chunk_sources), chunking.get("max_workers") or cpu_count)
+        
+        # A local model decodes one chunk at a time, so local chunks run in
+        # separate processes; API uploads are I/O bound and use threads.
+        executor_kind = chunking.get("executor") or (
+            "process" if self.whisper_service.provider == "local" else "thread"
+        )
+        if executor_kind == "process":
+            # Shared across requests and sized independently of this request's
+            # chunk count, so every request reuses the same warm workers
+            pool_size = chunking.get("max_workers") or cpu_count
+            executor = get_chunk_pool(
+                self.config.get("whisper", {}), pool_size, max(1, cpu_count // pool_size)
+            )
+            submit = lambda source: executor.submit(_transcribe_chunk_in_worker, source, language, prompt)
+        else:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            # Chunk spans nest under the caller's trace
+            submit = lambda source: executor.submit(
+                contextvars.copy_context().run,
+                _transcribe_chunk, self.whisper_service, source, language, prompt
+            )
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(chunk_sources)
+        futures = {}
+        try:
+            futures = {submit(source): index for index, source in enumerate(chunk_sources)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                results[index] = future.result()
+                if result_callback:
+                    result_callback(index, results[index])
+                if progress_callback:
+                    progress_callback(
+                        f"Transcribed chunk {done}/{len(chunk_sources)}",
+                        0.2 + 0.8 * done / len(chunk_sources),
+                    )
+        except BrokenProcessPool:
+            _discard_chunk_pool(executor)
+            raise
+        except BaseException:
+            # Don't leave this request's remaining chunks queued on a shared pool
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            if executor_kind != "process":
+                executor.shutdown(wait=True)
+        return results
+
     def get_service_info(self) -> Dict[str, Any]:
         """Get information about the transcription service."""
         return {
             "available_models": self.whisper_service.get_available_models(),
             "current_model": self.whisper_service.model_name,
             "using_api": self.whisper_service.use_openai_api,
+            "model_registry": self.whisper_service.model_registry.stats(),
+            "cache": self.whisper_service.cache.stats() if self.whisper_service.cache else None,
+            "routing": self.whisper_service.router.snapshot() if self.whisper_service.router else None,
             "supported_formats": [".mp3", ".wav", ".m4a", ".flac", ".ogg", ".webm"]
         }
\ No newline at end of file
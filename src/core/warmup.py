@@ -0,0 +1,259 @@
+"""
+Startup warmup and readiness.
+
+Loading a Whisper model and running its first inference takes seconds to
+minutes, and the first outbound API call pays a TCP and TLS handshake.
+Warmup does both before traffic arrives: it loads the configured local
+model(s), transcribes a second of generated audio, and opens pooled
+connections to the LLM and Whisper APIs. Each step is a named readiness
+check; /readyz reports ready once every required check has passed. A
+failed warmup is retried with backoff until it succeeds.
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+# Provide safe defaults for optional dependencies so tests can patch them
+np = None  # type: ignore
+
+try:
+    import numpy as np  # type: ignore  # noqa: F401  (reassigns above placeholder)
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from ..config.server_config import get_default_warmup_config
+from ..utils.audio_utils import SAMPLE_RATE, AudioBuffer
+from ..utils.http_client import get_http_client
+from ..utils.metrics import observe_stage
+from ..utils.tracing import span
+
+
+logger = logging.getLogger(__name__)
+
+# Base URLs of the hosted Whisper providers (whisper_api uses its configured URL)
+OPENAI_API_URL = "https://api.openai.com/v1"
+
+_readiness: Optional["Readiness"] = None
+_warmup_thread: Optional[threading.Thread] = None
+_stop = threading.Event()
+_lock = threading.Lock()
+
+
+class Readiness:
+    """Named startup checks; ready once every required check has passed."""
+
+    PENDING = "pending"
+    OK = "ok"
+    FAILED = "failed"
+
+    def __init__(self):
+        self._checks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, required: bool = True) -> None:
+        with self._lock:
+            self._checks[name] = {"status": self.PENDING, "required": required}
+
+    def mark(self, name: str, ok: bool, seconds: Optional[float] = None, detail: Optional[str] = None) -> None:
+        with self._lock:
+            check = self._checks.setdefault(name, {"required": True})
+            check["status"] = self.OK if ok else self.FAILED
+            if seconds is not None:
+                check["seconds"] = round(seconds, 3)
+            if detail:
+                check["detail"] = detail
+
+    @property
+    def failed(self) -> List[str]:
+        """Required checks that failed."""
+        with self._lock:
+            return [
+                name for name, check in self._checks.items()
+                if check["required"] and check["status"] == self.FAILED
+            ]
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return all(check["status"] == self.OK for check in self._checks.values() if check["required"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            checks = {name: dict(check) for name, check in self._checks.items()}
+        return {"ready": self.ready, "checks": checks}
+
+
+def get_readiness() -> Readiness:
+    """Get the process-wide readiness checks."""
+    global _readiness
+    with _lock:
+        if _readiness is None:
+            _readiness = Readiness()
+        return _readiness
+
+
+def reset_warmup_state() -> None:
+    """Stop retrying and forget readiness checks and the warmup thread (for tests)."""
+    global _readiness, _warmup_thread, _stop
+    with _lock:
+        _stop.set()
+        _stop = threading.Event()
+        _readiness = None
+        _warmup_thread = None
+
+
+def warmup_audio(seconds: float = 1.0):
+    """Quiet generated noise at SAMPLE_RATE (exercises the full model without real speech)."""
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 0.01).astype(np.float32)
+
+
+def _local_services(service) -> List[Any]:
+    """The local-model services behind ``service`` (itself, or the router's local backend)."""
+    if service.provider == "local":
+        return [service]
+    if service.provider == "routing":
+        return [backend for backend in service.router.backends.values() if backend.provider == "local"]
+    return []
+
+
+def _api_urls(service) -> List[str]:
+    """Base URLs of the hosted Whisper APIs ``service`` may call."""
+    services = list(service.router.backends.values()) if service.provider == "routing" else [service]
+    urls = []
+    for backend in services:
+        if backend.provider == "openai":
+            urls.append(OPENAI_API_URL)
+        elif backend.provider == "whisper_api" and backend.api_base_url:
+            urls.append(backend.api_base_url)
+    return urls
+
+
+def _timed_check(readiness: Readiness, name: str, step: Callable[[], None]) -> bool:
+    start = time.perf_counter()
+    try:
+        with span(f"warmup.{name}"):
+            step()
+    except Exception as e:
+        seconds = time.perf_counter() - start
+        logger.error(f"Warmup step {name} failed after {seconds:.1f}s: {e}")
+        readiness.mark(name, ok=False, seconds=seconds, detail=str(e))
+        return False
+    seconds = time.perf_counter() - start
+    observe_stage("warmup", name, seconds)
+    logger.info(f"Warmup step {name} took {seconds:.2f}s")
+    readiness.mark(name, ok=True, seconds=seconds)
+    return True
+
+
+def _open_connection(url: str, timeout: float) -> None:
+    # Any HTTP answer means the connection is open and now pooled
+    get_http_client().head(url, timeout=timeout)
+
+
+def run_warmup(
+    service,
+    connection_urls: Optional[List[str]] = None,
+    config: Optional[Dict[str, Any]] = None,
+    readiness: Optional[Readiness] = None,
+) -> Readiness:
+    """
+    Warm up ``service`` and outbound connections, recording readiness checks.
+
+    Model checks are required for readiness; connection checks are not,
+    since an unreachable API should not take transcription out of service.
+
+    Args:
+        service: WhisperService the server transcribes with
+        connection_urls: Extra URLs to pre-connect to (e.g. the LLM endpoint)
+        config: Overrides for get_default_warmup_config()
+        readiness: Checks to record into; defaults to the process-wide ones
+
+    Returns:
+        The readiness checks
+    """
+    settings = get_default_warmup_config()
+    settings.update(config or {})
+    readiness = readiness or get_readiness()
+
+    local = _local_services(service)
+    urls = list(dict.fromkeys(_api_urls(service) + list(connection_urls or []))) if settings["connections"] else []
+    for index, _ in enumerate(local):
+        readiness.register(f"whisper_model_{index}")
+    for url in urls:
+        readiness.register(f"connect {url}", required=False)
+
+    for index, backend in enumerate(local):
+        def warm(backend=backend):
+            backend._ensure_local_model_loaded()
+            if settings["inference"]:
+                samples = warmup_audio(settings["audio_seconds"])
+                if backend.vad:
+                    # Warm the detector too, but VAD would find no speech in the
+                    # noise and skip the model, so the model pass bypasses it
+                    AudioBuffer(samples).speech_regions(detector=backend.vad_detector)
+                backend.transcribe_samples(samples, vad=False)
+        _timed_check(readiness, f"whisper_model_{index}", warm)
+
+    for url in urls:
+        _timed_check(readiness, f"connect {url}", lambda url=url: _open_connection(url, settings["connect_timeout"]))
+    return readiness
+
+
+def start_warmup(
+    service_factory: Callable[[], Any],
+    connection_urls: Optional[List[str]] = None,
+) -> Optional[threading.Thread]:
+    """
+    Start warmup in a background thread, once per process.
+
+    The server answers /healthz meanwhile, and /readyz reports not ready
+    until the required checks pass. If a required check fails, warmup runs
+    again after WARMUP_RETRY_SECONDS (doubling up to
+    WARMUP_RETRY_MAX_SECONDS) until it succeeds. Does nothing if
+    WARMUP_ENABLED=false.
+
+    Args:
+        service_factory: Builds the WhisperService the server will use
+        connection_urls: Extra URLs to pre-connect to
+
+    Returns:
+        The warmup thread, or None if warmup is disabled or already started
+    """
+    global _warmup_thread
+    settings = get_default_warmup_config()
+    if not settings["enabled"]:
+        return None
+    readiness = get_readiness()
+    with _lock:
+        if _warmup_thread is not None:
+            return None
+        stop = _stop
+
+        def work():
+            delay = settings["retry_seconds"]
+            while True:
+                # Pending again while this attempt runs, so only its own failures count
+                readiness.register("warmup")
+                try:
+                    run_warmup(service_factory(), connection_urls, settings, readiness)
+                    error = ", ".join(readiness.failed) or None
+                except Exception as e:
+                    error = str(e)
+                if error is None:
+                    readiness.mark("warmup", ok=True)
+                    return
+                logger.error(f"Warmup failed ({error}); retrying in {delay:.0f}s")
+                readiness.mark("warmup", ok=False, detail=f"{error}; retrying in {delay:.0f}s")
+                if stop.wait(delay):
+                    return
+                delay = min(delay * 2, settings["retry_max_seconds"])
+
+        # Not ready until warmup has at least worked out what to warm
+        readiness.register("warmup")
+        _warmup_thread = threading.Thread(target=work, name="warmup", daemon=True)
+        _warmup_thread.start()
+        return _warmup_thread
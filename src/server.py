@@ -1,19 +1,137 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Request, Response, g, request, jsonify
 import tempfile
 import os
+import json
+import time
+from contextlib import nullcontext
 from pathlib import Path
 
-from transcribe import transcribe_audio
-from qwen_minutes import meeting_minutes
+from transcribe import transcribe_audio, create_transcription_manager
+from qwen_minutes import OPENROUTER_URL, IncrementalMinutes, meeting_minutes
+from src.audio.live_transcription import serve_live_socket
+from src.audio.stream_ingest import AudioIngest, ingest_stream
+from src.config.whisper_config import get_default_ingest_config, get_default_live_config
+from src.core.jobs import QueueFullError, get_job_queue
+from src.core.warmup import get_readiness, start_warmup
+from src.utils.audio_utils import SUPPORTED_AUDIO_FORMATS
+from src.utils.disk_cache import to_jsonable
+from src.utils.llm_cache import bypass_llm_cache
+from src.utils.metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, HTTP_REQUESTS, render_metrics
+from src.utils.tracing import attach, detach, parse_traceparent, start_span
+
+# WebSocket support is optional; live transcription is disabled without it
+Sock = None  # type: ignore
+
+try:
+    from flask_sock import Sock  # type: ignore  # noqa: F401  (reassigns above placeholder)
+    FLASK_SOCK_AVAILABLE = True
+except ImportError:
+    FLASK_SOCK_AVAILABLE = False
+
+
+class StreamingUploadRequest(Request):
+    """Request whose multipart file parts can be written into a custom sink."""
+
+    # Set by a view before it touches request.files; called with the part's filename
+    upload_sink_factory = None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.upload_sink_factory is not None:
+            return self.upload_sink_factory(filename)
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
 
 # Serve static files from project root so frontend and API run on same host
 BASE_DIR = Path(__file__).resolve().parents[1]
 app = Flask(__name__, static_folder=str(BASE_DIR), static_url_path='')
+app.request_class = StreamingUploadRequest
+sock = Sock(app) if FLASK_SOCK_AVAILABLE else None
+
+
+def _server_timing(timings):
+    """Server-Timing header value for a {stage: seconds} dict."""
+    return ", ".join(f"{key};dur={seconds * 1000:.1f}" for key, seconds in timings.items())
+
+
+def _warmup():
+    """Load the Whisper model(s) and open API connections in the background (once)."""
+    start_warmup(
+        lambda: create_transcription_manager().whisper_service,
+        connection_urls=[OPENROUTER_URL],
+    )
+
+
+@app.before_request
+def _start_request_timer():
+    # Under a WSGI server __main__ never runs; the first request (typically a probe) starts warmup
+    _warmup()
+    g.request_started = time.perf_counter()
+    # Root span of the request's trace (continuing the caller's trace if it sent one)
+    g.trace_span = start_span(
+        request.endpoint or "unmatched",
+        parent=parse_traceparent(request.headers.get("traceparent")),
+        **{"http.method": request.method, "http.target": request.path},
+    )
+    g.trace_token = attach(g.trace_span)
+
+
+@app.after_request
+def _record_request_metrics(response):
+    # Route templates, not raw paths, keep label cardinality bounded
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    HTTP_REQUESTS.labels(request.method, endpoint, str(response.status_code)).inc()
+    started = g.get("request_started")
+    if started is not None:
+        HTTP_REQUEST_SECONDS.labels(request.method, endpoint).observe(time.perf_counter() - started)
+    trace_span = g.get("trace_span")
+    if trace_span is not None and trace_span.trace_id:
+        trace_span.set_attribute("http.route", endpoint)
+        trace_span.set_attribute("http.status_code", response.status_code)
+        response.headers["X-Trace-Id"] = trace_span.trace_id
+    return response
+
+
+@app.teardown_request
+def _end_request_span(exc):
+    trace_span = g.pop("trace_span", None)
+    if trace_span is None:
+        return
+    detach(g.pop("trace_token", None))
+    if exc is not None:
+        trace_span.record_exception(exc)
+    trace_span.end()
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus scrape endpoint: request, stage, cache, model and queue metrics."""
+    return Response(render_metrics(), mimetype=None, content_type=CONTENT_TYPE)
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """Liveness probe: the process is up and serving requests."""
+    return jsonify({"status": "ok"})
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """Readiness probe: 200 once warmup has loaded the models, 503 until then."""
+    readiness = get_readiness().to_dict()
+    return jsonify(readiness), 200 if readiness["ready"] else 503
 
 
 @app.route("/api/transcribe", methods=["POST"])
 def api_transcribe():
-    """Accepts multipart file upload (field 'file') and returns a transcription."""
+    """Accepts multipart file upload (field 'file') and returns a transcription.
+
+    The upload is decoded while it is received. A raw audio body (any
+    non-multipart content type, with ?filename=) is accepted as well.
+    """
+    ingest = get_default_ingest_config()
+    if ingest["streaming"]:
+        return _transcribe_streaming(ingest)
+
     if "file" not in request.files:
         return jsonify({"error": "missing file field"}), 400
 
@@ -40,6 +158,48 @@ def api_transcribe():
             pass
 
 
+def _transcribe_streaming(ingest):
+    """Transcribe an upload through the streaming ingest path (no temp file)."""
+    options = {
+        "spill_threshold": int(ingest["spill_threshold_mb"] * 1024 * 1024),
+        "ffmpeg": ingest["ffmpeg"],
+    }
+    try:
+        if request.mimetype == "multipart/form-data":
+            request.upload_sink_factory = lambda filename: AudioIngest(filename or "upload", **options)
+            if "file" not in request.files:
+                return jsonify({"error": "missing file field"}), 400
+            f = request.files["file"]
+            if f.filename == "":
+                return jsonify({"error": "empty filename"}), 400
+            ingested = f.stream.finish()
+        else:
+            extensions = {mime: ext for ext, mime in SUPPORTED_AUDIO_FORMATS.items()}
+            filename = request.args.get("filename") or "upload" + extensions.get(request.mimetype, ".wav")
+            ingested = ingest_stream(request.stream, filename, **options)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        result = create_transcription_manager().transcribe_ingested(ingested)
+        response = jsonify({"text": result["text"]})
+        response.headers["Server-Timing"] = _server_timing(result.get("timings", {}))
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        ingested.cleanup()
+
+
+def api_live(ws):
+    """Live transcription over a WebSocket (protocol in serve_live_socket)."""
+    serve_live_socket(ws, create_transcription_manager().whisper_service, get_default_live_config())
+
+
+if sock is not None:
+    sock.route("/api/live")(api_live)
+
+
 @app.route("/api/minutes", methods=["POST"])
 def api_minutes():
     """Generate structured minutes from a transcript. Expects JSON { transcript, template }"""
@@ -48,13 +208,187 @@ def api_minutes():
     if not transcript:
         return jsonify({"error": "missing transcript"}), 400
 
+    # Regenerate from scratch when the client asks for it (e.g. "Regenerate")
+    refresh = bool(data.get("refresh")) or "no-cache" in request.headers.get("Cache-Control", "")
+
+    try:
+        timings = {}
+        with bypass_llm_cache() if refresh else nullcontext():
+            minutes = meeting_minutes(transcript, timings=timings)
+        response = jsonify(minutes)
+        # Report per-extractor latency without changing the minutes payload
+        response.headers["Server-Timing"] = _server_timing(timings)
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/minutes/incremental", methods=["POST"])
+def api_minutes_incremental():
+    """Update minutes with the transcript text added since the last call.
+
+    Expects JSON { transcript, state } where state is the value returned by
+    the previous call (omit it to start). Returns { minutes, state }. With
+    "refresh": true (or Cache-Control: no-cache) the state is discarded and
+    the minutes are regenerated from scratch, bypassing the LLM cache.
+    """
+    data = request.get_json(force=True)
+    transcript = data.get("transcript")
+    if not transcript:
+        return jsonify({"error": "missing transcript"}), 400
+
+    refresh = bool(data.get("refresh")) or "no-cache" in request.headers.get("Cache-Control", "")
     try:
-        minutes = meeting_minutes(transcript)
-        return jsonify(minutes)
+        engine = IncrementalMinutes.from_dict({} if refresh else data.get("state"))
+    except ValueError as e:
+        return jsonify({"error": f"invalid state: {e}"}), 400
+
+    try:
+        timings = {}
+        with bypass_llm_cache() if refresh else nullcontext():
+            minutes = engine.update(transcript, timings=timings)
+        response = jsonify({"minutes": minutes, "state": engine.to_dict()})
+        response.headers["Server-Timing"] = _server_timing(timings)
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _run_transcription_job(tmp_path, progress_callback=None, segment_callback=None):
+    """Job body: transcribe an uploaded file, then remove it."""
+    try:
+        result = create_transcription_manager().transcribe_file(
+            tmp_path, progress_callback=progress_callback, segment_callback=segment_callback
+        )
+        # Never expose the service configuration (it may hold API keys)
+        result.pop("config", None)
+        return to_jsonable(result)
+    finally:
+        try:
+            os.unlink(tmp_path)
+        except Exception:
+            pass
+
+
+def _run_minutes_job(transcript, refresh=False, progress_callback=None):
+    """Job body: generate minutes for a transcript."""
+    if progress_callback:
+        progress_callback("Generating minutes...", 0.1)
+    timings = {}
+    with bypass_llm_cache() if refresh else nullcontext():
+        minutes = meeting_minutes(transcript, timings=timings)
+    return {"minutes": minutes, "timings": timings}
+
+
+def _job_accepted(job):
+    payload = job.to_dict()
+    payload.update({
+        "status_url": f"/api/jobs/{job.id}",
+        "result_url": f"/api/jobs/{job.id}/result",
+        "events_url": f"/api/jobs/{job.id}/events",
+    })
+    return jsonify(payload), 202
+
+
+@app.route("/api/jobs/transcribe", methods=["POST"])
+def api_submit_transcription_job():
+    """Queue a transcription of an uploaded file (field 'file'); returns a job id at once."""
+    if "file" not in request.files:
+        return jsonify({"error": "missing file field"}), 400
+
+    f = request.files["file"]
+    if f.filename == "":
+        return jsonify({"error": "empty filename"}), 400
+
+    # The upload must outlive this request, so the job removes the file when done
+    suffix = Path(f.filename).suffix or ".wav"
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        f.save(tmp.name)
+        tmp_path = tmp.name
+
+    try:
+        job = get_job_queue().submit("transcribe", _run_transcription_job, tmp_path, stream_segments=True)
+    except QueueFullError as e:
+        os.unlink(tmp_path)
+        return jsonify({"error": str(e)}), 503
+    return _job_accepted(job)
+
+
+@app.route("/api/jobs/minutes", methods=["POST"])
+def api_submit_minutes_job():
+    """Queue minutes generation. Expects JSON { transcript, template, refresh }"""
+    data = request.get_json(force=True)
+    transcript = data.get("transcript")
+    if not transcript:
+        return jsonify({"error": "missing transcript"}), 400
+
+    try:
+        job = get_job_queue().submit(
+            "minutes", _run_minutes_job, transcript, refresh=bool(data.get("refresh"))
+        )
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503
+    return _job_accepted(job)
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def api_job_status(job_id):
+    """Report a job's state and progress."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route("/api/jobs/<job_id>/result", methods=["GET"])
+def api_job_result(job_id):
+    """Return a finished job's output (202 while it is still running)."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    if job.status == job.FAILED:
+        return jsonify({"error": job.error, "job": job.to_dict()}), 500
+    if not job.done:
+        return jsonify(job.to_dict()), 202
+    return jsonify(job.result)
+
+
+# Idle streams send a comment this often so proxies keep the connection open
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+@app.route("/api/jobs/<job_id>/events", methods=["GET"])
+def api_job_events(job_id):
+    """Stream a job's progress, stage timings and partial segments as server-sent events."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+
+    # EventSource resends the last id it saw when it reconnects
+    try:
+        last_id = int(request.headers.get("Last-Event-ID") or request.args.get("after") or 0)
+    except ValueError:
+        last_id = 0
+
+    def stream():
+        nonlocal last_id
+        yield "retry: 2000\n\n"
+        while True:
+            events, done = job.wait_for_events(last_id, timeout=SSE_KEEPALIVE_SECONDS)
+            if not events and not done:
+                yield ": keep-alive\n\n"
+            for event in events:
+                last_id = event["id"]
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+            if done and last_id >= len(job.events):
+                return
+
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # Disable proxy buffering (nginx)
+    })
+
+
 @app.route('/', defaults={'path': 'index.html'})
 @app.route('/<path:path>')
 def serve_frontend(path):
@@ -70,4 +404,7 @@ def serve_frontend(path):
 
 if __name__ == "__main__":
     # For local development only
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        # Only the reloader's serving child warms up; the watcher process never serves
+        _warmup()
     app.run(host="0.0.0.0", port=8000, debug=True)
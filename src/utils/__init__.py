@@ -1,5 +1,12 @@
 """Utility modules for Minute Maker."""
 
 from .audio_utils import validate_audio_file, get_audio_duration, convert_audio_format
+from .audio_probe import AudioInfo, probe_audio
 
-__all__ = ["validate_audio_file", "get_audio_duration", "convert_audio_format"]
\ No newline at end of file
+__all__ = [
+    "validate_audio_file",
+    "get_audio_duration",
+    "convert_audio_format",
+    "AudioInfo",
+    "probe_audio",
+]
\ No newline at end of file
@@ -0,0 +1,456 @@
+"""
+Header-only audio probing.
+
+Reads just the container headers of WAV, FLAC, MP3, OGG, M4A and WebM files
+to identify the content by its magic bytes and report duration, sample rate,
+channels and codec, without decoding any audio.
+"""
+
+import os
+import struct
+from typing import BinaryIO, Callable, Dict, Optional, NamedTuple, Tuple
+
+
+class AudioInfo(NamedTuple):
+    """Container-level facts about an audio file."""
+
+    format: str  # Container detected from magic bytes (wav, flac, mp3, ogg, m4a, webm)
+    codec: Optional[str]
+    duration: Optional[float]  # Seconds, None if the header does not say
+    sample_rate: Optional[int]
+    channels: Optional[int]
+    file_size: int
+
+
+def probe_audio(file_path: str) -> Optional[AudioInfo]:
+    """
+    Probe an audio file by reading only its headers.
+
+    Args:
+        file_path: Path to audio file
+
+    Returns:
+        AudioInfo, or None if the content is not a supported audio container
+    """
+    try:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            return probe_audio_stream(f, file_size)
+    except OSError:
+        return None
+
+
+def probe_audio_stream(f: BinaryIO, file_size: int) -> Optional[AudioInfo]:
+    """
+    Probe audio held in a seekable binary stream (e.g. an in-memory upload).
+
+    Args:
+        f: Stream positioned at the start of the audio
+        file_size: Total size of the audio in bytes
+
+    Returns:
+        AudioInfo, or None if the content is not a supported audio container
+    """
+    container = detect_container(f.read(16))
+    if container is None:
+        return None
+    f.seek(0)
+    try:
+        fields = _PARSERS[container](f, file_size)
+    except (struct.error, ValueError, IndexError):
+        # Magic bytes matched but the header is truncated or unusual;
+        # leave the details to the decoder
+        fields = (None, None, None, None)
+    if fields is None:
+        return None
+    codec, duration, sample_rate, channels = fields
+    return AudioInfo(container, codec, duration, sample_rate, channels, file_size)
+
+
+def detect_container(head: bytes) -> Optional[str]:
+    """Identify an audio container from the first bytes of a file."""
+    if head[:4] in (b"RIFF", b"RF64") and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[4:8] == b"ftyp":
+        return "m4a"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[:3] == b"ID3":
+        # ID3v2 tags precede both MP3 and (rarely) FLAC streams; MP3 is checked on parse
+        return "mp3"
+    if len(head) >= 4 and _parse_mpeg_header(head[:4]) is not None:
+        return "mp3"
+    return None
+
+
+_Fields = Optional[Tuple[Optional[str], Optional[float], Optional[int], Optional[int]]]
+
+
+# --- WAV ---
+
+_WAV_CODECS = {1: "pcm", 3: "pcm_float", 6: "alaw", 7: "mulaw", 0xFFFE: "pcm"}
+
+
+def _probe_wav(f: BinaryIO, file_size: int) -> _Fields:
+    f.seek(12)
+    fmt = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        chunk_id, chunk_size = struct.unpack("<4sI", header)
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack("<HHIIHH", f.read(16))
+            f.seek(chunk_size - 16 + (chunk_size & 1), os.SEEK_CUR)
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            audio_format, channels, sample_rate, byte_rate, _, bits = fmt
+            # Streamed and RF64 files may leave the size unset
+            data_size = min(chunk_size, file_size - f.tell())
+            codec = _WAV_CODECS.get(audio_format, f"wav_0x{audio_format:04x}")
+            if codec.startswith("pcm"):
+                codec = f"{codec}_{bits}"
+            duration = data_size / byte_rate if byte_rate else None
+            return codec, duration, sample_rate, channels
+        else:
+            f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+    if fmt is None:
+        return None
+    return None, None, fmt[2], fmt[1]
+
+
+# --- FLAC ---
+
+def _probe_flac(f: BinaryIO, file_size: int) -> _Fields:
+    f.seek(4)
+    block_header = f.read(4)
+    if len(block_header) < 4 or block_header[0] & 0x7F != 0:
+        return None
+    streaminfo = f.read(34)
+    if len(streaminfo) < 34:
+        return None
+    packed = int.from_bytes(streaminfo[10:18], "big")
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    duration = total_samples / sample_rate if sample_rate and total_samples else None
+    return "flac", duration, sample_rate, channels
+
+
+# --- MP3 ---
+
+_MPEG_BITRATES = {
+    # (version_is_mpeg1, layer): kbps by index
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MPEG_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def _parse_mpeg_header(header: bytes) -> Optional[Dict[str, int]]:
+    """Decode a 4-byte MPEG audio frame header, or None if it is not one."""
+    value = int.from_bytes(header, "big")
+    if value >> 21 != 0x7FF:
+        return None
+    version = (value >> 19) & 0x3  # 3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5
+    layer = 4 - ((value >> 17) & 0x3)
+    bitrate_index = (value >> 12) & 0xF
+    rate_index = (value >> 10) & 0x3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1 = version == 3
+    if layer == 1:
+        samples_per_frame = 384
+    elif layer == 2 or mpeg1:
+        samples_per_frame = 1152
+    else:
+        samples_per_frame = 576
+    return {
+        "mpeg1": mpeg1,
+        "layer": layer,
+        "bitrate": _MPEG_BITRATES[(mpeg1, layer)][bitrate_index] * 1000,
+        "sample_rate": _MPEG_SAMPLE_RATES[version][rate_index],
+        "channels": 1 if (value >> 6) & 0x3 == 3 else 2,
+        "samples_per_frame": samples_per_frame,
+    }
+
+
+def _probe_mp3(f: BinaryIO, file_size: int) -> _Fields:
+    start = 0
+    header = f.read(10)
+    if header[:3] == b"ID3":
+        size = ((header[6] & 0x7F) << 21) | ((header[7] & 0x7F) << 14) | ((header[8] & 0x7F) << 7) | (header[9] & 0x7F)
+        start = 10 + size + (10 if header[5] & 0x10 else 0)
+
+    # Tolerate a little padding between the tag and the first frame
+    f.seek(start)
+    window = f.read(4096)
+    frame = None
+    for offset in range(max(0, len(window) - 3)):
+        if window[offset] == 0xFF:
+            frame = _parse_mpeg_header(window[offset:offset + 4])
+            if frame is not None:
+                start += offset
+                break
+    if frame is None:
+        return None
+
+    codec = f"mp{frame['layer']}"
+    # VBR files carry a Xing/Info or VBRI header with the frame count
+    f.seek(start)
+    first = f.read(64)
+    side_info = (32 if frame["channels"] == 2 else 17) if frame["mpeg1"] else (17 if frame["channels"] == 2 else 9)
+    xing_at = 4 + side_info
+    frames = None
+    if first[xing_at:xing_at + 4] in (b"Xing", b"Info"):
+        flags = int.from_bytes(first[xing_at + 4:xing_at + 8], "big")
+        if flags & 0x1:
+            frames = int.from_bytes(first[xing_at + 8:xing_at + 12], "big")
+    elif first[36:40] == b"VBRI":
+        frames = int.from_bytes(first[50:54], "big")
+
+    if frames:
+        duration = frames * frame["samples_per_frame"] / frame["sample_rate"]
+    else:
+        audio_bytes = file_size - start
+        f.seek(max(0, file_size - 128))
+        if f.read(3) == b"TAG":
+            audio_bytes -= 128
+        duration = audio_bytes * 8 / frame["bitrate"]
+    return codec, duration, frame["sample_rate"], frame["channels"]
+
+
+# --- OGG ---
+
+def _probe_ogg(f: BinaryIO, file_size: int) -> _Fields:
+    page = f.read(27)
+    segment_count = page[26]
+    serial = page[14:18]
+    segments = f.read(segment_count)
+    packet = f.read(min(sum(segments), 64))
+
+    pre_skip = 0
+    if packet.startswith(b"\x01vorbis"):
+        codec = "vorbis"
+        channels = packet[11]
+        sample_rate = granule_rate = struct.unpack("<I", packet[12:16])[0]
+    elif packet.startswith(b"OpusHead"):
+        codec = "opus"
+        channels = packet[9]
+        pre_skip = struct.unpack("<H", packet[10:12])[0]
+        sample_rate = struct.unpack("<I", packet[12:16])[0] or 48000
+        granule_rate = 48000  # Opus granule positions always count 48 kHz samples
+    elif packet.startswith(b"\x7fFLAC"):
+        codec = "flac"
+        packed = int.from_bytes(packet[27:35], "big")
+        sample_rate = granule_rate = packed >> 44
+        channels = ((packed >> 41) & 0x7) + 1
+    else:
+        return None, None, None, None
+
+    # The last page of the stream holds the final granule position
+    tail_size = min(file_size, 65536)
+    f.seek(file_size - tail_size)
+    tail = f.read(tail_size)
+    duration = None
+    index = tail.rfind(b"OggS")
+    while index != -1:
+        if tail[index + 14:index + 18] == serial:
+            granule = struct.unpack("<q", tail[index + 6:index + 14])[0]
+            if granule > 0 and granule_rate:
+                duration = max(0, granule - pre_skip) / granule_rate
+            break
+        index = tail.rfind(b"OggS", 0, index)
+    return codec, duration, sample_rate, channels
+
+
+# --- M4A / MP4 ---
+
+_MP4_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+_MP4_AUDIO_CODECS = {b"mp4a": "aac", b"alac": "alac", b"Opus": "opus", b"fLaC": "flac", b"ac-3": "ac3"}
+
+
+def _iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None):
+    """Yield (type, payload_start, payload_end) for boxes in a byte range."""
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack(">I4s", data[pos:pos + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[pos + 8:pos + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield box_type, pos + header, min(pos + size, end)
+        pos += size
+
+
+def _probe_m4a(f: BinaryIO, file_size: int) -> _Fields:
+    # Walk top-level boxes by seeking, so a large mdat before moov is never read
+    pos = 0
+    moov = None
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        size, box_type = struct.unpack(">I4s", f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = file_size - pos
+        if size < header:
+            break
+        if box_type == b"moov":
+            moov = f.read(size - header)
+            break
+        pos += size
+    if moov is None:
+        return None, None, None, None
+
+    result = {"codec": None, "duration": None, "sample_rate": None, "channels": None}
+
+    def walk(start: int, end: int, handler: Optional[bytes] = None) -> None:
+        for box_type, payload, box_end in _iter_boxes(moov, start, end):
+            if box_type == b"mvhd":
+                version = moov[payload]
+                if version == 1:
+                    timescale, duration = struct.unpack(">IQ", moov[payload + 20:payload + 32])
+                else:
+                    timescale, duration = struct.unpack(">II", moov[payload + 12:payload + 20])
+                if timescale:
+                    result["duration"] = duration / timescale
+            elif box_type == b"trak":
+                # Find the handler first so only sound tracks are inspected
+                trak_handler = None
+                for inner_type, inner_payload, inner_end in _iter_boxes(moov, payload, box_end):
+                    if inner_type == b"mdia":
+                        for hdlr_type, hdlr_payload, _ in _iter_boxes(moov, inner_payload, inner_end):
+                            if hdlr_type == b"hdlr":
+                                trak_handler = moov[hdlr_payload + 8:hdlr_payload + 12]
+                if trak_handler == b"soun" and result["codec"] is None:
+                    walk(payload, box_end, trak_handler)
+            elif box_type in _MP4_CONTAINERS:
+                walk(payload, box_end, handler)
+            elif box_type == b"stsd" and handler == b"soun":
+                # Full box header (4) + entry count (4), then the first sample entry
+                for entry_type, entry_payload, _ in _iter_boxes(moov, payload + 8, box_end):
+                    result["codec"] = _MP4_AUDIO_CODECS.get(entry_type, entry_type.decode("latin-1").strip())
+                    result["channels"] = struct.unpack(">H", moov[entry_payload + 16:entry_payload + 18])[0]
+                    result["sample_rate"] = struct.unpack(">I", moov[entry_payload + 24:entry_payload + 28])[0] >> 16
+                    break
+
+    walk(0, len(moov))
+    return result["codec"], result["duration"], result["sample_rate"], result["channels"]
+
+
+# --- WebM / Matroska ---
+
+_EBML_SEGMENT = 0x18538067
+_EBML_INFO = 0x1549A966
+_EBML_TRACKS = 0x1654AE6B
+_EBML_CLUSTER = 0x1F43B675
+_EBML_TRACK_ENTRY = 0xAE
+_EBML_AUDIO = 0xE1
+
+
+def _read_vint(f: BinaryIO, keep_marker: bool) -> Tuple[Optional[int], int]:
+    """Read an EBML variable-length integer; returns (value, length)."""
+    first = f.read(1)
+    if not first:
+        raise ValueError("unexpected end of EBML data")
+    byte = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not byte & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise ValueError("invalid EBML variable-length integer")
+    value = byte if keep_marker else byte & (mask - 1)
+    rest = f.read(length - 1)
+    all_ones = value == mask - 1
+    for b in rest:
+        value = (value << 8) | b
+        all_ones = all_ones and b == 0xFF
+    if not keep_marker and all_ones:
+        return None, length  # Unknown size
+    return value, length
+
+
+def _probe_webm(f: BinaryIO, file_size: int) -> _Fields:
+    result = {"codec": None, "duration": None, "sample_rate": None, "channels": None}
+    timecode_scale = 1_000_000
+    raw_duration = None
+
+    def read_uint(size: int) -> int:
+        return int.from_bytes(f.read(size), "big")
+
+    def read_float(size: int) -> float:
+        return struct.unpack(">f" if size == 4 else ">d", f.read(size))[0]
+
+    def walk(end: int, in_track: Optional[Dict] = None) -> bool:
+        """Walk elements until ``end``; returns False once clusters are reached."""
+        nonlocal timecode_scale, raw_duration
+        while f.tell() < end:
+            element_id, _ = _read_vint(f, keep_marker=True)
+            size, _ = _read_vint(f, keep_marker=False)
+            data_start = f.tell()
+            data_end = end if size is None else min(end, data_start + size)
+            if element_id == _EBML_CLUSTER:
+                return False
+            if element_id in (_EBML_SEGMENT, _EBML_INFO, _EBML_TRACKS, _EBML_AUDIO):
+                if not walk(data_end, in_track):
+                    return False
+            elif element_id == _EBML_TRACK_ENTRY:
+                track: Dict = {}
+                walk(data_end, track)
+                if track.get("type") == 2 and result["codec"] is None:
+                    result["codec"] = track.get("codec")
+                    result["sample_rate"] = track.get("sample_rate")
+                    result["channels"] = track.get("channels", 1)
+            elif element_id == 0x2AD7B1:
+                timecode_scale = read_uint(size)
+            elif element_id == 0x4489:
+                raw_duration = read_float(size)
+            elif in_track is not None and element_id == 0x83:
+                in_track["type"] = read_uint(size)
+            elif in_track is not None and element_id == 0x86:
+                in_track["codec"] = f.read(size).decode("ascii", "replace").lower().replace("a_", "", 1)
+            elif in_track is not None and element_id == 0xB5:
+                in_track["sample_rate"] = int(read_float(size))
+            elif in_track is not None and element_id == 0x9F:
+                in_track["channels"] = read_uint(size)
+            f.seek(data_end)
+        return True
+
+    # EBML header, then the segment
+    f.seek(4)
+    header_size, _ = _read_vint(f, keep_marker=False)
+    f.seek(header_size, os.SEEK_CUR)
+    walk(file_size)
+
+    if raw_duration:
+        result["duration"] = raw_duration * timecode_scale / 1e9
+    return result["codec"], result["duration"], result["sample_rate"], result["channels"]
+
+
+_PARSERS: Dict[str, Callable[[BinaryIO, int], _Fields]] = {
+    "wav": _probe_wav,
+    "flac": _probe_flac,
+    "mp3": _probe_mp3,
+    "ogg": _probe_ogg,
+    "m4a": _probe_m4a,
+    "webm": _probe_webm,
+}
@@ -1,11 +1,19 @@
 """
-Audio file utilities for validation and format conversion.
+Audio file utilities for validation, format conversion and voice activity detection.
 """
 
 import os
+import mmap
+import wave
+import struct
+import shutil
 import mimetypes
+import threading
+import subprocess
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .audio_probe import AudioInfo, probe_audio
 
 # Provide placeholder so tests can patch even if import fails
 AudioSegment = None  # type: ignore
@@ -16,6 +24,14 @@ try:
 except ImportError:
     PYDUB_AVAILABLE = False
 
+np = None  # type: ignore
+
+try:
+    import numpy as np  # type: ignore  # noqa: F401
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 
 # Supported audio formats
 SUPPORTED_AUDIO_FORMATS = {
@@ -30,13 +46,24 @@ SUPPORTED_AUDIO_FORMATS = {
 # Maximum file size (25MB)
 MAX_FILE_SIZE = 25 * 1024 * 1024
 
+# Whisper models consume 16 kHz mono audio
+SAMPLE_RATE = 16000
+
 
-def validate_audio_file(file_path: str) -> bool:
+def validate_audio_file(
+    file_path: str,
+    max_size: Optional[int] = MAX_FILE_SIZE,
+    audio_info: Optional[AudioInfo] = None,
+) -> bool:
     """
-    Validate audio file format and size.
+    Validate audio file format, size and content.
     
     Args:
         file_path: Path to audio file
+        max_size: Maximum file size in bytes, or None to skip the size check
+            (chunked transcription handles arbitrarily long recordings)
+        audio_info: Result of a previous probe_audio call, to avoid re-reading
+            the headers
         
     Returns:
         True if file is valid, False otherwise
@@ -47,7 +74,7 @@ def validate_audio_file(file_path: str) -> bool:
         return False
     
     # Check file size
-    if file_path.stat().st_size > MAX_FILE_SIZE:
+    if max_size is not None and file_path.stat().st_size > max_size:
         return False
     
     # Check file extension
@@ -62,19 +89,31 @@ def validate_audio_file(file_path: str) -> bool:
     if mime_type and not mime_type.startswith('audio/'):
         return False
     
-    return True
+    # Verify the content is really audio by its magic bytes
+    if audio_info is None:
+        audio_info = probe_audio(str(file_path))
+    return audio_info is not None
 
 
-def get_audio_duration(file_path: str) -> Optional[float]:
+def get_audio_duration(file_path: str, audio_info: Optional[AudioInfo] = None) -> Optional[float]:
     """
     Get audio file duration in seconds.
     
+    The duration is read from the container headers; the file is only decoded
+    when the headers do not record it.
+    
     Args:
         file_path: Path to audio file
+        audio_info: Result of a previous probe_audio call
         
     Returns:
         Duration in seconds, or None if unable to determine
     """
+    if audio_info is None:
+        audio_info = probe_audio(file_path)
+    if audio_info is not None and audio_info.duration is not None:
+        return audio_info.duration
+    
     if not PYDUB_AVAILABLE:
         return None
     
@@ -112,6 +151,518 @@ def convert_audio_format(
         return False
 
 
+# (start, end) in seconds
+SpeechRegion = Tuple[float, float]
+
+
+def detect_speech_regions(
+    samples,
+    sample_rate: int = 16000,
+    frame_ms: int = 30,
+    margin_db: float = 12.0,
+    silence_thresh_db: float = -50.0,
+    min_flux: float = 0.1,
+    min_speech_ms: int = 250,
+    min_silence_ms: int = 600,
+    padding_ms: int = 200,
+    detector: Optional[Callable[[Any, int], List[SpeechRegion]]] = None,
+) -> List[SpeechRegion]:
+    """
+    Find the stretches of a recording that contain speech.
+    
+    Frames count as speech when they are louder than the recording's noise
+    floor by ``margin_db`` and their spectrum keeps changing (spectral flux),
+    which rules out silence, hum and steady tones. Short gaps are bridged,
+    short blips dropped and each region padded so words are not clipped.
+    
+    Args:
+        samples: Mono float samples in [-1, 1]
+        sample_rate: Sample rate of ``samples`` in Hz
+        frame_ms: Analysis frame length
+        margin_db: How far above the noise floor (10th percentile) speech is
+        silence_thresh_db: Absolute level (dBFS) below which audio is silent
+        min_flux: Minimum normalized spectral flux for a speech frame
+        min_speech_ms: Shorter detections are discarded
+        min_silence_ms: Shorter pauses are kept inside the surrounding region
+        padding_ms: Audio kept either side of each region
+        detector: Optional model-based detector ``(samples, sample_rate) ->
+            regions`` used instead of the energy/flux heuristic
+        
+    Returns:
+        Speech regions in seconds, in timeline order
+    """
+    if detector is not None:
+        return [(float(start), float(end)) for start, end in detector(samples, sample_rate)]
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy is required for voice activity detection")
+    
+    samples = np.asarray(samples, dtype=np.float32)
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    count = len(samples) // frame
+    if count == 0:
+        return []
+    frames = samples[:count * frame].reshape(count, frame)
+    
+    # Loudness per frame, relative to the recording's own noise floor
+    energy_db = 20 * np.log10(np.sqrt(np.mean(frames ** 2, axis=1)) + 1e-10)
+    threshold = max(np.percentile(energy_db, 10) + margin_db, silence_thresh_db)
+    
+    # Spectral flux between consecutive (shape-normalized) magnitude spectra
+    spectra = np.abs(np.fft.rfft(frames * np.hanning(frame), axis=1))
+    spectra /= spectra.sum(axis=1, keepdims=True) + 1e-10
+    flux = np.concatenate(([0.0], np.abs(np.diff(spectra, axis=0)).sum(axis=1)))
+    flux = np.convolve(flux, np.ones(5) / 5, mode="same")
+    
+    speech = (energy_db > threshold) & (flux > min_flux)
+    
+    # Runs of speech frames as [start, end) frame indices
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    frame_seconds = frame / sample_rate
+    
+    regions: List[List[float]] = []
+    for start, end in zip(starts * frame_seconds, ends * frame_seconds):
+        if regions and start - regions[-1][1] < min_silence_ms / 1000.0:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+    
+    duration = len(samples) / sample_rate
+    padding = padding_ms / 1000.0
+    padded: List[SpeechRegion] = []
+    for start, end in regions:
+        if end - start < min_speech_ms / 1000.0:
+            continue
+        start, end = max(0.0, start - padding), min(duration, end + padding)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], end)
+        else:
+            padded.append((float(start), float(end)))
+    return padded
+
+
+def extract_speech(samples, regions: List[SpeechRegion], sample_rate: int = 16000):
+    """Concatenate the samples inside ``regions`` into one compact array."""
+    if not regions:
+        return samples[:0]
+    return np.concatenate([
+        samples[int(start * sample_rate):int(end * sample_rate)] for start, end in regions
+    ])
+
+
+def remap_timestamp(seconds: float, regions: List[SpeechRegion], is_end: bool = False) -> float:
+    """
+    Map a time on the compacted (speech-only) timeline back to the original.
+    
+    Args:
+        seconds: Time in the concatenated speech audio
+        regions: Regions that were concatenated, in order
+        is_end: Resolve a time on a region boundary to the end of the earlier
+            region rather than the start of the next one
+        
+    Returns:
+        Time in seconds on the original timeline
+    """
+    offset = 0.0
+    for start, end in regions:
+        length = end - start
+        if seconds < offset + length or (is_end and seconds <= offset + length):
+            return start + max(0.0, seconds - offset)
+        offset += length
+    return regions[-1][1] if regions else seconds
+
+
+def remap_segments(segments: List[Any], regions: List[SpeechRegion]) -> List[Dict[str, Any]]:
+    """Shift segment (and word) timestamps from the speech-only timeline to the original."""
+    remapped = []
+    for segment in segments:
+        segment = dict(segment) if isinstance(segment, dict) else dict(vars(segment))
+        segment["start"] = remap_timestamp(segment.get("start", 0.0), regions)
+        segment["end"] = remap_timestamp(segment.get("end", 0.0), regions, is_end=True)
+        if segment.get("words"):
+            segment["words"] = [
+                dict(word, start=remap_timestamp(word["start"], regions),
+                     end=remap_timestamp(word["end"], regions, is_end=True))
+                for word in segment["words"]
+            ]
+        remapped.append(segment)
+    return remapped
+
+
+def decode_audio(file_path: str, sample_rate: int = SAMPLE_RATE, ffmpeg: str = "ffmpeg"):
+    """
+    Decode an audio file to mono float32 samples in [-1, 1].
+    
+    16-bit mono WAV files already at ``sample_rate`` are read directly;
+    everything else goes through a single ffmpeg process.
+    
+    Args:
+        file_path: Path to audio file
+        sample_rate: Target sample rate in Hz
+        ffmpeg: ffmpeg executable
+        
+    Returns:
+        NumPy float32 array
+        
+    Raises:
+        ValueError: If the file cannot be decoded
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy is required to decode audio")
+    
+    try:
+        with wave.open(file_path, "rb") as wav:
+            if (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) == (1, 2, sample_rate):
+                pcm = wav.readframes(wav.getnframes())
+                return np.frombuffer(pcm, "<i2").astype(np.float32) / 32768.0
+    except (wave.Error, EOFError, OSError):
+        pass
+    
+    executable = shutil.which(ffmpeg)
+    if executable is None:
+        raise ValueError(f"Unable to decode audio (ffmpeg not found): {file_path}")
+    cmd = [
+        executable, "-nostdin", "-hide_banner", "-loglevel", "error", "-threads", "0",
+        "-i", file_path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate),
+        "-",
+    ]
+    proc = subprocess.run(cmd, capture_output=True)
+    if proc.returncode != 0:
+        message = proc.stderr.decode("utf-8", "replace").strip()
+        raise ValueError(f"Unable to decode audio: {file_path}: {message}")
+    return np.frombuffer(proc.stdout, np.int16).astype(np.float32) / 32768.0
+
+
+def resample(samples, from_rate: int, to_rate: int):
+    """Linearly resample mono float32 samples from ``from_rate`` to ``to_rate`` Hz."""
+    if from_rate == to_rate or not len(samples):
+        return samples
+    count = int(round(len(samples) * to_rate / from_rate))
+    positions = np.arange(count, dtype=np.float64) * (from_rate / to_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+_WAV_FORMAT_PCM = 1
+_WAV_FORMAT_FLOAT = 3
+_WAV_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class MappedWav:
+    """
+    Read-only memory map over the PCM data of a WAV (or RF64) file.
+    
+    ``view`` returns NumPy views straight into the mapping, so walking a
+    multi-GB capture only touches the pages of the window being read; the
+    OS can drop them again under memory pressure.
+    """
+    
+    def __init__(self, file_path: str):
+        """
+        Map a WAV file.
+        
+        Args:
+            file_path: Path to a PCM (8/16/32-bit) or 32-bit float WAV file
+            
+        Raises:
+            ValueError: If the file is not a WAV file this reader supports
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required to map WAV files")
+        self.path = str(file_path)
+        with open(self.path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"Empty file: {file_path}")
+        try:
+            self._parse()
+        except (struct.error, ValueError):
+            self._mmap.close()
+            raise
+    
+    def _parse(self) -> None:
+        mm = self._mmap
+        if mm[:4] not in (b"RIFF", b"RF64") or mm[8:12] != b"WAVE":
+            raise ValueError(f"Not a WAV file: {self.path}")
+        
+        fmt = None
+        data_size64 = None
+        offset = 12
+        while offset + 8 <= len(mm):
+            chunk_id = mm[offset:offset + 4]
+            (size,) = struct.unpack("<I", mm[offset + 4:offset + 8])
+            body = offset + 8
+            if chunk_id == b"ds64":
+                # RF64: real sizes of files over 4 GB live here
+                (data_size64,) = struct.unpack("<Q", mm[body + 8:body + 16])
+            elif chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", mm[body:body + 16])
+                if fmt[0] == _WAV_FORMAT_EXTENSIBLE and size >= 26:
+                    # The real format tag starts the SubFormat GUID
+                    (tag,) = struct.unpack("<H", mm[body + 24:body + 26])
+                    fmt = (tag,) + fmt[1:]
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError(f"WAV data before fmt chunk: {self.path}")
+                if size == 0xFFFFFFFF and data_size64 is not None:
+                    size = data_size64
+                size = min(size, len(mm) - body)
+                self._setup(fmt, body, size)
+                return
+            offset = body + size + (size & 1)
+        raise ValueError(f"WAV file has no data chunk: {self.path}")
+    
+    def _setup(self, fmt: Tuple[int, ...], data_offset: int, data_size: int) -> None:
+        tag, channels, sample_rate, _, block_align, bits = fmt
+        dtypes = {
+            (_WAV_FORMAT_PCM, 8): "u1",
+            (_WAV_FORMAT_PCM, 16): "<i2",
+            (_WAV_FORMAT_PCM, 32): "<i4",
+            (_WAV_FORMAT_FLOAT, 32): "<f4",
+        }
+        if (tag, bits) not in dtypes or channels < 1 or block_align != channels * bits // 8:
+            raise ValueError(f"Unsupported WAV encoding (format {tag}, {bits} bit): {self.path}")
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.dtype = np.dtype(dtypes[(tag, bits)])
+        self.frames = data_size // block_align
+        self._pcm = np.frombuffer(
+            self._mmap, dtype=self.dtype, count=self.frames * channels, offset=data_offset
+        ).reshape(self.frames, channels)
+    
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+    
+    def view(self, start_seconds: float, end_seconds: float):
+        """Zero-copy ``(frames, channels)`` view of the raw PCM in a time window."""
+        start = min(self.frames, max(0, int(start_seconds * self.sample_rate)))
+        end = min(self.frames, max(start, int(end_seconds * self.sample_rate)))
+        return self._pcm[start:end]
+    
+    def read(self, start_seconds: float, end_seconds: float, sample_rate: int = SAMPLE_RATE):
+        """
+        Mono float32 samples in [-1, 1] for a time window, resampled to ``sample_rate``.
+        
+        Only the window is converted, so memory use is bounded by its length.
+        """
+        pcm = self.view(start_seconds, end_seconds)
+        if self.dtype.kind == "f":
+            mono = pcm.mean(axis=1, dtype=np.float32)
+        elif self.dtype.kind == "u":
+            mono = (pcm.mean(axis=1, dtype=np.float32) - 128.0) / 128.0
+        else:
+            scale = float(2 ** (self.dtype.itemsize * 8 - 1))
+            mono = pcm.mean(axis=1, dtype=np.float32) / np.float32(scale)
+        return resample(mono, self.sample_rate, sample_rate)
+    
+    def close(self) -> None:
+        """Unmap the file (views handed out earlier keep it mapped until released)."""
+        self._pcm = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+    
+    def __enter__(self) -> "MappedWav":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class AudioWindow(NamedTuple):
+    """A time window of a WAV file, read on demand (cheap to send to worker processes)."""
+    
+    path: str
+    start: float
+    end: float
+    
+    def load(self, sample_rate: int = SAMPLE_RATE):
+        """Read the window as mono float32 samples."""
+        with MappedWav(self.path) as wav:
+            return wav.read(self.start, self.end, sample_rate)
+
+
+class AudioBuffer:
+    """
+    Decode-once mono float32 audio at SAMPLE_RATE.
+    
+    A buffer built from a file decodes lazily on first access to ``samples``
+    and then serves duration, VAD, split search, windows and inference from
+    the same array. Windows are NumPy views, so slicing copies nothing.
+    
+    WAV files are memory-mapped instead: duration, windows, split search and
+    VAD read only the part of the file they need, so peak memory is bounded
+    by the window size rather than the recording length.
+    """
+    
+    def __init__(
+        self,
+        samples=None,
+        sample_rate: int = SAMPLE_RATE,
+        source: Optional[str] = None,
+        mapped: Optional[MappedWav] = None,
+    ):
+        """
+        Initialize buffer.
+        
+        Args:
+            samples: Decoded float32 samples, or None to decode ``source`` on demand
+            sample_rate: Sample rate of the samples in Hz
+            source: Audio file to decode when samples are first needed
+            mapped: Memory-mapped WAV backing ``source``
+        """
+        if samples is None and source is None:
+            raise ValueError("AudioBuffer needs samples or a source file")
+        self._samples = samples
+        self.sample_rate = sample_rate
+        self.source = source
+        self.mapped = mapped
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_file(cls, file_path: str, sample_rate: int = SAMPLE_RATE) -> "AudioBuffer":
+        """Buffer over ``file_path``: memory-mapped for WAV, otherwise decoded on first use."""
+        try:
+            mapped = MappedWav(str(file_path))
+        except (ValueError, ImportError, OSError):
+            mapped = None
+        return cls(sample_rate=sample_rate, source=str(file_path), mapped=mapped)
+    
+    @property
+    def decoded(self) -> bool:
+        return self._samples is not None
+    
+    @property
+    def _windowed(self) -> bool:
+        """Whether reads should go to the memory map rather than a full decode."""
+        return self._samples is None and self.mapped is not None
+    
+    @property
+    def samples(self):
+        if self._samples is None:
+            with self._lock:
+                if self._samples is None:
+                    if self.mapped is not None:
+                        self._samples = self.mapped.read(0, self.mapped.duration, self.sample_rate)
+                    else:
+                        self._samples = decode_audio(self.source, self.sample_rate)
+        return self._samples
+    
+    @property
+    def duration(self) -> float:
+        if self._windowed:
+            return self.mapped.duration
+        return len(self.samples) / self.sample_rate
+    
+    def window(self, start_seconds: float, end_seconds: float) -> "AudioBuffer":
+        """Time window: a view of decoded samples, or a bounded read of a mapped WAV."""
+        if self._windowed:
+            return AudioBuffer(self.mapped.read(start_seconds, end_seconds, self.sample_rate), self.sample_rate)
+        start = max(0, int(start_seconds * self.sample_rate))
+        end = int(end_seconds * self.sample_rate)
+        return AudioBuffer(self.samples[start:end], self.sample_rate)
+    
+    def window_source(self, start_seconds: float, end_seconds: float):
+        """
+        A window to hand to a transcription worker.
+        
+        Mapped WAVs give an AudioWindow the worker reads itself, so windows
+        are never all in memory at once; otherwise a view of the samples.
+        """
+        if self._windowed:
+            return AudioWindow(self.source, start_seconds, end_seconds)
+        return self.window(start_seconds, end_seconds).samples
+    
+    def speech_regions(self, block_seconds: float = 600.0, **kwargs) -> List[SpeechRegion]:
+        """
+        Voice activity regions; see detect_speech_regions.
+        
+        Mapped WAVs are scanned one ``block_seconds`` block at a time and
+        regions that meet at a block boundary are joined.
+        """
+        if not self._windowed:
+            return detect_speech_regions(self.samples, self.sample_rate, **kwargs)
+        
+        min_gap = kwargs.get("min_silence_ms", 600) / 1000.0
+        regions: List[SpeechRegion] = []
+        start = 0.0
+        while start < self.duration:
+            end = min(self.duration, start + block_seconds)
+            block = self.mapped.read(start, end, self.sample_rate)
+            for region_start, region_end in detect_speech_regions(block, self.sample_rate, **kwargs):
+                region_start, region_end = start + region_start, start + region_end
+                if regions and region_start - regions[-1][1] < min_gap:
+                    regions[-1] = (regions[-1][0], region_end)
+                else:
+                    regions.append((region_start, region_end))
+            start = end
+        return regions
+    
+    def speech_samples(self, regions: List[SpeechRegion]):
+        """Concatenate the samples inside ``regions`` (see extract_speech), reading mapped WAVs per region."""
+        if not self._windowed:
+            return extract_speech(self.samples, regions, self.sample_rate)
+        if not regions:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate([self.window(start, end).samples for start, end in regions])
+    
+    def find_silence_split(
+        self,
+        target_seconds: float,
+        search_seconds: float = 30.0,
+        min_silence_ms: int = 500,
+        silence_thresh_db: float = -40.0,
+    ) -> float:
+        """
+        Find a split point near ``target_seconds`` that falls inside a silence.
+        
+        Only the region ``target_seconds +/- search_seconds`` is scanned (as
+        vectorized 10 ms frame energies), so the cost does not grow with the
+        length of the recording.
+        
+        Args:
+            target_seconds: Preferred split position in seconds
+            search_seconds: How far either side of the target to look
+            min_silence_ms: Minimum silence length to count as a pause
+            silence_thresh_db: Loudness (dBFS) below which audio is silent
+            
+        Returns:
+            Split position in seconds (the target itself if no silence is found)
+        """
+        frame = self.sample_rate // 100  # 10 ms
+        region_start = max(0.0, target_seconds - search_seconds)
+        region = self.window(region_start, target_seconds + search_seconds).samples
+        count = len(region) // frame
+        if count == 0:
+            return target_seconds
+        frames = region[:count * frame].reshape(count, frame)
+        energy_db = 20 * np.log10(np.sqrt(np.mean(frames ** 2, axis=1)) + 1e-10)
+        silent = energy_db < silence_thresh_db
+        
+        edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        long_enough = (ends - starts) * 10 >= min_silence_ms
+        if not long_enough.any():
+            return target_seconds
+        
+        # Split in the middle of the pause closest to the target
+        midpoints = region_start + (starts[long_enough] + ends[long_enough]) * frame / 2.0 / self.sample_rate
+        return float(midpoints[np.argmin(np.abs(midpoints - target_seconds))])
+    
+    def write_wav(self, output_path: str) -> str:
+        """Write the buffer as 16-bit mono WAV (e.g. to upload a chunk to an API)."""
+        pcm = (np.clip(self.samples, -1.0, 1.0) * 32767).astype("<i2")
+        with wave.open(output_path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(pcm.tobytes())
+        return output_path
+
+
 def get_supported_formats() -> List[str]:
     """Get list of supported audio file extensions."""
     return list(SUPPORTED_AUDIO_FORMATS.keys())
@@ -0,0 +1,247 @@
+"""
+Two-tier (memory + disk) cache for JSON-serializable values.
+
+Entries are stored as zlib-compressed JSON files named by key. The disk tier
+is bounded by total size and evicts least recently used files (tracked by
+modification time, which is refreshed on every hit). A small in-memory LRU
+tier in front of it serves hot entries without touching disk. Entries can
+optionally expire a fixed time after they were written.
+"""
+
+import os
+import copy
+import json
+import zlib
+import logging
+import time
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .metrics import CACHE_LOOKUPS
+
+
+logger = logging.getLogger(__name__)
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert SDK objects (pydantic models, simple objects) to plain JSON types."""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, "model_dump"):
+        return to_jsonable(value.model_dump())
+    if hasattr(value, "__dict__"):
+        return to_jsonable(vars(value))
+    return str(value)
+
+
+class TieredCache:
+    """Size-bounded LRU cache with an in-memory hot tier over compressed files."""
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        memory_entries: int = 32,
+        ttl: Optional[float] = None,
+        name: str = "cache",
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            directory: Directory holding the cache files
+            max_bytes: Maximum total size of the files on disk
+            memory_entries: Number of entries kept in the in-memory tier
+            ttl: Seconds after writing that an entry expires; None keeps
+                entries until evicted
+            name: Label for the cache lookup metrics
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self.name = name
+        # key -> (created timestamp, value)
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Optional[Dict[str, int]] = None  # Loaded lazily from disk
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json.z"
+
+    def _load_index(self) -> Dict[str, int]:
+        """Scan the cache directory once to learn entry sizes (lock held)."""
+        if self._sizes is None:
+            self._sizes = {}
+            if self.directory.exists():
+                for path in self.directory.glob("*/*.json.z"):
+                    try:
+                        self._sizes[path.name[:-len(".json.z")]] = path.stat().st_size
+                    except OSError:
+                        continue
+        return self._sizes
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _remember(self, key: str, created: float, value: Any) -> None:
+        """Insert into the memory tier (lock held)."""
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key (hex digest)
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        with self._lock:
+            if key in self._memory:
+                created, value = self._memory[key]
+                if not self._expired(created):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    CACHE_LOOKUPS.labels(self.name, "memory_hit").inc()
+                    # Callers may mutate results, so never hand out the cached object
+                    return copy.deepcopy(value)
+
+        path = self._path(key)
+        try:
+            entry = json.loads(zlib.decompress(path.read_bytes()))
+            created, value = entry["created"], entry["value"]
+            if not self._expired(created):
+                os.utime(path)  # Mark as recently used for LRU eviction
+        except (OSError, ValueError, KeyError, TypeError, zlib.error):
+            with self._lock:
+                self.misses += 1
+            CACHE_LOOKUPS.labels(self.name, "miss").inc()
+            return None
+
+        if self._expired(created):
+            self._discard(key)
+            with self._lock:
+                self.expirations += 1
+                self.misses += 1
+            CACHE_LOOKUPS.labels(self.name, "miss").inc()
+            return None
+
+        CACHE_LOOKUPS.labels(self.name, "disk_hit").inc()
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, created, copy.deepcopy(value))
+        return value
+
+    def _discard(self, key: str) -> None:
+        """Remove one entry from both tiers."""
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+        with self._lock:
+            self._memory.pop(key, None)
+            self._load_index().pop(key, None)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in both tiers.
+
+        Args:
+            key: Cache key (hex digest)
+            value: JSON-serializable value
+        """
+        value = to_jsonable(value)
+        created = time.time()
+        data = zlib.compress(json.dumps({"created": created, "value": value}).encode("utf-8"))
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write atomically so concurrent readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            self._remember(key, created, value)
+            self._load_index()[key] = len(data)
+            self.writes += 1
+            self._evict_over_budget()
+
+    def _evict_over_budget(self) -> None:
+        """Delete least recently used files until under max_bytes (lock held)."""
+        sizes = self._load_index()
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        def last_used(key: str) -> float:
+            try:
+                return self._path(key).stat().st_mtime
+            except OSError:
+                return 0.0
+
+        for key in sorted(sizes, key=last_used):
+            if total <= self.max_bytes:
+                break
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+            total -= sizes.pop(key)
+            self._memory.pop(key, None)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        with self._lock:
+            for key in list(self._load_index()):
+                try:
+                    self._path(key).unlink()
+                except OSError:
+                    pass
+            self._sizes = {}
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current size."""
+        with self._lock:
+            sizes = self._load_index()
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(sizes),
+                "size_bytes": sum(sizes.values()),
+                "max_bytes": self.max_bytes,
+            }
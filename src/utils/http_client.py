@@ -0,0 +1,111 @@
+"""
+Process-wide pooled HTTP clients for outbound API calls.
+
+Creating an httpx client per request pays a fresh TCP and TLS handshake each
+time. These helpers hand out shared clients with connection pooling and
+keep-alive so LLM and Whisper API calls reuse warm connections.
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Optional
+
+import httpx
+
+from ..config.http_config import get_default_http_config
+
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.Client] = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+def _http2_supported() -> bool:
+    try:
+        import h2  # type: ignore  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _client_options(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build keyword arguments shared by the sync and async clients."""
+    settings = get_default_http_config()
+    settings.update(config or {})
+
+    http2 = settings["http2"]
+    if http2 and not _http2_supported():
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+        http2 = False
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["max_keepalive_connections"],
+            keepalive_expiry=settings["keepalive_expiry"],
+        ),
+        "timeout": httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"]),
+        "http2": http2,
+    }
+
+
+def get_http_client() -> httpx.Client:
+    """Get the shared synchronous client, creating it on first use."""
+    global _client
+    with _lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(**_client_options())
+        return _client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared asynchronous client for the running event loop.
+
+    Async connections are bound to the loop that opened them, so one client
+    is kept per loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(**_client_options())
+            _async_clients[loop] = client
+        return client
+
+
+def configure_http_clients(config: Dict[str, Any]) -> None:
+    """Recreate the shared clients with new pool limits or timeouts."""
+    global _client
+    close_http_clients()
+    with _lock:
+        _client = httpx.Client(**_client_options(config))
+
+
+def close_http_clients() -> None:
+    """Close the shared synchronous client and forget async clients."""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+        _async_clients.clear()
+
+
+async def aclose_http_client() -> None:
+    """Close the async client belonging to the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+atexit.register(close_http_clients)
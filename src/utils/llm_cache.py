@@ -0,0 +1,128 @@
+"""
+Deterministic response cache for LLM chat completions.
+
+Minutes are generated at temperature 0, so the same (model, messages) pair
+yields a reusable answer. Responses are cached persistently with TTL and
+size-based eviction, and concurrent identical requests share one upstream
+call through single-flight deduplication.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+from ..config.llm_config import get_default_llm_config
+from .disk_cache import TieredCache
+from .singleflight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LLM_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "minute-maker", "llm")
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+_cache: Optional[TieredCache] = None
+_cache_lock = threading.Lock()
+_singleflight = SingleFlight()
+
+
+def llm_cache_key(body: Dict[str, Any]) -> str:
+    """
+    Hash the parts of a chat completion request that determine the answer.
+
+    Args:
+        body: Request body with model, temperature and messages
+
+    Returns:
+        SHA-256 hex digest
+    """
+    material = {
+        "model": body.get("model"),
+        "temperature": body.get("temperature"),
+        "messages": body.get("messages"),
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def get_llm_cache() -> Optional[TieredCache]:
+    """Get the process-wide LLM response cache, or None when caching is disabled."""
+    global _cache
+    config = get_default_llm_config()
+    if not config["cache_enabled"]:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = TieredCache(
+                config["cache_dir"] or DEFAULT_LLM_CACHE_DIR,
+                max_bytes=int(config["cache_max_mb"] * 1024 * 1024),
+                memory_entries=config["cache_memory_entries"],
+                ttl=config["cache_ttl"] or None,
+                name="llm",
+            )
+        return _cache
+
+
+@contextmanager
+def bypass_llm_cache():
+    """Skip cache lookups for LLM calls made in this context (results are still stored)."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def llm_cache_bypassed() -> bool:
+    """Whether the current context asked to skip cache lookups."""
+    return _bypass.get()
+
+
+def cached_completion(
+    body: Dict[str, Any],
+    fetch: Callable[[], str],
+    use_cache: bool = True,
+) -> str:
+    """
+    Return a cached completion for ``body`` or fetch it once.
+
+    Args:
+        body: Chat completion request body
+        fetch: Performs the upstream call and returns the message content
+        use_cache: False to skip the lookup and force a fresh upstream call
+
+    Returns:
+        Message content
+    """
+    if body.get("temperature") != 0:
+        # Sampled answers are not reusable
+        return fetch()
+
+    key = llm_cache_key(body)
+    cache = get_llm_cache()
+    if cache is not None and use_cache and not _bypass.get():
+        cached = cache.get(key)
+        if cached is not None:
+            logger.debug(f"LLM cache hit: {key[:12]}")
+            return cached
+
+    def load() -> str:
+        content = fetch()
+        if cache is not None:
+            cache.set(key, content)
+        return content
+
+    return _singleflight.do(key, load)
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """Get cache and single-flight counters."""
+    cache = get_llm_cache()
+    return {
+        "cache": cache.stats() if cache is not None else None,
+        "singleflight": _singleflight.stats(),
+    }
@@ -0,0 +1,385 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms live in one process-wide registry and are
+rendered by the server's /metrics endpoint. StageTimer measures the stages
+of one request, returns them for the result payload and feeds the stage
+latency histogram at the same time.
+"""
+
+import math
+import time
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+from .tracing import span
+
+# Upper bounds in seconds; spans sub-millisecond probes to hour-long transcriptions
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+    30.0, 60.0, 120.0, 300.0, 600.0, 1800.0,
+)
+# Processing seconds per second of audio
+REAL_TIME_FACTOR_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    """Base for labelled metrics: one child per distinct label value tuple."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Unlabelled metrics report zero before their first update
+            self._children[()] = self._new_child()
+
+    @abstractmethod
+    def _new_child(self):
+        """A fresh child holding one label combination's value."""
+
+    def labels(self, *values: str, **kwargs: str):
+        """Child metric for one combination of label values."""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+            return child
+
+    def _default(self):
+        """The child of an unlabelled metric."""
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}; call labels() first")
+        return self.labels()
+
+    @abstractmethod
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        """(sample name, rendered labels, value) for every series."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self._samples())
+        return "\n".join(lines)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._children.clear()
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = float(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from ``function`` at scrape time instead."""
+        self.function = function
+
+    def get(self) -> float:
+        if self.function is not None:
+            return float(self.function())
+        return self.value
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._default().inc(amount)
+
+    def _samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            yield self.name, _format_labels(self.labelnames, values), child.get()
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or is read from a function at scrape time."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default().set_function(function)
+
+    def _samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            yield self.name, _format_labels(self.labelnames, values), child.get()
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets, with sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def _samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket", labels, cumulative
+            yield f"{self.name}_bucket", _format_labels(self.labelnames, values, 'le="+Inf"'), count
+            yield f"{self.name}_sum", _format_labels(self.labelnames, values), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, values), count
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Content type of render() for HTTP responses
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# --- Application metrics ---
+HTTP_REQUESTS = counter(
+    "minute_maker_http_requests_total", "HTTP requests handled", ["method", "endpoint", "status"]
+)
+HTTP_REQUEST_SECONDS = histogram(
+    "minute_maker_http_request_seconds", "HTTP request latency", ["method", "endpoint"]
+)
+STAGE_SECONDS = histogram(
+    "minute_maker_stage_seconds", "Time spent in each pipeline stage", ["pipeline", "stage"]
+)
+TRANSCRIPTIONS = counter(
+    "minute_maker_transcriptions_total", "Transcriptions by provider and outcome", ["provider", "status"]
+)
+TRANSCRIBED_AUDIO_SECONDS = counter(
+    "minute_maker_transcribed_audio_seconds_total", "Seconds of audio transcribed", ["provider"]
+)
+REAL_TIME_FACTOR = histogram(
+    "minute_maker_transcription_real_time_factor",
+    "Inference seconds per second of audio",
+    ["provider"],
+    buckets=REAL_TIME_FACTOR_BUCKETS,
+)
+CACHE_LOOKUPS = counter(
+    "minute_maker_cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"]
+)
+MODEL_LOAD_SECONDS = histogram(
+    "minute_maker_model_load_seconds", "Time to load a model into memory", ["model"]
+)
+JOB_QUEUE_DEPTH = gauge("minute_maker_job_queue_depth", "Background jobs waiting for a worker")
+JOBS_RUNNING = gauge("minute_maker_jobs_running", "Background jobs currently running")
+ROUTED_TRANSCRIPTIONS = counter(
+    "minute_maker_routed_transcriptions_total",
+    "Transcriptions sent to each Whisper backend by the router, by outcome",
+    ["backend", "outcome"],
+)
+ROUTING_IN_FLIGHT = gauge(
+    "minute_maker_routing_in_flight", "Transcriptions running or queued on each Whisper backend", ["backend"]
+)
+OUTBOUND_RETRIES = counter(
+    "minute_maker_outbound_retries_total", "Outbound call retries by upstream and reason", ["endpoint", "reason"]
+)
+OUTBOUND_HEDGES = counter(
+    "minute_maker_outbound_hedges_total", "Hedged duplicate requests by upstream and winner", ["endpoint", "winner"]
+)
+CIRCUIT_BREAKER_TRIPS = counter(
+    "minute_maker_circuit_breaker_trips_total", "Times an upstream's circuit breaker opened", ["endpoint"]
+)
+CIRCUIT_BREAKER_REJECTIONS = counter(
+    "minute_maker_circuit_breaker_rejections_total", "Calls failed fast by an open circuit breaker", ["endpoint"]
+)
+LLM_QUEUE_SECONDS = histogram(
+    "minute_maker_llm_queue_seconds", "Time LLM calls waited for rate limit budget", ["priority"]
+)
+LLM_QUEUE_DEPTH = gauge("minute_maker_llm_queue_depth", "LLM calls waiting for rate limit budget", ["priority"])
+LLM_UPSTREAM_SECONDS = histogram(
+    "minute_maker_llm_upstream_seconds", "LLM call latency once sent upstream", ["model"]
+)
+CIRCUIT_BREAKER_OPEN = gauge(
+    "minute_maker_circuit_breaker_open", "1 while an upstream's circuit breaker is open", ["endpoint"]
+)
+
+
+def observe_stage(pipeline: str, stage: str, seconds: float) -> None:
+    """Record one stage duration in the stage histogram."""
+    STAGE_SECONDS.labels(pipeline, stage).observe(seconds)
+
+
+class StageTimer:
+    """Per-request stage timings, mirrored into the stage histogram."""
+
+    def __init__(self, pipeline: str):
+        """
+        Initialize timer.
+
+        Args:
+            pipeline: Label for the stage histogram (e.g. 'transcription')
+        """
+        self.pipeline = pipeline
+        self.timings: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Record ``seconds`` against ``stage`` (repeated stages accumulate)."""
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+        observe_stage(self.pipeline, stage, seconds)
+
+    @contextmanager
+    def stage(self, stage: str):
+        """Time the enclosed block as ``stage`` (and trace it as a span), also when it raises."""
+        started = time.perf_counter()
+        try:
+            with span(f"{self.pipeline}.{stage}"):
+                yield
+        finally:
+            self.add(stage, time.perf_counter() - started)
+
+
+def render_metrics() -> str:
+    """All process metrics in the Prometheus text format."""
+    return REGISTRY.render()
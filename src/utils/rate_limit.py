@@ -0,0 +1,202 @@
+"""
+Process-wide rate limit scheduler for LLM calls.
+
+Every OpenRouter call first acquires budget from token buckets for
+requests per minute and tokens per minute. Calls that would exceed the
+budget queue instead of failing. Waiters are served in priority order
+(interactive before batch) and first come, first served within a priority.
+The priority comes from a ContextVar, so work submitted to pools with
+``contextvars.copy_context()`` keeps the priority of the request that
+started it.
+"""
+
+import heapq
+import time
+import asyncio
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional, Tuple
+
+from ..config.llm_config import get_default_rate_limit_config
+from .metrics import LLM_QUEUE_DEPTH, LLM_QUEUE_SECONDS
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+# Lower rank is served first
+PRIORITY_RANKS = {INTERACTIVE: 0, BATCH: 1}
+
+_priority: ContextVar[str] = ContextVar("llm_priority", default=INTERACTIVE)
+_scheduler: Optional["RateLimitScheduler"] = None
+_scheduler_lock = threading.Lock()
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """Schedule LLM calls made in this context with ``priority``."""
+    if priority not in PRIORITY_RANKS:
+        raise ValueError(f"Unknown priority: {priority}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+class TokenBucket:
+    """Budget that refills continuously at ``rate`` per second up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until ``amount`` is available (0 if it is now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimitScheduler:
+    """Queues calls until requests-per-minute and tokens-per-minute budgets allow them."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        request_burst: Optional[float] = None,
+        token_burst: Optional[float] = None,
+        completion_tokens: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            requests_per_minute: Request budget (0 = unlimited)
+            tokens_per_minute: Token budget (0 = unlimited)
+            request_burst: Requests allowed at once; defaults to the per-minute budget
+            token_burst: Tokens allowed at once; defaults to the per-minute budget
+            completion_tokens: Tokens reserved per call for the answer
+            clock: Monotonic time source
+        """
+        self.requests = (
+            TokenBucket(requests_per_minute / 60, request_burst or requests_per_minute, clock)
+            if requests_per_minute > 0 else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_minute / 60, token_burst or tokens_per_minute, clock)
+            if tokens_per_minute > 0 else None
+        )
+        self.completion_tokens = completion_tokens
+        self.clock = clock
+        self._waiters: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    @property
+    def limited(self) -> bool:
+        return self.requests is not None or self.tokens is not None
+
+    def _time_until(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = self.requests.time_until(1)
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.time_until(tokens))
+        return wait
+
+    def _take(self, tokens: int) -> None:
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(tokens)
+
+    def acquire(self, tokens: int = 0, priority: Optional[str] = None) -> float:
+        """
+        Block until one request fits the budgets, then spend it.
+
+        Args:
+            tokens: Estimated prompt tokens (completion_tokens is added)
+            priority: Defaults to the context's priority (see llm_priority)
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        priority = priority or current_priority()
+        if not self.limited:
+            LLM_QUEUE_SECONDS.labels(priority).observe(0.0)
+            return 0.0
+
+        tokens += self.completion_tokens
+        start = time.perf_counter()
+        entry = (PRIORITY_RANKS[priority], next(self._sequence))
+        depth = LLM_QUEUE_DEPTH.labels(priority)
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            depth.inc()
+            try:
+                while True:
+                    timeout = None
+                    if self._waiters[0] == entry:
+                        timeout = self._time_until(tokens)
+                        if timeout <= 0:
+                            self._take(tokens)
+                            break
+                    # The head waits for its budget; everyone else waits to become the head
+                    self._condition.wait(timeout)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                depth.dec()
+                self._condition.notify_all()
+        waited = time.perf_counter() - start
+        LLM_QUEUE_SECONDS.labels(priority).observe(waited)
+        return waited
+
+    async def acquire_async(self, tokens: int = 0, priority: Optional[str] = None) -> float:
+        """acquire() for coroutines; waits in a worker thread so the event loop keeps running."""
+        if not self.limited:
+            return self.acquire(tokens, priority)
+        return await asyncio.to_thread(self.acquire, tokens, priority)
+
+
+def get_rate_limit_scheduler() -> RateLimitScheduler:
+    """Get the process-wide scheduler for LLM calls, creating it on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            config = get_default_rate_limit_config()
+            _scheduler = RateLimitScheduler(
+                config["requests_per_minute"],
+                config["tokens_per_minute"],
+                request_burst=config["request_burst"],
+                token_burst=config["token_burst"],
+                completion_tokens=config["completion_tokens"],
+            )
+        return _scheduler
+
+
+def set_rate_limit_scheduler(scheduler: Optional[RateLimitScheduler]) -> None:
+    """Replace the process-wide scheduler (None recreates it from the environment)."""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = scheduler
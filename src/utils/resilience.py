@@ -0,0 +1,392 @@
+"""
+Retries, hedged requests and circuit breakers for outbound HTTP calls.
+
+``call_with_resilience(endpoint, send)`` wraps a zero-argument ``send`` that
+makes one request and returns an httpx.Response:
+
+- Retryable failures (429, 5xx, timeouts, connection errors) are retried
+  with jittered exponential backoff, waiting at least as long as the
+  upstream's Retry-After.
+- With hedging on, a duplicate request is sent once the first has been
+  slower than the endpoint's recent latency percentile; the first answer
+  wins.
+- Each endpoint has a circuit breaker that fails calls fast after repeated
+  failures and lets one probe through once its reset timeout has passed.
+
+The last response is returned even if it is still an error, so callers keep
+their own ``raise_for_status()`` handling.
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+
+from ..config.http_config import get_default_resilience_config
+from .metrics import (
+    CIRCUIT_BREAKER_OPEN,
+    CIRCUIT_BREAKER_REJECTIONS,
+    CIRCUIT_BREAKER_TRIPS,
+    OUTBOUND_HEDGES,
+    OUTBOUND_RETRIES,
+)
+from .tracing import current_span
+
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+# Rate limiting says nothing about the upstream's health
+_HEALTHY_RETRYABLE_STATUS = frozenset({429})
+
+_breakers: Dict[str, "CircuitBreaker"] = {}
+_latencies: Dict[str, "LatencyWindow"] = {}
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"{endpoint} is unavailable (circuit open); retry in {retry_in:.0f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Closed: calls pass. After ``failure_threshold`` failures in a row it
+    opens and rejects calls for ``reset_timeout`` seconds. Then it is
+    half-open: one probe call passes, and its outcome closes or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.opened_at + self.reset_timeout - self.clock()
+                if remaining > 0:
+                    CIRCUIT_BREAKER_REJECTIONS.labels(self.name).inc()
+                    raise CircuitOpenError(self.name, remaining)
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    CIRCUIT_BREAKER_REJECTIONS.labels(self.name).inc()
+                    raise CircuitOpenError(self.name, self.reset_timeout)
+                self._probing = True
+
+    @property
+    def rejecting(self) -> bool:
+        """Whether allow() would reject a call now (read-only: never changes state)."""
+        with self._lock:
+            if self.state == self.OPEN:
+                return self.opened_at + self.reset_timeout > self.clock()
+            return self.state == self.HALF_OPEN and self._probing
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+                self.state = self.CLOSED
+                CIRCUIT_BREAKER_OPEN.labels(self.name).set(0)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+                CIRCUIT_BREAKER_TRIPS.labels(self.name).inc()
+                CIRCUIT_BREAKER_OPEN.labels(self.name).set(1)
+
+
+class LatencyWindow:
+    """Recent call latencies of one endpoint, for hedging thresholds."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """The ``percent`` latency percentile, or None until enough calls were seen."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+def get_circuit_breaker(endpoint: str, config: Optional[Dict[str, Any]] = None) -> CircuitBreaker:
+    """The process-wide breaker for ``endpoint``, created on first use."""
+    with _lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            settings = get_default_resilience_config()
+            settings.update(config or {})
+            breaker = _breakers[endpoint] = CircuitBreaker(
+                endpoint, settings["breaker_failure_threshold"], settings["breaker_reset_seconds"]
+            )
+        return breaker
+
+
+def get_latency_window(endpoint: str) -> LatencyWindow:
+    with _lock:
+        window = _latencies.get(endpoint)
+        if window is None:
+            window = _latencies[endpoint] = LatencyWindow()
+        return window
+
+
+def reset_resilience_state() -> None:
+    """Forget all breakers and latency history (e.g. between tests)."""
+    with _lock:
+        _breakers.clear()
+        _latencies.clear()
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP date)."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for retry number ``attempt`` (from 0)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+        return _hedge_pool
+
+
+def _close_quietly(future) -> None:
+    """Release the connection of a hedged request that lost the race."""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def _hedged_send(endpoint: str, send: Callable[[], httpx.Response], delay: float) -> httpx.Response:
+    """Run ``send``; if it takes longer than ``delay``, race a duplicate against it."""
+    pool = _hedge_executor()
+    primary = pool.submit(contextvars.copy_context().run, send)
+    if not wait([primary], timeout=delay).not_done:
+        return primary.result()
+
+    hedge = pool.submit(contextvars.copy_context().run, send)
+    pending = {primary, hedge}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is not None:
+                error = future.exception()
+                continue
+            OUTBOUND_HEDGES.labels(endpoint, "hedge" if future is hedge else "primary").inc()
+            for other in pending:
+                other.add_done_callback(_close_quietly)
+            return future.result()
+    raise error
+
+
+async def _hedged_send_async(
+    endpoint: str, send: Callable[[], Awaitable[httpx.Response]], delay: float
+) -> httpx.Response:
+    primary = asyncio.ensure_future(send())
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+
+    hedge = asyncio.ensure_future(send())
+    pending = {primary, hedge}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is not None:
+                error = task.exception()
+                continue
+            OUTBOUND_HEDGES.labels(endpoint, "hedge" if task is hedge else "primary").inc()
+            for other in pending:
+                other.cancel()
+            return task.result()
+    raise error
+
+
+class _Attempts:
+    """Retry bookkeeping shared by the sync and async call paths."""
+
+    def __init__(self, endpoint: str, config: Optional[Dict[str, Any]]):
+        self.endpoint = endpoint
+        self.settings = get_default_resilience_config()
+        self.settings.update(config or {})
+        self.breaker = get_circuit_breaker(endpoint, self.settings)
+        self.window = get_latency_window(endpoint)
+        self.attempt = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.settings["hedge_enabled"]:
+            return None
+        threshold = self.window.percentile(self.settings["hedge_percentile"])
+        if threshold is None:
+            return None
+        return max(threshold, self.settings["hedge_min_delay"])
+
+    def _retry(self, reason: str, delay: float) -> float:
+        OUTBOUND_RETRIES.labels(self.endpoint, reason).inc()
+        trace_span = current_span()
+        if trace_span is not None:
+            trace_span.add_event("retry", endpoint=self.endpoint, reason=reason, delay=delay)
+        self.attempt += 1
+        logger.warning(
+            f"{self.endpoint} call failed ({reason}); retry {self.attempt}/"
+            f"{self.settings['max_retries']} in {delay:.2f}s"
+        )
+        return delay
+
+    def _backoff(self) -> float:
+        return backoff_delay(self.attempt, self.settings["backoff_base"], self.settings["backoff_max"])
+
+    def on_error(self, error: BaseException) -> float:
+        """Delay before retrying after ``error``; re-raises it if the call should fail."""
+        self.breaker.record_failure()
+        if not isinstance(error, httpx.TransportError) or self.attempt >= self.settings["max_retries"]:
+            raise error
+        return self._retry(type(error).__name__, self._backoff())
+
+    def on_response(self, response: httpx.Response, seconds: float) -> Optional[float]:
+        """Delay before retrying after ``response``, or None to return it."""
+        self.window.add(seconds)
+        status = response.status_code
+        if status not in RETRYABLE_STATUS or status in _HEALTHY_RETRYABLE_STATUS:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        if status not in RETRYABLE_STATUS or self.attempt >= self.settings["max_retries"]:
+            return None
+        retry_after = retry_after_seconds(response)
+        if retry_after is not None and retry_after > self.settings["retry_after_max"]:
+            # Waiting that long would outlast any caller; let the error through
+            return None
+        response.close()
+        return self._retry(str(status), max(retry_after or 0.0, self._backoff()))
+
+
+def call_with_resilience(
+    endpoint: str,
+    send: Callable[[], httpx.Response],
+    config: Optional[Dict[str, Any]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> httpx.Response:
+    """
+    Make an outbound request with retries, optional hedging and a circuit breaker.
+
+    Args:
+        endpoint: Upstream name used for the breaker and metric labels
+        send: Makes one request; called again for each retry or hedge
+        config: Overrides for get_default_resilience_config()
+        sleep: Waits between attempts
+
+    Returns:
+        The final response (possibly still an error status)
+
+    Raises:
+        CircuitOpenError: The upstream's breaker is open
+    """
+    attempts = _Attempts(endpoint, config)
+    while True:
+        attempts.breaker.allow()
+        delay = attempts.hedge_delay()
+        start = time.perf_counter()
+        try:
+            response = send() if delay is None else _hedged_send(endpoint, send, delay)
+        except Exception as e:
+            sleep(attempts.on_error(e))
+            continue
+        wait_seconds = attempts.on_response(response, time.perf_counter() - start)
+        if wait_seconds is None:
+            return response
+        sleep(wait_seconds)
+
+
+async def call_with_resilience_async(
+    endpoint: str,
+    send: Callable[[], Awaitable[httpx.Response]],
+    config: Optional[Dict[str, Any]] = None,
+) -> httpx.Response:
+    """Async variant of call_with_resilience; ``send`` returns a new awaitable per call."""
+    attempts = _Attempts(endpoint, config)
+    while True:
+        attempts.breaker.allow()
+        delay = attempts.hedge_delay()
+        start = time.perf_counter()
+        try:
+            response = await (send() if delay is None else _hedged_send_async(endpoint, send, delay))
+        except Exception as e:
+            await asyncio.sleep(attempts.on_error(e))
+            continue
+        wait_seconds = attempts.on_response(response, time.perf_counter() - start)
+        if wait_seconds is None:
+            return response
+        await asyncio.sleep(wait_seconds)
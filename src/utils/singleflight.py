@@ -0,0 +1,77 @@
+"""
+Single-flight call deduplication.
+
+When several threads ask for the same key at once, only the first runs the
+function; the others wait for it and share its result (or its exception).
+"""
+
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """
+        Run ``func`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Deduplication key
+            func: Zero-argument callable producing the result
+
+        Returns:
+            The result of the single execution
+        """
+        call, leader = self._join(key)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def _join(self, key: str) -> Tuple[_Call, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            self.executions += 1
+            return call, True
+
+    def stats(self) -> Dict[str, int]:
+        """Get execution and sharing counters."""
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "shared": self.shared,
+                "in_flight": len(self._calls),
+            }
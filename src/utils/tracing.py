@@ -0,0 +1,392 @@
+"""
+Lightweight request tracing.
+
+Spans nest through a ContextVar, so a span opened inside another one (in the
+same thread, or in a pool task submitted with ``contextvars.copy_context()``)
+becomes its child and shares its trace id. Finished traces are written as
+OTLP/JSON lines to a local file, which OpenTelemetry tooling can import and
+which needs no collector. Tracing is off unless TRACING_ENABLED=true; spans
+are then no-ops.
+
+Outbound httpx calls can pass ``extensions={"trace": http_trace(span)}`` to
+record connection setup and time to first byte on a span.
+"""
+
+import os
+import json
+import time
+import logging
+import secrets
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config.tracing_config import get_default_tracing_config
+
+
+logger = logging.getLogger(__name__)
+
+# (trace_id, span_id) of a parent that lives outside this process
+SpanContext = Tuple[str, str]
+SpanExporter = Callable[[List["Span"]], None]
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+_exporter: Optional[SpanExporter] = None
+_exporter_configured = False
+_exporter_lock = threading.Lock()
+
+
+class _Batch:
+    """Spans of one local subtree, exported together when its entry span ends."""
+
+    def __init__(self):
+        self.spans: List["Span"] = []
+        self.closed = False
+        self.lock = threading.Lock()
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        batch: _Batch,
+        entry: bool,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Tuple[int, str, Dict[str, Any]]] = []
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self._batch = batch
+        self._entry = entry
+
+    @property
+    def context(self) -> SpanContext:
+        return self.trace_id, self.span_id
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace-context header value naming this span as the parent."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append((time.time_ns(), name, attributes))
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.error = f"{type(exc).__name__}: {exc}"
+        self.add_event("exception", type=type(exc).__name__, message=str(exc))
+
+    def end(self) -> None:
+        """Finish the span; an entry span exports its whole subtree."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        batch = self._batch
+        with batch.lock:
+            if self._entry:
+                batch.closed = True
+                spans, batch.spans = batch.spans + [self], []
+            elif batch.closed:
+                # Outlived its entry span (e.g. work handed to a background thread)
+                spans = [self]
+            else:
+                batch.spans.append(self)
+                return
+        exporter = get_span_exporter()
+        if exporter is not None:
+            try:
+                exporter(spans)
+            except Exception as e:
+                logger.warning(f"Could not export {len(spans)} spans: {e}")
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds from start to end, once ended."""
+        return (self.end_ns - self.start_ns) / 1e9 if self.end_ns is not None else None
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled."""
+
+    trace_id = span_id = parent_id = None
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def get_span_exporter() -> Optional[SpanExporter]:
+    """The configured exporter, or None when tracing is disabled."""
+    global _exporter, _exporter_configured
+    if not _exporter_configured:
+        with _exporter_lock:
+            if not _exporter_configured:
+                config = get_default_tracing_config()
+                if config["enabled"]:
+                    _exporter = FileSpanExporter(config["file"], config["service_name"])
+                _exporter_configured = True
+    return _exporter
+
+
+def set_span_exporter(exporter: Optional[SpanExporter]) -> None:
+    """Replace the exporter (None disables tracing)."""
+    global _exporter, _exporter_configured
+    with _exporter_lock:
+        _exporter = exporter
+        _exporter_configured = True
+
+
+def tracing_enabled() -> bool:
+    return get_span_exporter() is not None
+
+
+def current_span() -> Optional[Span]:
+    """The innermost active span in this context."""
+    return _current_span.get()
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[SpanContext]:
+    """Parse a W3C ``traceparent`` header into (trace_id, span_id)."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2]
+
+
+def start_span(
+    name: str,
+    parent: Optional[SpanContext] = None,
+    entry: bool = False,
+    **attributes: Any,
+):
+    """
+    Create (but do not activate) a span.
+
+    Args:
+        name: Operation name
+        parent: Remote parent; defaults to the active span, else a new trace
+        entry: Export this span's subtree when it ends, even if it has a
+            local parent (for work that outlives the request that started it)
+        **attributes: Initial attributes
+
+    Returns:
+        The span, or NOOP_SPAN while tracing is disabled
+    """
+    if not tracing_enabled():
+        return NOOP_SPAN
+    local_parent = current_span() if parent is None else None
+    if local_parent is not None:
+        trace_id, parent_id = local_parent.context
+        batch = _Batch() if entry else local_parent._batch
+    else:
+        trace_id, parent_id = parent if parent is not None else (secrets.token_hex(16), None)
+        batch, entry = _Batch(), True
+    return Span(name, trace_id, parent_id, batch, entry, attributes)
+
+
+def attach(span) -> Optional[Token]:
+    """Make ``span`` the active span; pass the result to detach()."""
+    if span is NOOP_SPAN:
+        return None
+    return _current_span.set(span)
+
+
+def detach(token: Optional[Token]) -> None:
+    if token is not None:
+        _current_span.reset(token)
+
+
+@contextmanager
+def span(name: str, parent: Optional[SpanContext] = None, entry: bool = False, **attributes: Any):
+    """
+    Run the enclosed block in a new active span.
+
+    Exceptions are recorded on the span and re-raised.
+    """
+    current = start_span(name, parent=parent, entry=entry, **attributes)
+    token = attach(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_exception(e)
+        raise
+    finally:
+        detach(token)
+        current.end()
+
+
+def traced(name: str):
+    """Decorator running each call of the function in a span called ``name``."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# httpcore trace events: (started, complete) pairs that make up connection setup
+_CONNECT_EVENTS = ("connection.connect_tcp", "connection.start_tls")
+_SEND_HEADERS = ("http11.send_request_headers.started", "http2.send_request_headers.started")
+_RECEIVE_HEADERS = ("http11.receive_response_headers.complete", "http2.receive_response_headers.complete")
+
+
+class _HttpTiming:
+    """Turns httpcore trace events into span events and connect/TTFB attributes."""
+
+    def __init__(self, target):
+        self.span = target
+        self.started: Dict[str, float] = {}
+        self.connect_seconds = 0.0
+        self.request_sent: Optional[float] = None
+
+    def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        now = time.perf_counter()
+        self.span.add_event(event_name)
+        prefix, _, phase = event_name.rpartition(".")
+        if prefix in _CONNECT_EVENTS:
+            if phase == "started":
+                self.started[prefix] = now
+            elif phase == "complete" and prefix in self.started:
+                self.connect_seconds += now - self.started.pop(prefix)
+                self.span.set_attribute("http.connect_ms", round(self.connect_seconds * 1000, 3))
+        elif event_name in _SEND_HEADERS:
+            self.request_sent = now
+            self.span.set_attribute("http.connection_reused", self.connect_seconds == 0.0)
+        elif event_name in _RECEIVE_HEADERS and self.request_sent is not None:
+            self.span.set_attribute("http.ttfb_ms", round((now - self.request_sent) * 1000, 3))
+
+
+def http_trace(target) -> Optional[Callable[[str, Dict[str, Any]], None]]:
+    """
+    httpx ``trace`` extension recording connection setup and time to first byte.
+
+    Returns None while tracing is disabled; pass the result only when set.
+    """
+    if target is None or target is NOOP_SPAN:
+        return None
+    return _HttpTiming(target)
+
+
+def async_http_trace(target):
+    """Async variant of http_trace for httpx.AsyncClient requests."""
+    timing = http_trace(target)
+    if timing is None:
+        return None
+
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        timing(event_name, info)
+    return trace
+
+
+def trace_extensions(target) -> Dict[str, Any]:
+    """``extensions`` for an httpx request made inside ``target``."""
+    trace = http_trace(target)
+    return {"trace": trace} if trace is not None else {}
+
+
+# --- OTLP/JSON export ---
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def span_to_otlp(item: Span) -> Dict[str, Any]:
+    """One span in the OTLP/JSON encoding."""
+    encoded = {
+        "traceId": item.trace_id,
+        "spanId": item.span_id,
+        "name": item.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(item.start_ns),
+        "endTimeUnixNano": str(item.end_ns),
+        "attributes": _otlp_attributes(item.attributes),
+        "events": [
+            {"timeUnixNano": str(ts), "name": name, "attributes": _otlp_attributes(attrs)}
+            for ts, name, attrs in item.events
+        ],
+        # STATUS_CODE_OK / STATUS_CODE_ERROR
+        "status": {"code": 2, "message": item.error} if item.error else {"code": 1},
+    }
+    if item.parent_id:
+        encoded["parentSpanId"] = item.parent_id
+    return encoded
+
+
+class FileSpanExporter:
+    """Appends finished spans to a file, one OTLP/JSON ExportTraceServiceRequest per line."""
+
+    def __init__(self, path: str, service_name: str = "minute-maker"):
+        """
+        Initialize exporter.
+
+        Args:
+            path: JSONL file; parent directories are created on first write
+            service_name: ``service.name`` resource attribute
+        """
+        self.path = Path(path)
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def __call__(self, spans: List[Span]) -> None:
+        record = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({
+                    "service.name": self.service_name,
+                    "process.pid": os.getpid(),
+                })},
+                "scopeSpans": [{
+                    "scope": {"name": "minute-maker"},
+                    "spans": [span_to_otlp(item) for item in spans],
+                }],
+            }]
+        }
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
@@ -0,0 +1,52 @@
+"""
+Minimal audio container headers for tests.
+
+Validation checks magic bytes, so fake audio files start with a real header
+followed by arbitrary payload bytes.
+"""
+
+import struct
+
+
+def wav_bytes(payload: bytes = b"", sample_rate: int = 16000, channels: int = 1) -> bytes:
+    """16-bit PCM WAV with ``payload`` as sample data."""
+    byte_rate = sample_rate * channels * 2
+    fmt = struct.pack("<HHIIHH", 1, channels, sample_rate, byte_rate, channels * 2, 16)
+    return (
+        b"RIFF" + struct.pack("<I", 36 + len(payload)) + b"WAVE"
+        + b"fmt " + struct.pack("<I", 16) + fmt
+        + b"data" + struct.pack("<I", len(payload)) + payload
+    )
+
+
+def flac_bytes(payload: bytes = b"", sample_rate: int = 16000, total_samples: int = 16000) -> bytes:
+    """FLAC stream with a STREAMINFO block (mono, 16-bit)."""
+    packed = (sample_rate << 44) | (0 << 41) | (15 << 36) | total_samples
+    streaminfo = bytes(10) + packed.to_bytes(8, "big") + bytes(16)
+    return b"fLaC" + b"\x80" + (34).to_bytes(3, "big") + streaminfo + payload
+
+
+def ogg_bytes(payload: bytes = b"", sample_rate: int = 16000, channels: int = 1) -> bytes:
+    """OGG page carrying a Vorbis identification header."""
+    packet = b"\x01vorbis" + struct.pack("<IBI", 0, channels, sample_rate) + bytes(12) + b"\xb8\x01"
+    page = b"OggS" + bytes([0, 2]) + struct.pack("<qIII", 0, 1, 0, 0) + bytes([1, len(packet)])
+    return page + packet + payload
+
+
+def audio_header(ext: str) -> bytes:
+    """Smallest valid header for a supported extension."""
+    return {
+        ".mp3": b"\xff\xfb\x90\x64",  # MPEG-1 Layer III, 128 kbps, 44.1 kHz
+        ".wav": wav_bytes(),
+        ".m4a": b"\x00\x00\x00\x14ftypM4A \x00\x00\x00\x00M4A ",
+        ".flac": flac_bytes(),
+        ".ogg": ogg_bytes(),
+        ".webm": b"\x1a\x45\xdf\xa3\x87\x42\x82\x84webm",
+    }[ext]
+
+
+def fake_audio(ext: str, payload: bytes = b"fake audio data") -> bytes:
+    """Header for ``ext`` followed by ``payload``."""
+    if ext == ".wav":
+        return wav_bytes(payload)
+    return audio_header(ext) + payload
@@ -8,6 +8,8 @@ import os
 from pathlib import Path
 from unittest.mock import patch
 
+from .audio_samples import fake_audio
+
 
 @pytest.fixture(scope="session")
 def test_data_dir():
@@ -57,6 +59,22 @@ def clean_environment():
             os.environ[var] = value
 
 
+@pytest.fixture(autouse=True)
+def clean_model_registry():
+    """Drop models cached by the process-wide registry between tests."""
+    from src.audio.model_registry import get_model_registry
+
+    get_model_registry().clear()
+    yield
+    get_model_registry().clear()
+
+
+@pytest.fixture(autouse=True)
+def no_startup_warmup(monkeypatch):
+    """Keep test requests to the server from loading real models in the background."""
+    monkeypatch.setenv("WARMUP_ENABLED", "false")
+
+
 @pytest.fixture
 def mock_whisper_dependencies():
     """Mock Whisper dependencies for testing."""
@@ -70,7 +88,7 @@ class AudioFileFactory:
     """Factory for creating test audio files."""
     
     @staticmethod
-    def create_mp3(content: bytes = b"fake mp3 data") -> str:
+    def create_mp3(content: bytes = fake_audio(".mp3", b"fake mp3 data")) -> str:
         """Create temporary MP3 file."""
         temp_file = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
         temp_file.write(content)
@@ -78,7 +96,7 @@ class AudioFileFactory:
         return temp_file.name
     
     @staticmethod
-    def create_wav(content: bytes = b"fake wav data") -> str:
+    def create_wav(content: bytes = fake_audio(".wav", b"fake wav data")) -> str:
         """Create temporary WAV file."""
         temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
         temp_file.write(content)
@@ -102,12 +120,12 @@ def audio_factory():
     original_create_mp3 = factory.create_mp3
     original_create_wav = factory.create_wav
     
-    def tracked_create_mp3(content=b"fake mp3 data"):
+    def tracked_create_mp3(content=fake_audio(".mp3", b"fake mp3 data")):
         file_path = original_create_mp3(content)
         created_files.append(file_path)
         return file_path
     
-    def tracked_create_wav(content=b"fake wav data"):
+    def tracked_create_wav(content=fake_audio(".wav", b"fake wav data")):
         file_path = original_create_wav(content)
         created_files.append(file_path)
         return file_path
@@ -0,0 +1,118 @@
+"""
+Tests for the decode-once AudioBuffer.
+"""
+
+import tracemalloc
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.utils.audio_utils import AudioBuffer, AudioWindow, MappedWav, decode_audio
+from tests.audio_samples import wav_bytes
+
+SR = 16000
+
+
+@pytest.fixture
+def tone_wav(tmp_path):
+    """Two seconds of tone, one of silence, two of tone (16 kHz mono)."""
+    t = np.arange(2 * SR) / SR
+    tone = (0.5 * np.sin(2 * np.pi * 300 * t) * 32767).astype("<i2")
+    pcm = np.concatenate([tone, np.zeros(SR, dtype="<i2"), tone])
+    path = tmp_path / "tone.wav"
+    path.write_bytes(wav_bytes(pcm.tobytes()))
+    return str(path)
+
+
+def test_buffer_decodes_once_on_first_use(tone_wav):
+    samples = decode_audio(tone_wav)
+    buffer = AudioBuffer.from_file("meeting.mp3")
+    assert not buffer.decoded
+
+    with patch('src.utils.audio_utils.decode_audio', return_value=samples) as mock_decode:
+        assert buffer.duration == 5.0
+        buffer.find_silence_split(2.2, search_seconds=2.0)
+        buffer.speech_regions()
+        buffer.window(0, 1)
+
+    mock_decode.assert_called_once()
+
+
+def test_windows_are_views(tone_wav):
+    buffer = AudioBuffer(decode_audio(tone_wav))
+    window = buffer.window(1.0, 3.0)
+
+    assert len(window.samples) == 2 * SR
+    assert np.shares_memory(window.samples, buffer.samples)
+
+
+def test_wav_is_memory_mapped_not_decoded(tone_wav):
+    buffer = AudioBuffer.from_file(tone_wav)
+
+    with patch('src.utils.audio_utils.decode_audio') as mock_decode:
+        assert buffer.duration == 5.0
+        assert len(buffer.window(1.0, 3.0).samples) == 2 * SR
+        assert buffer.speech_regions(block_seconds=2.0) == []  # A steady tone is not speech
+        assert isinstance(buffer.window_source(0, 1), AudioWindow)
+
+    mock_decode.assert_not_called()
+    assert not buffer.decoded
+    assert np.shares_memory(buffer.mapped.view(1.0, 3.0), buffer.mapped.view(0, 5.0))
+    assert np.allclose(buffer.window(1.0, 3.0).samples, decode_audio(tone_wav)[SR:3 * SR])
+
+
+def test_mapped_wav_downmixes_and_resamples(tmp_path):
+    t = np.arange(44100) / 44100
+    left = (0.5 * np.sin(2 * np.pi * 200 * t) * 32767).astype("<i2")
+    stereo = np.stack([left, left], axis=1)
+    path = tmp_path / "stereo.wav"
+    path.write_bytes(wav_bytes(stereo.tobytes(), sample_rate=44100, channels=2))
+
+    with MappedWav(str(path)) as wav:
+        assert (wav.channels, wav.sample_rate, wav.duration) == (2, 44100, 1.0)
+        samples = wav.read(0, 1.0)
+
+    assert len(samples) == SR
+    assert np.abs(samples).max() == pytest.approx(0.5, abs=0.01)
+
+
+def test_window_reads_are_bounded_by_window_size(tmp_path):
+    path = tmp_path / "long.wav"
+    path.write_bytes(wav_bytes(np.zeros(120 * SR, dtype="<i2").tobytes()))  # 2 minutes, 3.8 MB
+
+    tracemalloc.start()
+    with MappedWav(str(path)) as wav:
+        for start in range(0, 120, 5):
+            wav.read(start, start + 5)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert peak < 2 * 5 * SR * 4 + 64 * 1024  # A couple of 5 s float32 windows
+
+
+def test_audio_window_loads_in_worker(tone_wav):
+    assert len(AudioWindow(tone_wav, 2.0, 3.0).load()) == SR
+
+
+def test_mapped_wav_rejects_other_containers(tmp_path):
+    path = tmp_path / "audio.mp3"
+    path.write_bytes(b"\xff\xfb\x90\x64" + bytes(100))
+
+    with pytest.raises(ValueError):
+        MappedWav(str(path))
+    assert AudioBuffer.from_file(str(path)).mapped is None
+
+
+def test_silence_split_lands_in_pause(tone_wav):
+    buffer = AudioBuffer.from_file(tone_wav)
+
+    assert buffer.find_silence_split(2.2, search_seconds=2.0) == pytest.approx(2.5, abs=0.05)
+    assert AudioBuffer(np.full(5 * SR, 0.1, dtype=np.float32)).find_silence_split(2.2) == 2.2
+
+
+def test_write_wav_round_trips(tone_wav, tmp_path):
+    buffer = AudioBuffer.from_file(tone_wav)
+    path = buffer.window(0, 1).write_wav(str(tmp_path / "window.wav"))
+
+    assert np.allclose(decode_audio(path), buffer.samples[:SR], atol=1e-4)
@@ -0,0 +1,55 @@
+"""
+Tests for header-only audio probing.
+"""
+
+import pytest
+
+from src.utils.audio_probe import probe_audio
+from src.utils.audio_utils import get_audio_duration
+from .audio_samples import fake_audio, flac_bytes, ogg_bytes, wav_bytes
+
+
+@pytest.fixture
+def write_file(tmp_path):
+    def _write(name, content):
+        path = tmp_path / name
+        path.write_bytes(content)
+        return str(path)
+    return _write
+
+
+def test_probe_wav_reads_format_and_duration(write_file):
+    path = write_file("a.wav", wav_bytes(bytes(32000 * 3), sample_rate=16000))
+
+    info = probe_audio(path)
+
+    assert info.format == "wav"
+    assert info.codec == "pcm_16"
+    assert info.duration == 3.0
+    assert info.sample_rate == 16000
+    assert info.channels == 1
+
+
+def test_probe_flac_and_ogg_headers(write_file):
+    flac = probe_audio(write_file("a.flac", flac_bytes(sample_rate=48000, total_samples=96000)))
+    ogg = probe_audio(write_file("a.ogg", ogg_bytes(sample_rate=22050, channels=2)))
+
+    assert (flac.codec, flac.duration, flac.sample_rate) == ("flac", 2.0, 48000)
+    assert (ogg.codec, ogg.sample_rate, ogg.channels) == ("vorbis", 22050, 2)
+
+
+def test_probe_cbr_mp3_estimates_duration(write_file):
+    # 128 kbps: 16000 bytes of audio per second
+    path = write_file("a.mp3", fake_audio(".mp3", bytes(16000 * 2 - 4)))
+
+    info = probe_audio(path)
+
+    assert info.codec == "mp3"
+    assert info.sample_rate == 44100
+    assert info.duration == pytest.approx(2.0)
+    assert get_audio_duration(path, audio_info=info) == pytest.approx(2.0)
+
+
+def test_probe_rejects_unknown_content(write_file):
+    assert probe_audio(write_file("a.mp3", b"ID3 but really text")) is None
+    assert probe_audio(write_file("b.wav", b"plain text")) is None
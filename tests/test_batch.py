@@ -0,0 +1,125 @@
+"""
+Tests for batch transcription.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+import pytest
+
+from src.core import batch
+from src.core.batch import BatchManifest, discover_audio_files, format_summary, run_batch
+from tests.audio_samples import fake_audio
+
+
+class FakeManager:
+    calls = []
+
+    def __init__(self, config):
+        self.config = config
+
+    def transcribe_file(self, path):
+        FakeManager.calls.append(path)
+        if "broken" in path:
+            raise ValueError("Invalid audio file")
+        return {"text": "Hello", "duration": 60.0, "config": self.config}
+
+
+@pytest.fixture
+def recordings(tmp_path):
+    folder = tmp_path / "recordings"
+    (folder / "nested").mkdir(parents=True)
+    for name in ("a.mp3", "b.wav", "nested/c.flac", "broken.mp3"):
+        (folder / name).write_bytes(fake_audio("." + name.rsplit(".", 1)[1]))
+    (folder / "notes.txt").write_text("not audio")
+    return folder
+
+
+@pytest.fixture
+def in_threads():
+    # Same initializer/initargs protocol as the process pool, without forking
+    FakeManager.calls = []
+    with patch.object(batch, "ProcessPoolExecutor", ThreadPoolExecutor), \
+         patch.object(batch, "TranscriptionManager", FakeManager):
+        yield
+
+
+def test_discover_expands_directories_and_globs(recordings):
+    assert [p.name for p in discover_audio_files([str(recordings)])] == ["a.mp3", "b.wav", "broken.mp3", "c.flac"]
+    assert [p.name for p in discover_audio_files([str(recordings / "*.mp3")])] == ["a.mp3", "broken.mp3"]
+
+
+def test_batch_writes_manifest_and_resumes(recordings, tmp_path, in_threads):
+    manifest = tmp_path / "manifest.jsonl"
+    files = discover_audio_files([str(recordings)])
+
+    summary = run_batch(files, manifest_path=str(manifest), max_workers=2)
+
+    assert (summary.succeeded, summary.failed, summary.skipped) == (3, 1, 0)
+    assert summary.audio_seconds == 180.0
+    entries = [json.loads(line) for line in manifest.read_text().splitlines()]
+    assert {e["status"] for e in entries} == {"ok", "error"}
+    assert all("config" not in e.get("result", {}) for e in entries)
+
+    # A second run only retries what failed, and only when asked
+    FakeManager.calls = []
+    assert run_batch(files, manifest_path=str(manifest)).skipped == 4
+    summary = run_batch(files, manifest_path=str(manifest), retry_failed=True)
+    assert summary.skipped == 3 and [c.endswith("broken.mp3") for c in FakeManager.calls] == [True]
+    assert "files/hour" in format_summary(summary)
+
+
+def test_manifest_ignores_truncated_last_line(recordings, tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    path = discover_audio_files([str(recordings / "a.mp3")])[0]
+    BatchManifest(str(manifest)).record({"key": batch._file_key(path), "file": str(path), "status": "ok"})
+    with open(manifest, "a") as f:
+        f.write('{"key": "partial')
+
+    assert BatchManifest(str(manifest)).is_done(path)
+
+
+def test_default_workers_fit_models_in_memory_and_gpus():
+    with patch.object(batch.os, "cpu_count", return_value=16), \
+         patch.object(batch, "_physical_memory_gb", return_value=16.0), \
+         patch.object(batch, "_gpu_count", return_value=0):
+        assert batch.default_batch_workers({"model_name": "large-v3"}) == 1
+        assert batch.default_batch_workers({"model_name": "medium.en"}) == 2
+        assert batch.default_batch_workers({"model_name": "tiny"}) == 12
+        # No local model to hold: one worker per core
+        assert batch.default_batch_workers({"provider": "openai", "model_name": "large"}) == 16
+
+    with patch.object(batch, "_gpu_count", return_value=2):
+        assert batch.default_batch_workers({"model_name": "small", "device": "cuda"}) == 2
+
+
+def test_crashed_worker_fails_remaining_files_with_summary(recordings, tmp_path, in_threads):
+    def crash(path):
+        raise BrokenProcessPool("A process in the process pool was terminated abruptly")
+
+    files = discover_audio_files([str(recordings)])
+    with patch.object(batch, "_transcribe_in_worker", side_effect=crash):
+        summary = run_batch(files, manifest_path=str(tmp_path / "manifest.jsonl"), max_workers=2)
+
+    assert (summary.succeeded, summary.failed) == (0, 4)
+    entries = [json.loads(line) for line in (tmp_path / "manifest.jsonl").read_text().splitlines()]
+    assert all(e["error"].startswith("Worker process died") for e in entries)
+
+
+def test_gpu_workers_each_get_their_own_device(recordings, tmp_path, in_threads):
+    devices = []
+
+    class DeviceManager(FakeManager):
+        def __init__(self, config):
+            super().__init__(config)
+            devices.append(config["whisper"]["device"])
+
+    files = discover_audio_files([str(recordings)])
+    with patch.object(batch, "TranscriptionManager", DeviceManager), \
+         patch.object(batch, "_gpu_count", return_value=2):
+        run_batch(files, manifest_path=str(tmp_path / "manifest.jsonl"), max_workers=2,
+                  config={"whisper": {"model_name": "small", "device": "cuda"}})
+
+    assert sorted(devices) == ["cuda:0", "cuda:1"]
@@ -0,0 +1,59 @@
+"""
+Tests for the benchmark harness (timing, baselines) and its fake LLM endpoint.
+"""
+
+from contextlib import contextmanager
+
+import httpx
+
+from benchmarks.fixtures import FakeChatServer
+from benchmarks.harness import (
+    Benchmark,
+    BenchmarkResult,
+    compare,
+    load_results,
+    run_benchmark,
+    save_results,
+)
+
+
+def test_run_benchmark_times_rounds_after_warmup(tmp_path):
+    calls = []
+
+    @contextmanager
+    def setup(workdir):
+        assert workdir == tmp_path
+        yield lambda: calls.append(1)
+
+    result = run_benchmark(Benchmark("demo", setup, number=4, repeat=3), tmp_path)
+
+    assert len(calls) == 1 + 4 * 3
+    assert len(result.rounds) == 3
+    assert result.min <= result.median <= max(result.rounds)
+
+
+def test_compare_flags_regressions_against_saved_baseline(tmp_path):
+    path = tmp_path / "baseline.json"
+    save_results([
+        BenchmarkResult("fast", 1, [1.0, 1.0, 1.0]),
+        BenchmarkResult("slow", 1, [1.0, 1.0, 1.0]),
+    ], str(path))
+
+    comparisons = compare([
+        BenchmarkResult("fast", 1, [1.1, 1.2, 1.3]),
+        BenchmarkResult("slow", 1, [2.0, 2.1, 2.2]),
+        BenchmarkResult("new", 1, [5.0]),
+    ], load_results(str(path)))
+
+    assert [c.name for c in comparisons] == ["fast", "slow"]
+    assert not comparisons[0].regressed(0.5)
+    assert comparisons[1].regressed(0.5) and comparisons[1].ratio == 2.1
+    assert "environment" in load_results(str(path))
+
+
+def test_fake_chat_server_answers_like_openrouter():
+    with FakeChatServer(latency=0.0, reply="hello") as server:
+        response = httpx.post(server.url, json={"messages": []})
+
+    assert response.json()["choices"][0]["message"]["content"] == "hello"
+    assert server.requests == 1
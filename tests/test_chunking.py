@@ -0,0 +1,132 @@
+"""
+Tests for chunked transcription of long recordings.
+"""
+
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from src.core.chunking import plan_chunks, stitch_chunk_results
+from src.core.transcription_manager import TranscriptionManager, get_chunk_pool, shutdown_chunk_pools
+from src.utils.audio_probe import probe_audio
+from src.utils.audio_utils import AudioBuffer
+
+
+def test_plan_chunks_snaps_to_silence_and_overlaps():
+    chunks = plan_chunks(
+        250.0,
+        window_seconds=100.0,
+        overlap_seconds=5.0,
+        split_finder=lambda target: target - 3.0,
+    )
+
+    assert [(c.own_start, c.own_end) for c in chunks] == [(0.0, 97.0), (97.0, 194.0), (194.0, 250.0)]
+    assert chunks[1].start == 92.0
+    assert chunks[1].end == 199.0
+    assert chunks[-1].end == 250.0
+
+
+def test_stitch_shifts_timestamps_and_drops_overlap_segments():
+    chunks = plan_chunks(20.0, window_seconds=10.0, overlap_seconds=2.0)
+    results = [
+        {"language": "en", "segments": [
+            {"start": 0.0, "end": 5.0, "text": " Hello everyone."},
+            {"start": 5.0, "end": 9.5, "text": " First item."},
+            {"start": 9.5, "end": 12.0, "text": " Second item."},
+        ]},
+        {"language": "en", "segments": [
+            # Chunk 2 starts at 8.0s; this repeats the tail of chunk 1
+            {"start": 0.0, "end": 1.5, "text": " First item."},
+            {"start": 1.5, "end": 4.0, "text": " Second item."},
+            {"start": 4.0, "end": 12.0, "text": " Wrapping up."},
+        ]},
+    ]
+
+    stitched = stitch_chunk_results(chunks, results)
+
+    assert stitched["text"] == "Hello everyone. First item. Second item. Wrapping up."
+    assert [s["start"] for s in stitched["segments"]] == [0.0, 5.0, 9.5, 12.0]
+    assert stitched["segments"][-1]["end"] == 20.0
+    assert stitched["chunks"] == 2
+
+
+def test_stitch_keeps_timestamps_when_a_chunk_is_silent():
+    chunks = plan_chunks(30.0, window_seconds=10.0, overlap_seconds=2.0)
+    results = [
+        {"text": "Opening remarks.", "segments": [{"start": 0.0, "end": 6.0, "text": " Opening remarks."}]},
+        # No speech in the middle chunk (silence, or VAD found nothing)
+        {"text": "", "segments": []},
+        {"text": "Closing.", "segments": [{"start": 4.0, "end": 8.0, "text": " Closing."}]},
+    ]
+
+    stitched = stitch_chunk_results(chunks, results)
+
+    assert stitched["text"] == "Opening remarks. Closing."
+    assert [(s["start"], s["end"]) for s in stitched["segments"]] == [(0.0, 6.0), (22.0, 26.0)]
+
+
+def test_stitch_dedupes_text_without_segments():
+    chunks = plan_chunks(20.0, window_seconds=10.0, overlap_seconds=2.0)
+    results = [
+        {"text": "we agreed to ship on Friday"},
+        {"text": "ship on Friday and review Monday"},
+    ]
+
+    assert stitch_chunk_results(chunks, results)["text"] == "we agreed to ship on Friday and review Monday"
+
+
+@patch('src.core.transcription_manager.AudioBuffer.from_file')
+def test_manager_transcribes_chunks_in_parallel(mock_from_file, audio_factory):
+    mock_from_file.return_value = AudioBuffer(np.full(25 * 16000, 0.1, dtype=np.float32))  # 25 s, no pauses
+
+    manager = TranscriptionManager({
+        "whisper": {"model_name": "base"},
+        "chunking": {"enabled": True, "window_seconds": 10.0, "overlap_seconds": 1.0,
+                     "executor": "thread", "max_workers": 3},
+    })
+    manager.whisper_service = Mock(provider="local", cache=None)
+    # No silence to snap to, so splits land on the targets; windows are 11, 12 and 6 s
+    manager.whisper_service.transcribe_samples.side_effect = lambda samples, **kwargs: {
+        "language": "en",
+        "segments": [{"start": 1.0, "end": 2.0, "text": f" {len(samples) // 16000}s."}],
+    }
+
+    partial = []
+    result = manager.transcribe_file(audio_factory.create_mp3(), segment_callback=partial.extend)
+
+    assert manager.whisper_service.transcribe_samples.call_count == 3
+    assert sorted(s["start"] for s in partial) == [1.0, 10.0, 20.0]
+    assert result["text"] == "11s. 12s. 6s."
+    assert result["duration"] == 25.0
+    assert [s["start"] for s in result["segments"]] == [1.0, 10.0, 20.0]
+    # Decoded once: the same buffer served duration, split search and every window
+    mock_from_file.assert_called_once()
+
+
+@patch('src.core.transcription_manager.AudioBuffer.from_file')
+def test_api_provider_chunks_are_uploaded_as_wav(mock_from_file, audio_factory):
+    mock_from_file.return_value = AudioBuffer(np.full(25 * 16000, 0.1, dtype=np.float32))
+    manager = TranscriptionManager({
+        "whisper": {"model_name": "base"},
+        "chunking": {"enabled": True, "window_seconds": 10.0, "overlap_seconds": 1.0, "max_workers": 1},
+    })
+    manager.whisper_service = Mock(provider="openai", cache=None)
+    manager.whisper_service.transcribe_audio.side_effect = lambda path, **kwargs: {
+        "text": f"{probe_audio(path).duration:.0f}", "segments": [],
+    }
+
+    result = manager.transcribe_file(audio_factory.create_mp3())
+
+    assert result["text"] == "11 12 6"
+
+
+def test_local_chunk_pool_is_created_once_and_spawns_workers():
+    try:
+        pool = get_chunk_pool({"model_name": "base"}, 2, 1)
+
+        assert get_chunk_pool({"model_name": "base"}, 2, 1) is pool
+        assert get_chunk_pool({"model_name": "small"}, 2, 1) is not pool
+        # Forking a multithreaded server process can deadlock the workers
+        assert pool._mp_context.get_start_method() == "spawn"
+    finally:
+        shutdown_chunk_pools()
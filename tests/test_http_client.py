@@ -0,0 +1,54 @@
+"""
+Tests for the shared pooled HTTP clients.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+import qwen_minutes
+from src.utils import http_client
+
+
+@pytest.fixture(autouse=True)
+def reset_clients():
+    http_client.close_http_clients()
+    yield
+    http_client.close_http_clients()
+
+
+def test_sync_client_is_shared_and_recreated_after_close():
+    first = http_client.get_http_client()
+
+    assert http_client.get_http_client() is first
+    http_client.close_http_clients()
+    assert first.is_closed
+    assert http_client.get_http_client() is not first
+
+
+def test_async_client_is_shared_per_event_loop():
+    async def grab():
+        return http_client.get_async_http_client(), http_client.get_async_http_client()
+
+    first, second = asyncio.run(grab())
+    other, _ = asyncio.run(grab())
+
+    assert first is second
+    assert other is not first
+
+
+def test_call_qwen_reuses_pooled_client(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http_client, "_client", client)
+
+    assert qwen_minutes.call_qwen("prompt", "system") == "ok"
+    assert qwen_minutes.call_qwen("prompt", "system") == "ok"
+    assert len(requests) == 2
+    assert http_client.get_http_client() is client
@@ -10,6 +10,7 @@ from unittest.mock import Mock, patch, MagicMock
 
 from src.core.transcription_manager import TranscriptionManager
 from src.audio.whisper_service import WhisperService
+from .audio_samples import fake_audio
 
 
 class TestMinuteMakerIntegration:
@@ -20,7 +21,7 @@ class TestMinuteMakerIntegration:
         """Create a temporary audio file for testing."""
         with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f:
             # Write some fake audio data
-            f.write(b"fake mp3 audio data for testing")
+            f.write(fake_audio(".mp3", b"fake mp3 audio data for testing"))
             f.flush()
             yield f.name
         
@@ -155,7 +156,7 @@ class TestWhisperServiceIntegration:
         mock_whisper.load_model.return_value = mock_model
         
         with tempfile.NamedTemporaryFile(suffix=".mp3") as temp_file:
-            temp_file.write(b"fake audio data")
+            temp_file.write(fake_audio(".mp3"))
             temp_file.flush()
             
             service = WhisperService(model_name="base", use_openai_api=False)
@@ -186,7 +187,7 @@ class TestWhisperServiceIntegration:
         # On Windows, close the temp file before re-opening in code under test
         temp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
         try:
-            temp.write(b"fake wav data")
+            temp.write(fake_audio(".wav", b"fake wav data"))
             temp.flush()
             path = temp.name
         finally:
@@ -205,8 +206,8 @@ class TestWhisperServiceIntegration:
             os.unlink(path)
 
     @patch('src.utils.audio_utils.validate_audio_file')
-    @patch('src.audio.whisper_service.httpx.Client')
-    def test_third_party_whisper_api_transcription(self, mock_httpx_client, mock_validate):
+    @patch('src.audio.whisper_service.get_http_client')
+    def test_third_party_whisper_api_transcription(self, mock_get_http_client, mock_validate):
         """Test transcription with third-party Whisper-compatible API (whisper_api)."""
         mock_validate.return_value = True
 
@@ -220,11 +221,11 @@ class TestWhisperServiceIntegration:
         }
         mock_response.raise_for_status.return_value = None
         mock_client_instance.post.return_value = mock_response
-        mock_httpx_client.return_value.__enter__.return_value = mock_client_instance
+        mock_get_http_client.return_value = mock_client_instance
 
         temp = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
         try:
-            temp.write(b"fake data")
+            temp.write(fake_audio(".mp3", b"fake data"))
             temp.flush()
             path = temp.name
         finally:
@@ -260,13 +261,23 @@ class TestAudioUtilsIntegration:
         for ext in supported_formats:
             with tempfile.NamedTemporaryFile(suffix=ext) as temp_file:
                 # Write small amount of data
-                temp_file.write(b"fake audio data")
+                temp_file.write(fake_audio(ext))
                 temp_file.flush()
                 
                 # Should pass validation (mocked MIME type check)
                 with patch('mimetypes.guess_type') as mock_mime:
                     mock_mime.return_value = (f'audio/{ext[1:]}', None)
                     assert validate_audio_file(temp_file.name)
+
+    def test_file_validation_rejects_non_audio_content(self):
+        """Files with an audio extension but non-audio content are rejected."""
+        from src.utils.audio_utils import validate_audio_file
+
+        with tempfile.NamedTemporaryFile(suffix=".mp3") as temp_file:
+            temp_file.write(b"<html>not audio</html>")
+            temp_file.flush()
+
+            assert not validate_audio_file(temp_file.name)
     
     @patch('src.utils.audio_utils.PYDUB_AVAILABLE', True)
     @patch('src.utils.audio_utils.AudioSegment')
@@ -365,7 +376,7 @@ class TestPerformanceIntegration:
         # Create a larger temporary file
         with tempfile.NamedTemporaryFile(suffix=".mp3") as temp_file:
             # Write 1MB of fake data
-            temp_file.write(b"x" * (1024 * 1024))
+            temp_file.write(fake_audio(".mp3", b"x" * (1024 * 1024)))
             temp_file.flush()
             
             service = WhisperService()
@@ -395,7 +406,7 @@ class TestPerformanceIntegration:
                 results = []
                 for i in range(3):
                     with tempfile.NamedTemporaryFile(suffix=".mp3") as temp_file:
-                        temp_file.write(f"file {i} data".encode())
+                        temp_file.write(fake_audio(".mp3", f"file {i} data".encode()))
                         temp_file.flush()
                         
                         result = manager.transcribe_file(temp_file.name)
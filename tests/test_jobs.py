@@ -0,0 +1,166 @@
+"""
+Tests for the background job queue and its API endpoints.
+"""
+
+import io
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.core.jobs import Job, JobQueue, QueueFullError
+
+
+def _wait(job, timeout=2.0):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_job_runs_in_background_and_reports_progress():
+    queue = JobQueue(max_workers=1)
+
+    def work(value, progress_callback=None):
+        progress_callback("Halfway", 0.5)
+        return value * 2
+
+    job = _wait(queue.submit("double", work, 21))
+
+    assert job.status == Job.SUCCEEDED
+    assert job.result == 42
+    assert job.to_dict()["progress"] == 1.0
+    queue.shutdown()
+
+
+def test_failed_job_records_error():
+    queue = JobQueue(max_workers=1)
+
+    def work(progress_callback=None):
+        raise ValueError("bad audio")
+
+    job = _wait(queue.submit("broken", work))
+
+    assert job.status == Job.FAILED
+    assert job.error == "bad audio"
+    assert queue.stats()["failed"] == 1
+    queue.shutdown()
+
+
+def test_queue_rejects_work_beyond_pending_limit():
+    queue = JobQueue(max_workers=1, max_pending=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def block(progress_callback=None):
+        started.set()
+        release.wait(2)
+
+    queue.submit("running", block)
+    started.wait(1)
+    queue.submit("waiting", block)
+
+    with pytest.raises(QueueFullError):
+        queue.submit("rejected", block)
+    release.set()
+    queue.shutdown()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from src import server
+    monkeypatch.setattr(server, "get_job_queue", lambda: queue)
+    queue = JobQueue(max_workers=1)
+    yield server.app.test_client()
+    queue.shutdown()
+
+
+def test_minutes_job_endpoints(client):
+    with patch('src.server.meeting_minutes', return_value={"abstract_summary": "Short meeting"}):
+        resp = client.post("/api/jobs/minutes", json={"transcript": "hello"})
+        assert resp.status_code == 202
+        job = resp.get_json()
+
+        deadline = time.time() + 2
+        while client.get(job["status_url"]).get_json()["status"] != "succeeded" and time.time() < deadline:
+            time.sleep(0.01)
+
+    result = client.get(job["result_url"])
+    assert result.status_code == 200
+    assert result.get_json()["minutes"] == {"abstract_summary": "Short meeting"}
+    assert client.get("/api/jobs/unknown").status_code == 404
+
+
+def test_transcription_job_hides_config(client):
+    class FakeManager:
+        def transcribe_file(self, path, progress_callback=None, segment_callback=None):
+            progress_callback("Transcribing", 0.5)
+            return {"text": "Hello", "config": {"whisper": {"api_key": "secret"}}}
+
+    with patch('src.server.create_transcription_manager', return_value=FakeManager()):
+        resp = client.post(
+            "/api/jobs/transcribe",
+            data={"file": (io.BytesIO(b"audio"), "meeting.mp3")},
+            content_type="multipart/form-data",
+        )
+        job = resp.get_json()
+        deadline = time.time() + 2
+        while client.get(job["result_url"]).status_code == 202 and time.time() < deadline:
+            time.sleep(0.01)
+
+    assert client.get(job["result_url"]).get_json() == {"text": "Hello"}
+
+
+def test_job_events_record_progress_segments_and_stage_timings():
+    queue = JobQueue(max_workers=1)
+
+    def work(progress_callback=None, segment_callback=None):
+        progress_callback("Transcribing", 0.5)
+        segment_callback([{"start": 0.0, "end": 1.0, "text": " Hello"}])
+        return "ok"
+
+    job = _wait(queue.submit("transcribe", work, stream_segments=True))
+    events, done = job.wait_for_events(0, timeout=1)
+
+    assert done
+    kinds = [event["event"] for event in events]
+    assert kinds[:2] == ["timing", "status"] and kinds[-1] == "done"
+    assert events[0]["data"]["stage"] == "Queued"
+    assert {"event": "segments", "data": {"segments": [{"start": 0.0, "end": 1.0, "text": " Hello"}]}} in [
+        {"event": e["event"], "data": e["data"]} for e in events
+    ]
+    assert "Transcribing" in job.to_dict()["timings"]
+    assert [event["id"] for event in events] == list(range(1, len(events) + 1))
+
+    # Readers resume after the last id they saw
+    later, _ = job.wait_for_events(len(events) - 1, timeout=0)
+    assert [event["event"] for event in later] == ["done"]
+    queue.shutdown()
+
+
+def test_job_events_endpoint_streams_sse(client):
+    class FakeManager:
+        def transcribe_file(self, path, progress_callback=None, segment_callback=None):
+            progress_callback("Transcribing", 0.5)
+            segment_callback([{"start": 0.0, "end": 1.0, "text": " Hello"}])
+            return {"text": "Hello"}
+
+    with patch('src.server.create_transcription_manager', return_value=FakeManager()):
+        resp = client.post(
+            "/api/jobs/transcribe",
+            data={"file": (io.BytesIO(b"audio"), "meeting.mp3")},
+            content_type="multipart/form-data",
+        )
+        job = resp.get_json()
+        stream = client.get(job["events_url"])
+
+    assert stream.mimetype == "text/event-stream"
+    body = stream.get_data(as_text=True)
+    assert "event: progress" in body
+    assert 'event: segments\ndata: {"segments": [{"start": 0.0, "end": 1.0, "text": " Hello"}]}' in body
+    assert body.rstrip().splitlines()[-1].startswith("data: {\"status\": \"succeeded\"")
+
+    resumed = client.get(job["events_url"], headers={"Last-Event-ID": "2"}).get_data(as_text=True)
+    assert "event: status" not in resumed
+    assert client.get("/api/jobs/unknown/events").status_code == 404
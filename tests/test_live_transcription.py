@@ -0,0 +1,149 @@
+"""
+Tests for live transcription: commit policy, buffer handling and the socket protocol.
+"""
+
+import json
+from unittest.mock import Mock
+
+import numpy as np
+
+from src.audio.live_transcription import (
+    LiveTranscriber,
+    LocalAgreement,
+    PcmDecoder,
+    hypothesis_words,
+    serve_live_socket,
+)
+from src.utils.audio_utils import SAMPLE_RATE
+
+
+def words(*items):
+    """(start, end, text) words one second apart."""
+    return [(float(i), float(i) + 0.9, text) for i, text in enumerate(items)]
+
+
+def result_for(text):
+    """Whisper-style result with word timings relative to the transcribed audio."""
+    return {
+        "language": "en",
+        "segments": [{
+            "start": 0.0,
+            "end": float(len(text.split())),
+            "text": text,
+            "words": [
+                {"word": " " + word, "start": float(i), "end": i + 0.9}
+                for i, word in enumerate(text.split())
+            ],
+        }],
+    }
+
+
+def test_local_agreement_commits_only_the_agreed_prefix():
+    policy = LocalAgreement(2)
+
+    assert policy.update(words("hello", "word")) == ([], words("hello", "word"))
+
+    committed, tentative = policy.update(words("hello", "world", "today"))
+    assert [w[2] for w in committed] == ["hello"]
+    assert [w[2] for w in tentative] == ["world", "today"]
+
+    # A re-transcription repeating the committed word does not commit it twice
+    committed, tentative = policy.update(words("Hello,", "world", "today", "we"))
+    assert [w[2] for w in committed] == ["world", "today"]
+    assert [w[2] for w in policy.committed] == ["hello", "world", "today"]
+
+    assert [w[2] for w in policy.flush(words("hello", "world", "today", "we", "meet"))] == ["we", "meet"]
+
+
+def test_hypothesis_words_falls_back_to_even_split():
+    result = {"segments": [{"start": 0.0, "end": 2.0, "text": " one two"}]}
+
+    assert hypothesis_words(result, offset=10.0) == [(10.0, 11.0, "one"), (11.0, 12.0, "two")]
+
+
+def test_live_transcriber_trims_committed_audio_and_finishes():
+    script = iter(["good morning every", "good morning everyone", "everyone lets start"])
+    service = Mock()
+    service.transcribe_samples.side_effect = lambda samples, **kwargs: result_for(next(script))
+    transcriber = LiveTranscriber(service, step_seconds=1.0, max_buffer_seconds=15.0)
+
+    transcriber.insert_audio(np.zeros(SAMPLE_RATE // 2, dtype=np.float32))
+    assert not transcriber.ready()
+    transcriber.insert_audio(np.zeros(SAMPLE_RATE, dtype=np.float32))
+    assert transcriber.ready()
+
+    assert transcriber.process()["committed"] is None
+    transcriber.insert_audio(np.zeros(SAMPLE_RATE * 3, dtype=np.float32))
+    update = transcriber.process()
+    assert update["committed"]["text"] == "good morning"
+    assert update["tentative"]["text"] == "everyone"
+    # Audio up to the end of "morning" (1.9 s) is no longer re-transcribed
+    assert len(transcriber._audio) == int(4.5 * SAMPLE_RATE) - int(1.9 * SAMPLE_RATE)
+    assert service.transcribe_samples.call_args.kwargs["word_timestamps"] is True
+
+    final = transcriber.finish()
+    # Committed text primes the next pass, and the detected language is kept
+    assert service.transcribe_samples.call_args.kwargs["prompt"] == "good morning"
+    assert service.transcribe_samples.call_args.kwargs["language"] == "en"
+    assert final["text"] == "good morning everyone lets start"
+    assert final["duration"] == 4.5
+
+
+def test_pcm_decoder_converts_and_resamples_partial_frames():
+    decoder = PcmDecoder("pcm_s16le", sample_rate=32000)
+    pcm = (np.full(64, 16384, dtype="<i2")).tobytes()
+
+    # An odd-sized frame leaves half a sample for the next one
+    first = decoder.feed(pcm[:33])
+    second = decoder.feed(pcm[33:])
+
+    assert len(first) + len(second) == 32
+    assert np.allclose(np.concatenate([first, second]), 0.5)
+
+
+class FakeSocket:
+    """Scripted WebSocket: returns queued messages, then None (receive timeout)."""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+        self.closed = False
+
+    def receive(self, timeout=None):
+        return self.messages.pop(0) if self.messages else None
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+    def close(self):
+        self.closed = True
+
+
+def test_serve_live_socket_sends_updates_and_final_transcript():
+    service = Mock(provider="local")
+    service.transcribe_samples.return_value = result_for("hello there")
+    second = (np.zeros(SAMPLE_RATE, dtype="<i2")).tobytes()
+    ws = FakeSocket([
+        json.dumps({"type": "start", "format": "pcm_s16le", "sample_rate": SAMPLE_RATE}),
+        second,
+        None,  # Idle: time for a pass
+        second,
+        None,
+        json.dumps({"type": "stop"}),
+    ])
+    config = {"step_seconds": 1.0, "max_buffer_seconds": 15.0, "agreement": 2, "ffmpeg": "ffmpeg"}
+
+    final = serve_live_socket(ws, service, config)
+
+    kinds = [message["type"] for message in ws.sent]
+    assert kinds == ["ready", "update", "update", "final"]
+    assert ws.sent[2]["committed"]["text"] == "hello there"
+    assert final["text"] == "hello there"
+    assert ws.closed
+
+
+def test_serve_live_socket_rejects_api_providers():
+    ws = FakeSocket([json.dumps({"type": "start"})])
+
+    assert serve_live_socket(ws, Mock(provider="openai"), {}) is None
+    assert ws.sent[0]["type"] == "error"
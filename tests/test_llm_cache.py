@@ -0,0 +1,92 @@
+"""
+Tests for the deterministic LLM response cache.
+"""
+
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.utils import llm_cache
+from src.utils.disk_cache import TieredCache
+from src.utils.singleflight import SingleFlight
+
+BODY = {"model": "qwen", "temperature": 0.0, "messages": [{"role": "user", "content": "hi"}]}
+
+
+@pytest.fixture
+def enabled_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "true")
+    monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    yield
+    monkeypatch.setattr(llm_cache, "_cache", None)
+
+
+def test_cached_completion_reuses_answer(enabled_cache):
+    fetch = Mock(return_value="answer")
+
+    assert llm_cache.cached_completion(BODY, fetch) == "answer"
+    assert llm_cache.cached_completion(BODY, fetch) == "answer"
+    fetch.assert_called_once()
+
+
+def test_bypass_forces_upstream_call(enabled_cache):
+    fetch = Mock(side_effect=["old", "new"])
+    llm_cache.cached_completion(BODY, fetch)
+
+    with llm_cache.bypass_llm_cache():
+        assert llm_cache.cached_completion(BODY, fetch) == "new"
+    # The fresh answer replaces the cached one
+    assert llm_cache.cached_completion(BODY, fetch) == "new"
+    assert fetch.call_count == 2
+
+
+def test_sampled_requests_are_not_cached(enabled_cache):
+    fetch = Mock(return_value="answer")
+    body = dict(BODY, temperature=0.7)
+
+    llm_cache.cached_completion(body, fetch)
+    llm_cache.cached_completion(body, fetch)
+
+    assert fetch.call_count == 2
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = TieredCache(str(tmp_path), ttl=0.05)
+    cache.set("aa11", "answer")
+    assert cache.get("aa11") == "answer"
+
+    time.sleep(0.1)
+
+    assert cache.get("aa11") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_singleflight_shares_concurrent_calls():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return "shared"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(4)]
+    threads[0].start()
+    started.wait(1)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["shared"] * 4
+    assert len(calls) == 1
+    assert flight.stats()["shared"] == 3
@@ -0,0 +1,81 @@
+"""
+Tests for stage timers, the metrics registry and the /metrics endpoint.
+"""
+
+from unittest.mock import Mock, patch
+
+from src.core.transcription_manager import TranscriptionManager
+from src.utils.metrics import CACHE_LOOKUPS, Counter, Histogram, MetricsRegistry, StageTimer
+from src.utils.disk_cache import TieredCache
+from .audio_samples import fake_audio
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("demo_requests_total", "Requests", ["status"]))
+    latency = registry.register(Histogram("demo_seconds", "Latency", buckets=(0.1, 1.0)))
+    requests.labels("200").inc()
+    requests.labels(status="200").inc(2)
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    text = registry.render()
+
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{status="200"} 3' in text
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 2' in text
+    assert "demo_seconds_count 2" in text
+
+
+def test_stage_timer_accumulates_repeated_stages():
+    timer = StageTimer("test")
+    with timer.stage("decode"):
+        pass
+    timer.add("decode", 1.0)
+    timer.add("inference", 2.0)
+
+    assert list(timer.timings) == ["decode", "inference"]
+    assert timer.timings["decode"] >= 1.0 and timer.timings["inference"] == 2.0
+
+
+@patch('src.audio.whisper_service.whisper')
+def test_transcription_result_carries_stage_timings(mock_whisper, tmp_path):
+    mock_model = Mock()
+    mock_model.transcribe.return_value = {"text": "Hi", "language": "en", "segments": []}
+    mock_whisper.load_model.return_value = mock_model
+    audio = tmp_path / "meeting.mp3"
+    audio.write_bytes(fake_audio(".mp3"))
+
+    manager = TranscriptionManager({"whisper": {"model_name": "base"}})
+    result = manager.transcribe_file(str(audio))
+
+    assert list(result["timings"]) == ["probe", "validate", "decode", "inference", "postprocess"]
+    assert all(seconds >= 0 for seconds in result["timings"].values())
+
+
+def test_cache_lookups_are_counted_by_cache_name(tmp_path):
+    cache = TieredCache(str(tmp_path), name="metrics-test")
+    before = CACHE_LOOKUPS.labels("metrics-test", "miss").get()
+    cache.get("aa11")
+    cache.set("aa11", {"text": "x"})
+    cache.get("aa11")
+
+    assert CACHE_LOOKUPS.labels("metrics-test", "miss").get() == before + 1
+    assert CACHE_LOOKUPS.labels("metrics-test", "memory_hit").get() >= 1
+
+
+def test_metrics_endpoint_exposes_request_and_queue_metrics():
+    from src import server
+    client = server.app.test_client()
+    client.post("/api/minutes", json={})  # 400: missing transcript
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    text = response.get_data(as_text=True)
+    assert 'minute_maker_http_requests_total{method="POST",endpoint="/api/minutes",status="400"}' in text
+    assert "minute_maker_job_queue_depth 0" in text
+    assert "# TYPE minute_maker_stage_seconds histogram" in text
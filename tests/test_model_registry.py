@@ -0,0 +1,55 @@
+"""
+Tests for the process-wide Whisper model registry.
+"""
+
+from unittest.mock import Mock, patch
+
+from src.audio.model_registry import ModelRegistry
+from src.audio.whisper_service import WhisperService
+
+
+def test_registry_reuses_loaded_model():
+    registry = ModelRegistry(memory_budget=1000)
+    loader = Mock(return_value="model")
+
+    first = registry.get_or_load(("local", "base", "cpu"), loader, size=100)
+    second = registry.get_or_load(("local", "base", "cpu"), loader, size=100)
+
+    assert first == second == "model"
+    loader.assert_called_once()
+    stats = registry.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_registry_evicts_least_recently_used():
+    registry = ModelRegistry(memory_budget=250)
+    registry.get_or_load(("local", "tiny", "cpu"), lambda: "tiny", size=100)
+    registry.get_or_load(("local", "base", "cpu"), lambda: "base", size=100)
+    # Touch tiny so base becomes the LRU entry
+    registry.get_or_load(("local", "tiny", "cpu"), lambda: "tiny", size=100)
+    registry.get_or_load(("local", "small", "cpu"), lambda: "small", size=100)
+
+    stats = registry.stats()
+    assert stats["evictions"] == 1
+    assert ["local", "base", "cpu"] not in stats["models"]
+    assert stats["memory_usage"] == 200
+
+
+def test_registry_keeps_single_model_over_budget():
+    registry = ModelRegistry(memory_budget=10)
+    registry.get_or_load(("local", "large", "cpu"), lambda: "large", size=100)
+
+    assert registry.stats()["models"] == [["local", "large", "cpu"]]
+
+
+@patch('src.audio.whisper_service.whisper')
+def test_services_share_local_model(mock_whisper):
+    mock_whisper.load_model.return_value = Mock()
+    registry = ModelRegistry()
+
+    WhisperService(model_name="base", model_registry=registry)._ensure_local_model_loaded()
+    WhisperService(model_name="base", model_registry=registry)._ensure_local_model_loaded()
+
+    mock_whisper.load_model.assert_called_once_with("base")
+    assert registry.stats()["hits"] == 1
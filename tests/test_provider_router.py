@@ -0,0 +1,148 @@
+"""
+Tests for latency-aware routing across Whisper backends.
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.audio.provider_router import BackendStats, ProviderRouter
+from src.audio.whisper_service import create_whisper_service
+from src.utils import resilience
+from src.utils.resilience import CircuitBreaker, get_circuit_breaker, reset_resilience_state
+from .audio_samples import fake_audio
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    reset_resilience_state()
+    yield
+    reset_resilience_state()
+
+
+def router(**stats):
+    """Router over mock backends with the given BackendStats."""
+    return ProviderRouter(
+        {name: Mock(name=name) for name in stats},
+        stats=dict(stats),
+    )
+
+
+def test_saturated_local_backend_routes_to_remote():
+    local = BackendStats("local", capacity=1, prior_rtf=0.2)
+    remote = BackendStats("openai", capacity=8, prior_rtf=0.3, cost_per_minute=0.006)
+    routing = router(local=local, openai=remote)
+
+    assert routing.rank(600)[0] == "local"
+
+    # Two jobs already on the single local slot: the wait outweighs the faster model
+    local.started()
+    local.started()
+    assert routing.rank(600)[0] == "openai"
+    assert local.queue_depth == 1
+
+
+def test_cost_limit_and_slack_prefer_cheaper_backends():
+    local = BackendStats("local", prior_rtf=0.11)
+    remote = BackendStats("openai", capacity=8, prior_rtf=0.1, cost_per_minute=0.006)
+    routing = router(local=local, openai=remote)
+
+    assert routing.rank(60)[0] == "openai"
+    # Free local inference is only 10% slower, within a 20% slack
+    routing.cost_slack = 0.2
+    assert routing.rank(60)[0] == "local"
+
+    routing.max_cost_per_minute = 0.001
+    assert routing.rank(60) == ["local"]
+    routing.max_cost_per_minute = -1
+    with pytest.raises(ValueError):
+        routing.rank(60)
+
+
+def test_only_backends_with_breakers_consult_them():
+    routing = router(
+        local=BackendStats("local", prior_rtf=0.1),
+        openai=BackendStats("openai", prior_rtf=0.2),
+        whisper_api=BackendStats("whisper_api", prior_rtf=0.05),
+    )
+
+    assert routing.rank(60)[0] == "whisper_api"
+    # No unused breakers (and metric series) for backends that never use one
+    assert set(resilience._breakers) == {"whisper_api"}
+
+    now = [0.0]
+    breaker = get_circuit_breaker("whisper_api")
+    breaker.clock = lambda: now[0]
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert routing.rank(60) == ["local", "openai", "whisper_api"]
+
+    # Once the reset timeout has passed it is eligible again for the probe call
+    now[0] = breaker.reset_timeout + 1
+    assert routing.rank(60)[0] == "whisper_api"
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_demoted_backend_recovers_as_its_error_rate_decays():
+    now = [0.0]
+    local = BackendStats("local", prior_rtf=0.1, clock=lambda: now[0])
+    remote = BackendStats("openai", capacity=8, prior_rtf=0.5, clock=lambda: now[0])
+    routing = router(local=local, openai=remote)
+
+    for _ in range(4):
+        local.started()
+        local.finished(1.0, 60, ok=False)
+    assert local.error_rate > 0.5
+    assert routing.rank(60)[0] == "openai"
+
+    # A few half-lives without failures and the faster backend is tried again
+    now[0] = 3 * local.error_half_life
+    assert local.error_rate < 0.1
+    assert routing.rank(60)[0] == "local"
+
+
+def test_failover_to_next_backend_and_learning():
+    local = BackendStats("local", prior_rtf=0.1)
+    remote = BackendStats("openai", capacity=8, prior_rtf=0.5)
+    routing = router(local=local, openai=remote)
+
+    def run(backend):
+        if backend is routing.backends["local"]:
+            raise RuntimeError("model crashed")
+        return {"text": "hello"}
+
+    result = routing.transcribe(60, run)
+
+    assert result == {"text": "hello", "routed_to": "openai"}
+    assert local.failed == 1 and local.error_rate > 0 and local.in_flight == 0
+    assert remote.completed == 1
+    # Measured real-time factor replaces part of the prior
+    assert remote.rtf < 0.5
+
+
+@patch('src.audio.whisper_service.get_http_client')
+@patch('src.audio.whisper_service.whisper')
+def test_routing_provider_builds_backends_and_fails_over(mock_whisper, mock_get_http_client, tmp_path):
+    mock_whisper.load_model.return_value.transcribe.side_effect = RuntimeError("out of memory")
+    response = Mock()
+    response.json.return_value = {"text": "From the API", "segments": []}
+    mock_get_http_client.return_value.post.return_value = response
+    audio = tmp_path / "meeting.mp3"
+    audio.write_bytes(fake_audio(".mp3"))
+
+    service = create_whisper_service({
+        "provider": "routing",
+        "api_key": "test-key",
+        "routing": {"backends": ["local", "whisper_api", "openai"], "cost_slack": 0.0},
+    })
+
+    # No OPENAI_API_KEY in the test environment: that backend is skipped
+    assert set(service.router.backends) == {"local", "whisper_api"}
+    # Prefer local so the failover path is exercised
+    service.router.stats["whisper_api"].rtf = 10.0
+    result = service.transcribe_audio(str(audio))
+
+    assert result["text"] == "From the API"
+    assert result["routed_to"] == "whisper_api"
+    assert service.router.stats["local"].failed == 1
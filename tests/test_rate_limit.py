@@ -0,0 +1,123 @@
+"""
+Tests for the LLM rate limit scheduler: token buckets, queueing and priorities.
+"""
+
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+import qwen_minutes
+from src.utils.metrics import LLM_QUEUE_SECONDS
+from src.utils.rate_limit import (
+    BATCH,
+    INTERACTIVE,
+    RateLimitScheduler,
+    TokenBucket,
+    current_priority,
+    llm_priority,
+    set_rate_limit_scheduler,
+)
+from src.utils.resilience import reset_resilience_state
+
+
+@pytest.fixture(autouse=True)
+def default_scheduler():
+    yield
+    set_rate_limit_scheduler(None)
+    reset_resilience_state()
+
+
+def test_token_bucket_refills_over_time():
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, capacity=4, clock=lambda: now[0])
+
+    bucket.take(4)
+    assert bucket.time_until(1) == pytest.approx(0.5)
+    now[0] = 1.0
+    assert bucket.time_until(2) == 0.0
+    # Requests above capacity wait for a full bucket rather than forever
+    assert bucket.time_until(100) == pytest.approx(1.0)
+
+
+def test_calls_queue_until_budget_allows():
+    scheduler = RateLimitScheduler(requests_per_minute=600, request_burst=1)
+
+    waits = [scheduler.acquire() for _ in range(3)]
+
+    assert waits[0] < 0.05
+    # 10 requests per second with no burst: one every 100 ms
+    assert 0.05 < waits[1] < 0.2 and 0.05 < waits[2] < 0.2
+
+
+def test_token_budget_limits_large_prompts():
+    scheduler = RateLimitScheduler(tokens_per_minute=60000, completion_tokens=100)
+
+    assert scheduler.acquire(tokens=59800) < 0.05
+    # Only ~100 tokens left: the next call waits for the bucket to refill
+    assert scheduler.acquire(tokens=100) > 0.05
+
+
+def test_interactive_calls_overtake_queued_batch_calls():
+    scheduler = RateLimitScheduler(requests_per_minute=600, request_burst=1)
+    scheduler.acquire()
+    served = []
+
+    def call(priority):
+        scheduler.acquire(priority=priority)
+        served.append(priority)
+
+    batch = [threading.Thread(target=call, args=(BATCH,)) for _ in range(2)]
+    for thread in batch:
+        thread.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=call, args=(INTERACTIVE,))
+    interactive.start()
+    for thread in batch + [interactive]:
+        thread.join()
+
+    # The first batch call may already hold the head of the queue; the second may not
+    assert served.index(INTERACTIVE) <= 1
+    assert served[-1] == BATCH
+
+
+def test_unlimited_scheduler_never_waits():
+    before = LLM_QUEUE_SECONDS.labels(INTERACTIVE).count
+    assert RateLimitScheduler().acquire(tokens=10**9) == 0.0
+    assert LLM_QUEUE_SECONDS.labels(INTERACTIVE).count == before + 1
+
+
+@patch('qwen_minutes.get_http_client')
+def test_llm_calls_go_through_the_scheduler_with_context_priority(mock_client):
+    response = Mock(status_code=200)
+    response.json.return_value = {"choices": [{"message": {"content": "ok"}}]}
+    mock_client.return_value.post.return_value = response
+    priorities = []
+    scheduler = Mock()
+    scheduler.acquire.side_effect = lambda tokens: priorities.append(current_priority()) or 0.0
+    set_rate_limit_scheduler(scheduler)
+
+    with llm_priority(BATCH):
+        assert qwen_minutes.call_qwen("transcript", "system", use_cache=False) == "ok"
+
+    assert priorities == [BATCH]
+    assert scheduler.acquire.call_args.args[0] == qwen_minutes.estimate_tokens("transcriptsystem")
+
+
+@patch('qwen_minutes.get_http_client')
+def test_every_retry_spends_rate_limit_budget(mock_client):
+    request = httpx.Request("POST", qwen_minutes.OPENROUTER_URL)
+    mock_client.return_value.post.side_effect = [
+        httpx.Response(429, headers={"Retry-After": "0"}, request=request),
+        httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]}, request=request),
+    ]
+    scheduler = Mock()
+    scheduler.acquire.return_value = 0.0
+    set_rate_limit_scheduler(scheduler)
+
+    assert qwen_minutes.call_qwen("transcript", "system", use_cache=False) == "ok"
+
+    # The retry after the 429 queued for budget like the first attempt
+    assert scheduler.acquire.call_count == 2
@@ -0,0 +1,126 @@
+"""
+Tests for outbound call resilience: retries, circuit breakers and hedging.
+"""
+
+import time
+
+import httpx
+import pytest
+
+from src.utils.metrics import CIRCUIT_BREAKER_TRIPS, OUTBOUND_HEDGES, OUTBOUND_RETRIES
+from src.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    call_with_resilience,
+    get_latency_window,
+    reset_resilience_state,
+    retry_after_seconds,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    reset_resilience_state()
+    yield
+    reset_resilience_state()
+
+
+def scripted(*outcomes):
+    """send() returning (or raising) the given outcomes in order."""
+    calls = []
+
+    def send():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    send.calls = calls
+    return send
+
+
+def test_retries_honor_retry_after_then_succeed():
+    send = scripted(
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.ConnectError("refused"),
+        httpx.Response(200, json={"ok": True}),
+    )
+    sleeps = []
+    before = OUTBOUND_RETRIES.labels("test-retry", "429").get()
+
+    response = call_with_resilience("test-retry", send, config={"backoff_base": 0.01}, sleep=sleeps.append)
+
+    assert response.json() == {"ok": True}
+    assert len(send.calls) == 3
+    # Never retried sooner than the upstream asked
+    assert sleeps[0] >= 2 and sleeps[1] < 1
+    assert OUTBOUND_RETRIES.labels("test-retry", "429").get() == before + 1
+    assert OUTBOUND_RETRIES.labels("test-retry", "ConnectError").get() >= 1
+
+
+def test_gives_up_after_max_retries_and_returns_last_response():
+    send = scripted(*[httpx.Response(503)] * 3)
+
+    response = call_with_resilience("test-exhausted", send, config={"max_retries": 2}, sleep=lambda s: None)
+
+    assert response.status_code == 503
+    assert len(send.calls) == 3
+
+
+def test_retry_after_accepts_http_dates():
+    response = httpx.Response(503, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+
+    assert retry_after_seconds(response) == 0.0
+
+
+def test_circuit_breaker_fails_fast_then_probes():
+    now = [0.0]
+    breaker = CircuitBreaker("test-breaker", failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    trips = CIRCUIT_BREAKER_TRIPS.labels("test-breaker").get()
+
+    for _ in range(2):
+        breaker.allow()
+        breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    assert CIRCUIT_BREAKER_TRIPS.labels("test-breaker").get() == trips + 1
+
+    # After the reset timeout one probe passes; a concurrent second call does not
+    now[0] = 11
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.allow()
+
+
+def test_open_breaker_stops_retrying():
+    send = scripted(*[httpx.Response(500)] * 10)
+
+    with pytest.raises(CircuitOpenError):
+        call_with_resilience(
+            "test-open", send, config={"max_retries": 5, "breaker_failure_threshold": 2}, sleep=lambda s: None
+        )
+    assert len(send.calls) == 2
+
+
+def test_slow_request_is_hedged():
+    window = get_latency_window("test-hedge")
+    for _ in range(50):
+        window.add(0.01)
+    calls = []
+
+    def send():
+        calls.append(None)
+        # The first request stalls; the duplicate answers at once
+        if len(calls) == 1:
+            time.sleep(1.0)
+        return httpx.Response(200, text=str(len(calls)))
+
+    start = time.perf_counter()
+    response = call_with_resilience("test-hedge", send, config={"hedge_enabled": True, "hedge_min_delay": 0.05})
+
+    assert time.perf_counter() - start < 0.5
+    assert response.text == "2"
+    assert OUTBOUND_HEDGES.labels("test-hedge", "hedge").get() == 1
@@ -0,0 +1,110 @@
+"""
+Tests for streaming upload ingest.
+"""
+
+import io
+import os
+import hashlib
+import shutil
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from src.audio.stream_ingest import AudioIngest, ingest_stream
+from src.audio.whisper_service import WhisperService
+from tests.audio_samples import fake_audio, wav_bytes
+
+
+def test_ingest_hashes_and_probes_in_memory():
+    data = wav_bytes(b"\x00\x01" * 8000)
+    audio = ingest_stream(io.BytesIO(data), "meeting.wav", decode=False)
+
+    assert audio.audio_hash == hashlib.sha256(data).hexdigest()
+    assert audio.audio_info.format == "wav"
+    assert audio.duration == pytest.approx(0.5)
+    assert audio.data == data and audio.spill_path is None
+    assert audio.samples is None
+
+
+def test_ingest_spills_over_threshold():
+    data = fake_audio(".mp3", b"x" * 5000)
+    audio = ingest_stream(io.BytesIO(data), "meeting.mp3", spill_threshold=1024, decode=False)
+
+    assert audio.data is None
+    with open(audio.spill_path, "rb") as f:
+        assert f.read() == data
+    audio.cleanup()
+    assert not os.path.exists(audio.spill_path)
+
+
+def test_ingest_rejects_non_audio_before_buffering():
+    sink = AudioIngest("notes.mp3", decode=False)
+    sink.write(b"This is a text file, not audio")
+    sink.write(b"more text" * 1000)
+
+    assert sink._size == 0
+    with pytest.raises(ValueError):
+        sink.finish()
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_ingest_decodes_to_16khz_mono():
+    pcm = (np.sin(np.arange(32000) / 10) * 10000).astype("<i2").tobytes()
+    audio = ingest_stream(io.BytesIO(wav_bytes(pcm, sample_rate=32000)), "tone.wav")
+
+    assert audio.samples.dtype == np.float32
+    assert len(audio.samples) == pytest.approx(16000, abs=32)
+
+
+def test_local_model_receives_decoded_samples():
+    service = WhisperService(model_name="base")
+    service.model = Mock()
+    service.model.transcribe.return_value = {"text": "Hello", "language": "en", "segments": []}
+    samples = np.zeros(16000, dtype=np.float32)
+    audio = ingest_stream(io.BytesIO(wav_bytes(b"\x00\x00" * 100)), "meeting.wav", decode=False)
+    audio.samples = samples
+
+    result = service.transcribe_ingested(audio)
+
+    assert result["text"] == "Hello"
+    assert service.model.transcribe.call_args[0][0] is samples
+    assert audio.spill_path is None
+
+
+def test_api_transcribe_streams_multipart_upload():
+    from src import server
+
+    captured = {}
+
+    def fake_transcribe(audio, progress_callback=None, segment_callback=None):
+        captured["audio"] = audio
+        return {"text": "Hello"}
+
+    manager = Mock(transcribe_ingested=fake_transcribe)
+    data = fake_audio(".mp3")
+    with patch('src.server.create_transcription_manager', return_value=manager), \
+         patch('tempfile.NamedTemporaryFile') as mock_tempfile:
+        resp = server.app.test_client().post(
+            "/api/transcribe",
+            data={"file": (io.BytesIO(data), "meeting.mp3")},
+            content_type="multipart/form-data",
+        )
+
+    assert resp.status_code == 200
+    assert resp.get_json() == {"text": "Hello"}
+    assert captured["audio"].data == data
+    assert captured["audio"].filename == "meeting.mp3"
+    mock_tempfile.assert_not_called()
+
+
+def test_api_transcribe_rejects_non_audio_upload():
+    from src import server
+
+    resp = server.app.test_client().post(
+        "/api/transcribe",
+        data={"file": (io.BytesIO(b"This is a text file, not audio"), "notes.mp3")},
+        content_type="multipart/form-data",
+    )
+
+    assert resp.status_code == 400
@@ -0,0 +1,87 @@
+"""
+Tests for request tracing: span nesting, export, propagation and HTTP timing.
+"""
+
+import json
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+import qwen_minutes
+from benchmarks.fixtures import FakeChatServer
+from src.utils.llm_cache import bypass_llm_cache
+from src.utils.tracing import FileSpanExporter, NOOP_SPAN, set_span_exporter, span
+
+
+@pytest.fixture
+def exported():
+    batches = []
+    set_span_exporter(batches.append)
+    yield batches
+    set_span_exporter(None)
+
+
+def test_disabled_tracing_hands_out_noop_spans():
+    set_span_exporter(None)
+    with span("anything") as current:
+        assert current is NOOP_SPAN
+
+
+def test_nested_spans_share_trace_and_export_once(exported):
+    def work():
+        with span("in_thread"):
+            pass
+
+    with span("root") as root:
+        with span("child") as child:
+            pass
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(contextvars.copy_context().run, work).result()
+
+    assert len(exported) == 1
+    spans = {s.name: s for s in exported[0]}
+    assert set(spans) == {"root", "child", "in_thread"}
+    assert child.trace_id == root.trace_id == spans["in_thread"].trace_id
+    assert child.parent_id == root.span_id == spans["in_thread"].parent_id
+    assert root.parent_id is None
+
+
+def test_exceptions_mark_span_as_failed(exported, tmp_path):
+    with pytest.raises(ValueError):
+        with span("failing"):
+            raise ValueError("boom")
+
+    path = tmp_path / "traces.jsonl"
+    FileSpanExporter(str(path))(exported[0])
+    record = json.loads(path.read_text())
+    encoded = record["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert encoded["name"] == "failing"
+    assert encoded["status"] == {"code": 2, "message": "ValueError: boom"}
+    assert len(encoded["traceId"]) == 32 and len(encoded["spanId"]) == 16
+
+
+def test_call_qwen_records_connect_and_time_to_first_byte(exported):
+    with FakeChatServer(latency=0.02) as server, patch.object(qwen_minutes, "OPENROUTER_URL", server.url):
+        with bypass_llm_cache():
+            qwen_minutes.call_qwen("transcript", "summarize")
+
+    (call,) = [s for batch in exported for s in batch if s.name == "call_qwen"]
+    assert call.attributes["llm.cached"] is False
+    assert call.attributes["http.status_code"] == 200
+    assert call.attributes["http.ttfb_ms"] >= 20
+    assert "http.connect_ms" in call.attributes or call.attributes["http.connection_reused"]
+
+
+def test_request_span_continues_incoming_trace(exported):
+    from src import server
+    parent_trace = "4bf92f3577b34da6a3ce929d0e0e4736"
+    response = server.app.test_client().post(
+        "/api/minutes", json={}, headers={"traceparent": f"00-{parent_trace}-00f067aa0ba902b7-01"}
+    )
+
+    assert response.headers["X-Trace-Id"] == parent_trace
+    (root,) = [s for batch in exported for s in batch if s.name == "api_minutes"]
+    assert root.parent_id == "00f067aa0ba902b7"
+    assert root.attributes["http.status_code"] == 400
@@ -0,0 +1,103 @@
+"""
+Tests for the content-addressed transcription cache.
+"""
+
+import os
+import time
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from src.audio.transcription_cache import hash_audio_file, transcription_cache_key
+from src.core.transcription_manager import TranscriptionManager
+from src.utils.audio_utils import AudioBuffer
+from src.utils.disk_cache import TieredCache
+from .audio_samples import fake_audio
+
+
+def test_tiered_cache_serves_memory_then_disk(tmp_path):
+    cache = TieredCache(str(tmp_path), memory_entries=1)
+    cache.set("aa11", {"text": "first"})
+    cache.set("bb22", {"text": "second"})  # Pushes aa11 out of memory
+
+    assert cache.get("bb22") == {"text": "second"}
+    assert cache.get("aa11") == {"text": "first"}
+    assert cache.get("cc33") is None
+
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["entries"] == 2
+
+
+def test_tiered_cache_evicts_least_recently_used_files(tmp_path):
+    cache = TieredCache(str(tmp_path), memory_entries=0)
+    cache.set("aa11", {"text": "a" * 50})
+    entry_size = cache.stats()["size_bytes"]
+    cache.max_bytes = entry_size * 2 + 16  # Room for two entries, not three
+    past = time.time() - 60
+    os.utime(cache._path("aa11"), (past, past))
+
+    cache.set("bb22", {"text": "b" * 50})
+    cache.set("cc33", {"text": "c" * 50})
+
+    assert cache.get("aa11") is None
+    assert cache.get("cc33") == {"text": "c" * 50}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_key_changes_with_parameters():
+    base = transcription_cache_key("abc", provider="local", model="base", language=None)
+
+    assert base == transcription_cache_key("abc", provider="local", model="base", language=None)
+    assert base != transcription_cache_key("abc", provider="local", model="small", language=None)
+    assert base != transcription_cache_key("abd", provider="local", model="base", language=None)
+
+
+@patch('src.audio.whisper_service.whisper')
+def test_repeat_transcription_hits_cache(mock_whisper, tmp_path):
+    mock_model = Mock()
+    mock_model.transcribe.return_value = {"text": "Cached words", "language": "en", "segments": []}
+    mock_whisper.load_model.return_value = mock_model
+    audio = tmp_path / "meeting.mp3"
+    audio.write_bytes(fake_audio(".mp3"))
+
+    manager = TranscriptionManager({"whisper": {"model_name": "base"}})
+    manager.whisper_service.cache = TieredCache(str(tmp_path / "cache"))
+
+    first = manager.transcribe_file(str(audio))
+    second = manager.transcribe_file(str(audio))
+
+    assert first["text"] == second["text"] == "Cached words"
+    assert second["cached"] is True
+    mock_model.transcribe.assert_called_once()
+    assert manager.get_service_info()["cache"]["hits"] == 1
+    assert hash_audio_file(str(audio)) == hash_audio_file(str(audio))
+
+
+@patch('src.core.transcription_manager.AudioBuffer.from_file')
+def test_repeat_chunked_transcription_hits_cache(mock_from_file, tmp_path):
+    mock_from_file.return_value = AudioBuffer(np.full(25 * 16000, 0.1, dtype=np.float32))
+    audio = tmp_path / "long_meeting.mp3"
+    audio.write_bytes(fake_audio(".mp3"))
+    manager = TranscriptionManager({
+        "whisper": {"model_name": "base"},
+        "chunking": {"enabled": True, "window_seconds": 10.0, "overlap_seconds": 1.0,
+                     "executor": "thread", "max_workers": 1},
+    })
+    manager.whisper_service.cache = TieredCache(str(tmp_path / "cache"))
+    manager.whisper_service.transcribe_samples = Mock(return_value={
+        "language": "en", "segments": [{"start": 1.0, "end": 2.0, "text": " Chunk."}],
+    })
+
+    first = manager.transcribe_file(str(audio))
+    calls = manager.whisper_service.transcribe_samples.call_count
+    second = manager.transcribe_file(str(audio))
+
+    assert calls == 3 and manager.whisper_service.transcribe_samples.call_count == calls
+    assert second["cached"] is True
+    assert second["text"] == first["text"] and second["duration"] == first["duration"] == 25.0
+
+    # A different chunk plan is a different result
+    manager.config["chunking"]["window_seconds"] = 12.0
+    manager.transcribe_file(str(audio))
+    assert manager.whisper_service.transcribe_samples.call_count > calls
@@ -0,0 +1,102 @@
+"""
+Tests for the voice-activity-detection pre-pass.
+"""
+
+from pathlib import Path
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from src.audio.whisper_service import WhisperService
+from src.utils.audio_utils import AudioBuffer, detect_speech_regions, extract_speech, remap_segments, remap_timestamp
+
+SR = 16000
+rng = np.random.default_rng(0)
+
+
+def _speech(seconds):
+    """Voiced harmonics with a gliding pitch and a syllable-rate envelope."""
+    t = np.arange(int(seconds * SR)) / SR
+    phase = 2 * np.pi * np.cumsum(120 + 30 * np.sin(2 * np.pi * 0.7 * t)) / SR
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 10))
+    envelope = (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)) ** 2
+    return 0.1 * voiced * envelope
+
+
+def _silence(seconds):
+    return 0.001 * rng.standard_normal(int(seconds * SR))
+
+
+def _tone(seconds):
+    return 0.3 * np.sin(2 * np.pi * 440 * np.arange(int(seconds * SR)) / SR)
+
+
+def test_detects_speech_and_skips_silence_and_steady_tones():
+    audio = np.concatenate([_silence(5), _speech(3), _silence(10), _tone(5), _speech(2), _silence(4)])
+
+    regions = detect_speech_regions(audio, SR)
+
+    assert len(regions) == 2
+    assert regions[0][0] == pytest.approx(5, abs=0.5) and regions[0][1] == pytest.approx(8, abs=0.5)
+    assert regions[1][0] == pytest.approx(23, abs=0.5) and regions[1][1] == pytest.approx(25, abs=0.5)
+
+
+def test_pluggable_detector_replaces_heuristic():
+    detector = Mock(return_value=[(1, 2)])
+
+    assert detect_speech_regions(np.zeros(SR), SR, detector=detector) == [(1.0, 2.0)]
+
+
+def test_remap_segments_to_original_timeline():
+    regions = [(5.0, 8.0), (20.0, 22.0)]
+    segments = [
+        {"start": 0.5, "end": 3.0, "text": " First."},
+        {"start": 3.0, "end": 4.5, "text": " Second.", "words": [{"start": 3.5, "end": 4.0, "word": " Second."}]},
+    ]
+
+    remapped = remap_segments(segments, regions)
+
+    assert [(s["start"], s["end"]) for s in remapped] == [(5.5, 8.0), (20.0, 21.5)]
+    assert remapped[1]["words"][0]["start"] == 20.5
+    assert remap_timestamp(99.0, regions) == 22.0
+    assert len(extract_speech(np.zeros(30 * SR), regions, SR)) == 5 * SR
+
+
+def test_local_model_transcribes_only_speech():
+    audio = np.concatenate([_silence(6), _speech(2), _silence(6)]).astype(np.float32)
+    service = WhisperService(model_name="base", vad=True)
+    service.model = Mock()
+    service.model.transcribe.return_value = {
+        "text": " Hello.", "language": "en", "segments": [{"start": 0.5, "end": 1.5, "text": " Hello."}],
+    }
+
+    result = service._transcribe_with_local_model(audio)
+
+    sent = service.model.transcribe.call_args[0][0]
+    assert len(sent) < 3 * SR
+    assert result["segments"][0]["start"] == pytest.approx(6.5, abs=0.5)
+    assert result["vad"]["skipped_seconds"] == pytest.approx(14 - len(sent) / SR, abs=0.01)
+
+
+def test_silent_recording_skips_inference():
+    service = WhisperService(model_name="base", vad=True)
+    service.model = Mock()
+
+    result = service._transcribe_with_local_model(_silence(5).astype(np.float32))
+
+    service.model.transcribe.assert_not_called()
+    assert result["text"] == "" and result["vad"]["speech_seconds"] == 0
+
+
+def test_decoded_buffer_reaches_model_as_samples_without_vad():
+    samples = _speech(2).astype(np.float32)
+    service = WhisperService(model_name="base")
+    service.model = Mock()
+    service.model.transcribe.return_value = {"text": " Hello.", "language": "en", "segments": []}
+
+    # e.g. an Ogg upload whose duration was only known after decoding
+    service._dispatch(Path("meeting.ogg"), "meeting.ogg", None, None, None, buffer=AudioBuffer(samples))
+
+    sent = service.model.transcribe.call_args[0][0]
+    assert isinstance(sent, np.ndarray) and len(sent) == len(samples)
@@ -0,0 +1,125 @@
+"""
+Tests for startup warmup and the /healthz and /readyz probes.
+"""
+
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+from src.core.warmup import Readiness, get_readiness, reset_warmup_state, run_warmup, start_warmup
+
+
+@pytest.fixture(autouse=True)
+def fresh_readiness():
+    reset_warmup_state()
+    yield
+    reset_warmup_state()
+
+
+def local_service():
+    service = Mock(provider="local", vad=False)
+    service.transcribe_samples.return_value = {"text": "", "segments": []}
+    return service
+
+
+def test_readiness_waits_for_required_checks_only():
+    readiness = Readiness()
+    assert readiness.ready
+
+    readiness.register("model")
+    readiness.register("connect", required=False)
+    assert not readiness.ready
+
+    readiness.mark("model", ok=True, seconds=1.23456)
+    assert readiness.ready
+    readiness.mark("connect", ok=False, detail="timeout")
+    assert readiness.to_dict()["checks"] == {
+        "model": {"status": "ok", "required": True, "seconds": 1.235},
+        "connect": {"status": "failed", "required": False, "detail": "timeout"},
+    }
+
+
+@patch('src.core.warmup.get_http_client')
+def test_run_warmup_loads_model_runs_inference_and_opens_connections(mock_client):
+    mock_client.return_value.head.side_effect = [Mock(status_code=405), httpx.ConnectError("down")]
+    service = local_service()
+
+    readiness = run_warmup(service, ["https://llm.example/v1", "https://down.example"], readiness=Readiness())
+
+    service._ensure_local_model_loaded.assert_called_once()
+    samples = service.transcribe_samples.call_args.args[0]
+    assert samples.dtype.name == "float32" and len(samples) == 16000
+    # VAD would find no speech in the noise and skip the model
+    assert service.transcribe_samples.call_args.kwargs == {"vad": False}
+    checks = readiness.to_dict()["checks"]
+    assert checks["whisper_model_0"]["status"] == "ok"
+    assert checks["connect https://llm.example/v1"]["status"] == "ok"
+    # An unreachable API is reported but does not hold back readiness
+    assert checks["connect https://down.example"]["status"] == "failed"
+    assert readiness.ready
+
+
+def test_failed_model_load_keeps_server_unready():
+    service = local_service()
+    service._ensure_local_model_loaded.side_effect = ImportError("whisper package not found")
+
+    readiness = run_warmup(service, config={"connections": False}, readiness=Readiness())
+
+    assert not readiness.ready
+    assert "whisper package not found" in readiness.to_dict()["checks"]["whisper_model_0"]["detail"]
+
+
+def test_start_warmup_runs_once_in_background(monkeypatch):
+    monkeypatch.setenv("WARMUP_ENABLED", "true")
+    monkeypatch.setenv("WARMUP_CONNECTIONS", "false")
+    factory = Mock(return_value=local_service())
+
+    thread = start_warmup(factory)
+    assert start_warmup(factory) is None
+    thread.join(timeout=5)
+
+    factory.assert_called_once()
+    assert get_readiness().ready
+    assert set(get_readiness().to_dict()["checks"]) == {"warmup", "whisper_model_0"}
+
+
+def test_vad_detector_is_warmed_but_does_not_skip_the_model():
+    service = local_service()
+    service.vad = True
+    service.vad_detector = Mock(return_value=[])
+
+    readiness = run_warmup(service, config={"connections": False}, readiness=Readiness())
+
+    service.vad_detector.assert_called()
+    service.transcribe_samples.assert_called_once()
+    assert readiness.ready
+
+
+def test_failed_warmup_is_retried(monkeypatch):
+    monkeypatch.setenv("WARMUP_ENABLED", "true")
+    monkeypatch.setenv("WARMUP_CONNECTIONS", "false")
+    monkeypatch.setenv("WARMUP_RETRY_SECONDS", "0.01")
+    service = local_service()
+    # Model files not there yet on the first attempt
+    service._ensure_local_model_loaded.side_effect = [OSError("model not found"), None]
+
+    start_warmup(Mock(return_value=service)).join(timeout=5)
+
+    assert service._ensure_local_model_loaded.call_count == 2
+    assert get_readiness().ready
+
+
+def test_health_and_readiness_endpoints():
+    from src.server import app
+
+    client = app.test_client()
+    get_readiness().register("whisper_model_0")
+
+    assert client.get("/healthz").get_json() == {"status": "ok"}
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.get_json()["checks"]["whisper_model_0"]["status"] == "pending"
+
+    get_readiness().mark("whisper_model_0", ok=True)
+    assert client.get("/readyz").status_code == 200
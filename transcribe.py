@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Callable, Optional
 import os
 from src.core.transcription_manager import TranscriptionManager
 from src.config.whisper_config import get_default_whisper_config
@@ -10,12 +10,8 @@ except Exception:
     pass
 
 
-def transcribe_audio(audio_file_path: str, api_key: Optional[str] = None) -> str:
-    """Transcribe audio using Whisper integration.
-
-    Supports both local Whisper models and OpenAI API.
-    Reads configuration from environment variables.
-    """
+def create_transcription_manager(api_key: Optional[str] = None) -> TranscriptionManager:
+    """Build a TranscriptionManager from environment configuration."""
     # Setup configuration
     config = get_default_whisper_config()
     
@@ -24,11 +20,25 @@ def transcribe_audio(audio_file_path: str, api_key: Optional[str] = None) -> str
         os.environ["OPENAI_API_KEY"] = api_key
         config["use_openai_api"] = True
     
+    return TranscriptionManager({"whisper": config})
+
+
+def transcribe_audio(
+    audio_file_path: str,
+    api_key: Optional[str] = None,
+    progress_callback: Optional[Callable[[str, float], None]] = None,
+) -> str:
+    """Transcribe audio using Whisper integration.
+
+    Supports both local Whisper models and OpenAI API.
+    Reads configuration from environment variables.
+    ``progress_callback(stage, progress)`` is forwarded to the manager.
+    """
     # Create transcription manager
-    manager = TranscriptionManager({"whisper": config})
+    manager = create_transcription_manager(api_key)
     
     # Perform transcription
-    result = manager.transcribe_file(audio_file_path)
+    result = manager.transcribe_file(audio_file_path, progress_callback=progress_callback)
     
     # Return just the text for backward compatibility
     return result["text"]